@@ -0,0 +1,200 @@
+"""
+Замеры производительности ядра моделирования.
+
+Запуск из корня репозитория:
+    python -m benchmarks.core --output bench_results.json
+    python -m benchmarks.core --sizes 10 1000 --weeks 52 --compare old.json
+
+Для каждой операции и каждого сочетания числа городов и недель измеряются
+время (лучшее из --repeat запусков), прирост числа живых блоков памяти после
+операции (выделенные минус освобождённые, sys.getallocatedblocks) и пиковая
+память (через tracemalloc, отдельным запуском, чтобы не искажать время).
+"""
+from models.city import City
+from models.government import Government, GovernmentData
+from models.simulation import Simulation
+from typing import Callable, Dict, List, Optional, TypedDict
+import argparse
+import copy
+import datetime
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+
+OPERATIONS = ('city_update_state', 'government_update_state', 'government_get_statistics', 'simulation_make_step')
+DEFAULT_SIZES = (10, 1000, 100000)
+DEFAULT_WEEKS = (52, 520)
+
+
+class BenchmarkResult(TypedDict):
+    operation: str
+    cities: int
+    weeks: int
+    seconds: float
+    seconds_per_week: float
+    net_live_blocks: int
+    peak_memory: int
+
+
+def make_government_data(number_cities: int, seed: int = 0) -> GovernmentData:
+    """Создаёт синтетическое государство из number_cities городов."""
+    rng = np.random.default_rng(seed)
+    population = rng.integers(1000, 1000000, number_cities)
+    infected = np.where(rng.random(number_cities) < 0.1, population // 20, 0)
+    vaccinated = np.where(rng.random(number_cities) < 0.2, population // 10, 0)
+    city_types = rng.choice(['megapolis', 'medium', 'town'], number_cities)
+    transport = rng.uniform(0.1, 0.9, number_cities)
+    return {
+        'name': 'benchmark',
+        'budget': 10 ** 9,
+        'vaccine_cost': 10,
+        'cities_data': [
+            {
+                'name': f'city_{index}',
+                'city_type': str(city_type),
+                'population': int(population[index]),
+                'transport': float(transport[index]),
+                'number_vaccinated': int(vaccinated[index]),
+                'number_infected': int(infected[index]),
+            }
+            for index, city_type in enumerate(city_types)
+        ],
+    }
+
+
+def _vaccines(government_data: GovernmentData) -> Dict[str, int]:
+    return {city['name']: city['population'] // 1000 for city in government_data['cities_data']}
+
+
+def prepare(operation: str, government_data: GovernmentData, weeks: int) -> Callable[[], None]:
+    """Готовит состояние и возвращает функцию, выполняющую операцию weeks раз."""
+    if operation == 'city_update_state':
+        cities = [City(**params) for params in government_data['cities_data']]
+        vaccines = [city.population // 1000 for city in cities]
+
+        def run() -> None:
+            for week in range(weeks):
+                for city, number_vaccines in zip(cities, vaccines):
+                    city.update_state(week // 4 % 12 + 1, number_vaccines, 0.1)
+        return run
+
+    if operation == 'government_update_state':
+        government = Government(**copy.deepcopy(government_data))
+        vaccines = _vaccines(government_data)
+
+        def run() -> None:
+            for week in range(weeks):
+                government.update_state(week // 4 % 12 + 1, vaccines)
+        return run
+
+    if operation == 'government_get_statistics':
+        government = Government(**copy.deepcopy(government_data))
+
+        def run() -> None:
+            for _ in range(weeks):
+                government.get_statistics()
+        return run
+
+    if operation == 'simulation_make_step':
+        simulation = Simulation(-(-weeks // 4), 1, copy.deepcopy(government_data))
+
+        def run() -> None:
+            for _ in range(weeks):
+                simulation.make_step(min(10 ** 6, simulation.government.budget))
+        return run
+
+    raise ValueError(f"Unknown operation: {operation}")
+
+
+def measure(operation: str, number_cities: int, weeks: int, repeat: int = 3) -> BenchmarkResult:
+    """Измеряет время и память одной операции."""
+    government_data = make_government_data(number_cities)
+
+    seconds = float('inf')
+    for _ in range(repeat):
+        run = prepare(operation, government_data, weeks)
+        start = time.perf_counter()
+        run()
+        seconds = min(seconds, time.perf_counter() - start)
+
+    run = prepare(operation, government_data, weeks)
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    run()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    net_live_blocks = sys.getallocatedblocks() - blocks
+
+    return {
+        'operation': operation,
+        'cities': number_cities,
+        'weeks': weeks,
+        'seconds': seconds,
+        'seconds_per_week': seconds / weeks,
+        'net_live_blocks': net_live_blocks,
+        'peak_memory': peak_memory,
+    }
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[BenchmarkResult], baseline: List[BenchmarkResult]) -> None:
+    """Печатает отношение времени и пиковой памяти к результатам baseline."""
+    previous = {(result['operation'], result['cities'], result['weeks']): result for result in baseline}
+    print(f"{'operation':<28}{'cities':>8}{'weeks':>7}{'time x':>10}{'memory x':>10}")
+    for result in results:
+        old = previous.get((result['operation'], result['cities'], result['weeks']))
+        if old is None:
+            continue
+        time_ratio = result['seconds'] / old['seconds'] if old['seconds'] else float('nan')
+        memory_ratio = result['peak_memory'] / old['peak_memory'] if old['peak_memory'] else float('nan')
+        print(f"{result['operation']:<28}{result['cities']:>8}{result['weeks']:>7}{time_ratio:>10.2f}{memory_ratio:>10.2f}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.core', description="Замеры производительности ядра моделирования.")
+    parser.add_argument('--operations', nargs='+', choices=OPERATIONS, default=list(OPERATIONS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(DEFAULT_SIZES), help="Число городов.")
+    parser.add_argument('--weeks', nargs='+', type=int, default=list(DEFAULT_WEEKS), help="Число недель.")
+    parser.add_argument('--repeat', type=int, default=3, help="Число запусков для замера времени.")
+    parser.add_argument('--output', default='bench_results.json', help="Файл для результатов в формате JSON.")
+    parser.add_argument('--compare', help="Файл с результатами для сравнения.")
+    args = parser.parse_args(argv)
+
+    results: List[BenchmarkResult] = []
+    for operation in args.operations:
+        for number_cities in args.sizes:
+            for weeks in args.weeks:
+                result = measure(operation, number_cities, weeks, args.repeat)
+                results.append(result)
+                print(f"{operation:<28}{number_cities:>8}{weeks:>7}  {result['seconds']:9.4f} s"
+                      f"  {result['peak_memory'] / 2 ** 20:9.2f} MiB  {result['net_live_blocks']:>9} live blocks", flush=True)
+
+    report = {
+        'commit': _commit(),
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare, encoding='utf-8') as file:
+            compare(results, json.load(file)['results'])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,12 @@
+from models.loader import LOADER_SUFFIXES
 import models
+import os
+import sys
 
 if __name__ == "__main__":
     visualizer = models.Visualizer()
-    visualizer.run_simulation()
+    path = sys.argv[1] if len(sys.argv) > 1 else None
+    if path is not None and os.path.splitext(path)[1].lower() in LOADER_SUFFIXES:
+        visualizer.run_simulation(cities=path)
+    else:
+        visualizer.run_simulation(path)
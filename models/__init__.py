@@ -1,11 +1,34 @@
-from .city import City, CityData, CityStatisticsData
+from .allocation import AllocationStrategy, GreedyAllocation, ProportionalAllocation, RegionalAllocation
+from .city import City, CityData, CityStatisticsData, CityType
+from .compartments import ADAPTIVE_SEIR_COMPARTMENTS, CompartmentData, CompartmentEngine, SEIR_COMPARTMENTS, WEEKLY_COMPARTMENTS
+from .engine import CitiesEngine
 from .government import Government, GovernmentData, GovernmentStatisticsData
+from .history import History
+from .regions import RegionData, Regions
+from .loader import load_cities
 from .simulation import Simulation, StatisticsData
-from .visualizer import Visualizer
+from .supply import SupplyData, SupplyStatisticsData, VaccineSupply
+from .world import BorderFlowData, World
 
 __all__ = [
-    'City', 'CityData', 'CityStatisticsData',
+    'AllocationStrategy', 'GreedyAllocation', 'ProportionalAllocation', 'RegionalAllocation',
+    'City', 'CityData', 'CityStatisticsData', 'CityType',
+    'ADAPTIVE_SEIR_COMPARTMENTS', 'CompartmentData', 'CompartmentEngine', 'SEIR_COMPARTMENTS', 'WEEKLY_COMPARTMENTS',
+    'CitiesEngine',
     'Government', 'GovernmentData', 'GovernmentStatisticsData',
+    'History',
+    'load_cities',
+    'RegionData', 'Regions',
     'Simulation', 'StatisticsData',
+    'SupplyData', 'SupplyStatisticsData', 'VaccineSupply',
+    'BorderFlowData', 'World',
     'Visualizer'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str):
+    # Visualizer тянет за собой pygame, поэтому импортируется только по требованию.
+    if name == 'Visualizer':
+        from .visualizer import Visualizer
+        return Visualizer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,151 @@
+from .engine import CitiesEngine, advance_week, cohort_sum
+from .government import Government
+import heapq
+import numpy as np
+
+
+class AllocationStrategy:
+    """Стратегия распределения вакцин по городам."""
+
+    def allocate(self, government: Government, money: int, month: int) -> np.ndarray:
+        """
+        Определяет распределение вакцин по городам.
+
+        :param government: Государство.
+        :param money: Деньги, выделенные на вакцины.
+        :param month: Текущий месяц.
+        :return: Массив числа вакцин в порядке городов.
+        """
+        raise NotImplementedError
+
+
+class ProportionalAllocation(AllocationStrategy):
+    """Распределяет вакцины пропорционально населению городов."""
+
+    def allocate(self, government: Government, money: int, month: int) -> np.ndarray:
+        can_vaccinate_rate = money / government.vaccine_cost / government.population
+        return np.trunc(can_vaccinate_rate * government.engine.population).astype(np.int64)
+
+
+class GreedyAllocation(AllocationStrategy):
+    def __init__(self, horizon: int = 3, chunks: int = 32) -> None:
+        """
+        Инициализация жадной стратегии распределения вакцин.
+
+        Вакцины делятся на порции. Для каждого города прогнозируется число новых
+        заболевших на horizon недель вперёд при 0, 1, ..., chunks порциях
+        (одним векторным прогоном движка), после чего порции по одной отдаются
+        городу с наибольшим приростом пользы из очереди с приоритетом.
+        Порции, не уменьшающие прогноз заболевших, не покупаются.
+
+        :param horizon: Число недель прогноза.
+        :param chunks: Число порций, на которые делятся вакцины.
+        """
+        if horizon < 1:
+            raise ValueError("horizon must be positive")
+        if chunks < 1:
+            raise ValueError("chunks must be positive")
+        self.horizon = horizon
+        self.chunks = chunks
+
+    def _project_infections(self, government: Government, cities, levels: np.ndarray, month: int) -> np.ndarray:
+        """
+        Прогнозирует число новых заболевших по городам для каждого уровня вакцинации.
+
+        :param government: Государство.
+        :param cities: Индексы прогнозируемых городов (или срез).
+        :param levels: Число вакцин для каждого уровня и города, форма (k, число городов).
+        :param month: Текущий месяц.
+        :return: Число новых заболевших за горизонт прогноза, форма (k, число городов).
+        """
+        engine = government.engine
+        population = engine.population[cities]
+        shape = (len(levels), engine.vaccinated.shape[0], len(population))
+        vaccinated = np.broadcast_to(engine.vaccinated[:, cities], shape).copy()
+        infected = np.broadcast_to(engine.infected[:, cities], shape).copy()
+        projected = np.zeros(levels.shape, dtype=np.int64)
+        factor = government.infection_factor()
+        if np.ndim(factor):
+            factor = factor[cities]
+        vaccines = levels
+        for _ in range(self.horizon):
+            remaining = cohort_sum(infected[..., 1:, :])
+            _, number_infected = advance_week(population, engine.transport[cities], engine.city_weight[cities],
+                                              vaccinated, infected, vaccines, month,
+                                              factor, engine.base_rate)
+            projected += number_infected - remaining
+            vaccines = 0
+        return projected
+
+    def allocate(self, government: Government, money: int, month: int) -> np.ndarray:
+        engine = government.engine
+        if not isinstance(engine, CitiesEngine):
+            raise ValueError("greedy allocation supports only the weekly cohort model")
+        number_vaccines = money // government.vaccine_cost
+        allocation = np.zeros(len(engine), dtype=np.int64)
+        if number_vaccines == 0 or len(engine) == 0:
+            return allocation
+
+        chunks = min(self.chunks, number_vaccines)
+        chunk = -(-number_vaccines // chunks)
+        capacity = engine.number_innocent
+
+        # Город получает порцию, лишь если до него из очереди извлечены все города с большей пользой
+        # от первой порции, а каждый из них забирает min(chunk, capacity) вакцин. Поэтому достаточно
+        # городов, которые стоят в порядке убывания пользы до исчерпания вакцин (с равными по пользе).
+        levels = np.minimum(np.array([[0], [chunk]]), capacity)
+        first_gains = -np.diff(self._project_infections(government, slice(None), levels, month), axis=0)[0]
+        candidates = np.flatnonzero(first_gains > 0)
+        if len(candidates) == 0:
+            return allocation
+        candidates = candidates[np.argsort(-first_gains[candidates], kind='stable')]
+        absorbed = np.minimum(capacity[candidates], chunk)
+        reachable = np.cumsum(absorbed) - absorbed < number_vaccines
+        threshold = first_gains[candidates[reachable]].min()
+        candidates = np.sort(candidates[first_gains[candidates] >= threshold])
+
+        capacity = capacity[candidates]
+        levels = np.minimum(np.arange(chunks + 1)[:, None] * chunk, capacity)
+        gains = -np.diff(self._project_infections(government, candidates, levels, month), axis=0).T
+
+        taken = [0] * len(candidates)
+        given = [0] * len(candidates)
+        queue = [(-gain, index) for index, gain in enumerate(gains[:, 0].tolist())]
+        heapq.heapify(queue)
+        while queue and number_vaccines > 0:
+            _, index = heapq.heappop(queue)
+            amount = min(chunk, number_vaccines, int(capacity[index]) - given[index])
+            given[index] += amount
+            number_vaccines -= amount
+            taken[index] += 1
+            if taken[index] < chunks and gains[index, taken[index]] > 0:
+                heapq.heappush(queue, (-gains[index, taken[index]], index))
+        allocation[candidates] = given
+        return allocation
+
+
+class RegionalAllocation(AllocationStrategy):
+    def __init__(self, share: float = 1.0, base: AllocationStrategy = None) -> None:
+        """
+        Инициализация распределения по уровням государство - регионы.
+
+        Деньги государства распределяются стратегией base, а каждый регион дополнительно
+        тратит долю share своего бюджета на вакцины для своих городов пропорционально
+        их населению. Вакцины региона оплачиваются из его бюджета (см. Government).
+
+        :param share: Доля бюджета региона, расходуемая за шаг.
+        :param base: Стратегия для денег государства (по умолчанию пропорционально населению).
+        """
+        if not (0 <= share <= 1):
+            raise ValueError("share must be in [0, 1]")
+        self.share = share
+        self.base = ProportionalAllocation() if base is None else base
+
+    def allocate(self, government: Government, money: int, month: int) -> np.ndarray:
+        allocation = self.base.allocate(government, money, month)
+        regions = government.regions
+        if regions is None:
+            return allocation
+        region_money = np.trunc(regions.budget * self.share)
+        can_vaccinate_rate = region_money / government.vaccine_cost / np.maximum(regions.population, 1)
+        return allocation + np.trunc(can_vaccinate_rate[regions.index] * government.engine.population).astype(np.int64)
@@ -0,0 +1,185 @@
+from .engine import EPIDEMIC_RATE, CitiesEngine, advance_week, cohort_sum
+from .government import Government, GovernmentData, GovernmentStatisticsData
+from typing import Dict, Optional, Union
+import numpy as np
+
+
+BATCH_METRICS = ('budget', 'number_vaccinated', 'number_infected', 'number_epidemic_cities')
+BLOCK_ELEMENTS = 1 << 15 # Число элементов (реплики × города) за один проход движка
+
+
+class BatchSimulation:
+    def __init__(self, months: int, start_month: int, government_data: GovernmentData, replicas: int,
+                 base_rate: Union[float, np.ndarray, None] = None,
+                 budget: Union[int, np.ndarray, None] = None,
+                 vaccine_cost: Union[int, np.ndarray, None] = None,
+                 stochastic: bool = False, seed: Optional[int] = None) -> None:
+        """
+        Инициализация пакета из replicas независимых симуляций одного государства.
+
+        Когорты всех реплик хранятся одним массивом формы (replicas, 3, число городов),
+        и шаг продвигает все реплики одним проходом движка. Параметры base_rate,
+        budget и vaccine_cost задаются числом (общим для всех) или массивом по репликам;
+        по умолчанию берутся из government_data. Каждая реплика повторяет Simulation
+        с пропорциональным распределением вакцин. Камерная модель и регионы
+        не поддерживаются.
+
+        :param months: Количество месяцев моделирования.
+        :param start_month: Номер начального месяца.
+        :param government_data: Параметры государства.
+        :param replicas: Число реплик.
+        :param base_rate: Базовая скорость заражения по репликам.
+        :param budget: Начальный бюджет по репликам.
+        :param vaccine_cost: Стоимость вакцины по репликам.
+        :param stochastic: Стохастический режим (один генератор на все реплики).
+        :param seed: Зерно генератора случайных чисел.
+        """
+        if replicas < 1:
+            raise ValueError("replicas must be positive")
+        government = Government(**government_data)
+        engine = government.engine
+        if not isinstance(engine, CitiesEngine):
+            raise ValueError("batch simulation supports only the weekly cohort model")
+        if government.regions is not None:
+            raise ValueError("batch simulation does not support regions")
+
+        def per_replica(value, default, dtype) -> np.ndarray:
+            value = default if value is None else value
+            return np.broadcast_to(np.asarray(value, dtype=dtype), (replicas,)).copy()
+
+        self.months = months
+        self.start_month = start_month
+        self.current_month = start_month
+        self.current_week = 0
+        self.replicas = replicas
+        self.name = government.name
+        self.names = government.names
+        self.base_rate = per_replica(base_rate, engine.base_rate, np.float64)
+        self.budget = per_replica(budget, government.budget, np.int64)
+        self.vaccine_cost = per_replica(vaccine_cost, government.vaccine_cost, np.int64)
+        self.tax_per_person = government.tax_per_person
+        self.tax_rate_payment = government.tax_rate_payment
+        if np.any(self.budget < 0):
+            raise ValueError("Budget cannot be negative")
+        if np.any(self.vaccine_cost <= 0):
+            raise ValueError("Vaccine cost must be positive")
+
+        self.population = engine.population
+        self.total_population = engine.total_population
+        self.transport = engine.transport
+        self.city_weight = engine.city_weight
+        self.mobility = engine.mobility
+        self.rng = np.random.default_rng(seed) if stochastic else None
+        self.vaccinated = np.broadcast_to(engine.vaccinated, (replicas,) + engine.vaccinated.shape).copy()
+        self.infected = np.broadcast_to(engine.infected, (replicas,) + engine.infected.shape).copy()
+        self.epidemic = np.broadcast_to(engine.epidemic, (replicas, len(engine))).copy()
+        self.government_factor = np.full(replicas, government.government_factor)
+        self._set_totals(cohort_sum(self.vaccinated), cohort_sum(self.infected))
+
+        capacity = months * 4 + 1
+        self.history: Dict[str, np.ndarray] = {name: np.zeros((capacity, replicas), dtype=np.int64)
+                                               for name in BATCH_METRICS}
+        self._length = 0
+        self._record()
+
+    def _set_totals(self, number_vaccinated: np.ndarray, number_infected: np.ndarray) -> None:
+        """Запоминает итоги по городам и репликам и отмечает города с эпидемией."""
+        self.number_vaccinated = number_vaccinated
+        self.number_infected = number_infected
+        self.total_vaccinated = number_vaccinated.sum(axis=-1)
+        self.total_infected = number_infected.sum(axis=-1)
+        self.epidemic |= number_infected / self.population >= EPIDEMIC_RATE
+        self.number_epidemic_cities = self.epidemic.sum(axis=-1)
+
+    def _record(self) -> None:
+        """Записывает показатели реплик на текущем шаге."""
+        if self._length == len(self.history['budget']):
+            self.history = {name: np.concatenate([series, np.zeros_like(series)])
+                            for name, series in self.history.items()}
+        step = self._length
+        self.history['budget'][step] = self.budget
+        self.history['number_vaccinated'][step] = self.total_vaccinated
+        self.history['number_infected'][step] = self.total_infected
+        self.history['number_epidemic_cities'][step] = self.number_epidemic_cities
+        self._length += 1
+
+    def make_step(self, money: Union[int, np.ndarray]) -> None:
+        """
+        Выполняет один шаг (неделю) всех реплик.
+
+        :param money: Деньги на вакцины: число для всех реплик или массив по репликам.
+        """
+        money = np.broadcast_to(np.asarray(money, dtype=np.int64), (self.replicas,))
+        if np.any(money > self.budget):
+            raise ValueError("Недостаточно бюджета для распределения вакцин.")
+
+        can_vaccinate_rate = money / self.vaccine_cost / self.total_population
+        vaccines = np.trunc(can_vaccinate_rate[:, None] * self.population).astype(np.int64)
+
+        self.budget += np.trunc(self.tax_rate_payment * self.tax_per_person *
+                                (self.total_population - self.total_infected)).astype(np.int64)
+        self.budget -= (vaccines * self.vaccine_cost[:, None]).sum(axis=-1)
+
+        government_factor = self.government_factor[:, None]
+        imported = None
+        if self.mobility is not None:
+            imported = self.mobility.imported(self.number_infected / self.population)
+            government_factor = np.zeros_like(government_factor)
+
+        # Реплики продвигаются блоками, чтобы временные массивы движка помещались в кэш.
+        number_vaccinated = np.empty_like(self.number_vaccinated)
+        number_infected = np.empty_like(self.number_infected)
+        block = max(1, BLOCK_ELEMENTS // len(self.population))
+        for start in range(0, self.replicas, block):
+            replicas = slice(start, start + block)
+            number_vaccinated[replicas], number_infected[replicas] = advance_week(
+                self.population, self.transport, self.city_weight,
+                self.vaccinated[replicas], self.infected[replicas], vaccines[replicas], self.current_month,
+                government_factor[replicas], self.base_rate[replicas, None],
+                None if imported is None else imported[replicas], self.rng)
+        self._set_totals(number_vaccinated, number_infected)
+        self.government_factor = (self.total_infected / self.total_population) ** 0.5
+
+        self.current_week += 1
+        if self.current_week % 4 == 0:
+            self.current_month = (self.current_month + 1) % 12
+        self._record()
+
+    def get_history(self, metric: str) -> np.ndarray:
+        """
+        Возвращает показатель по шагам и репликам.
+
+        :param metric: Один из BATCH_METRICS.
+        :return: Массив формы (число шагов, replicas).
+        """
+        if metric not in self.history:
+            raise ValueError(f"metric must be one of {', '.join(BATCH_METRICS)}")
+        return self.history[metric][:self._length]
+
+    def quantiles(self, metric: str, q=(0.05, 0.5, 0.95)) -> np.ndarray:
+        """
+        Возвращает полосы неопределённости показателя по репликам.
+
+        :param metric: Один из BATCH_METRICS.
+        :param q: Уровни квантилей.
+        :return: Массив формы (len(q), число шагов).
+        """
+        return np.quantile(self.get_history(metric), q, axis=1)
+
+    def get_government_statistics(self, replica: int) -> GovernmentStatisticsData:
+        """Возвращает статистику по государству в реплике replica на текущем шаге."""
+        population = self.total_population
+        number_vaccinated = int(self.total_vaccinated[replica])
+        number_infected = int(self.total_infected[replica])
+        return {
+            "name": self.name,
+            "population": population,
+            "number_vaccinated": number_vaccinated,
+            "number_infected": number_infected,
+            "number_innocent": population - number_infected - number_vaccinated,
+            "number_workers": population - number_infected,
+            "budget": int(self.budget[replica]),
+            "vaccine_cost": int(self.vaccine_cost[replica]),
+            "number_cities": len(self.names),
+            "number_epidemic_cities": int(self.number_epidemic_cities[replica]),
+        }
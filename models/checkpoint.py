@@ -0,0 +1,174 @@
+from .engine import CitiesEngine
+from .government import Government, TAX_PER_PRESON, TAX_RATE_PAYMENT
+from .history import History
+from .mobility import MobilityNetwork
+from .simulation import Simulation
+from typing import List, Optional
+import io
+import json
+import numpy as np
+
+
+CHECKPOINT_VERSION = 1
+
+
+def dump_checkpoint(simulation: Simulation, include_history: bool = True) -> bytes:
+    """
+    Сериализует состояние симуляции в компактный двоичный формат (сжатый npz).
+
+    :param simulation: Симуляция.
+    :param include_history: Сохранять ли записанную историю.
+    :return: Содержимое контрольной точки.
+    """
+    government = simulation.government
+    engine = government.engine
+    if not isinstance(engine, CitiesEngine):
+        raise ValueError("checkpoints support only the weekly cohort model")
+    meta = {
+        'version': CHECKPOINT_VERSION,
+        'months': simulation.months,
+        'start_month': simulation.start_month,
+        'current_month': simulation.current_month,
+        'current_week': simulation.current_week,
+        'name': government.name,
+        'budget': government.budget,
+        'vaccine_cost': government.vaccine_cost,
+        'tax_per_person': government.tax_per_person,
+        'tax_rate_payment': government.tax_rate_payment,
+        'government_factor': government.government_factor,
+        'base_rate': engine.base_rate,
+        'names': government.names,
+        'cities_type': government.cities_type,
+        'coordinates': government.coordinates,
+        'cities_region': government.cities_region,
+        'regions': None if government.regions is None else [
+            {'name': name, 'budget': budget}
+            for name, budget in zip(government.regions.names, government.regions.budget.tolist())],
+        'rng_state': None if engine.rng is None else engine.rng.bit_generator.state,
+    }
+    arrays = {
+        'population': engine.population,
+        'transport': engine.transport,
+        'city_weight': engine.city_weight,
+        'vaccinated': engine.vaccinated,
+        'infected': engine.infected,
+        'epidemic': engine.epidemic,
+    }
+    if simulation.supply is not None:
+        supply = simulation.supply
+        meta['supply'] = {
+            'data': supply.supply_data, 'transit_head': supply.transit_head, 'stock_head': supply.stock_head,
+            'totals': [supply.ordered, supply.delivered, supply.distributed, supply.expired, supply.wasted],
+        }
+        arrays.update(supply_in_transit=supply.in_transit, supply_stock=supply.stock)
+    if engine.mobility is not None:
+        arrays.update(mobility_origins=engine.mobility.origins,
+                      mobility_destinations=engine.mobility.destinations,
+                      mobility_flows=engine.mobility.flows)
+    if include_history and simulation.history is not None:
+        history = simulation.history
+        length = len(history)
+        arrays.update(history_number_vaccinated=history.number_vaccinated[:length],
+                      history_number_infected=history.number_infected[:length],
+                      history_budget=history.budget[:length],
+                      history_government_number_vaccinated=history.government_number_vaccinated[:length],
+                      history_government_number_infected=history.government_number_infected[:length],
+                      history_number_epidemic_cities=history.number_epidemic_cities[:length])
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, meta=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8), **arrays)
+    return buffer.getvalue()
+
+
+def restore_checkpoint(data: bytes, budget: Optional[int] = None, keep_history: Optional[bool] = None) -> Simulation:
+    """
+    Восстанавливает симуляцию из контрольной точки.
+
+    Движок и государство собираются прямо из сохранённых массивов, без объектов
+    городов, поэтому восстановление стоит порядка одного шага моделирования.
+
+    :param data: Содержимое контрольной точки.
+    :param budget: Бюджет, заменяющий сохранённый.
+    :param keep_history: Хранить ли историю в памяти; по умолчанию - если она сохранена в контрольной точке.
+    :return: Симуляция, продолжающая моделирование с сохранённого шага.
+    """
+    with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+        meta = json.loads(arrays['meta'].tobytes().decode('utf-8'))
+        if meta['version'] != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {meta['version']}")
+
+        number_cities = len(meta['names'])
+        mobility = None
+        if 'mobility_flows' in arrays:
+            mobility = MobilityNetwork(number_cities, arrays['mobility_origins'],
+                                       arrays['mobility_destinations'], arrays['mobility_flows'])
+        rng = None
+        if meta.get('rng_state') is not None:
+            rng = np.random.default_rng()
+            rng.bit_generator.state = meta['rng_state']
+        engine = CitiesEngine(arrays['population'], arrays['transport'], arrays['city_weight'],
+                              arrays['vaccinated'], arrays['infected'], meta['base_rate'], mobility, rng)
+        engine.epidemic = arrays['epidemic']
+        engine.invalidate()
+
+        government = Government.from_engine(
+            meta['name'], meta['budget'] if budget is None else budget, meta['vaccine_cost'], engine,
+            meta['names'], meta['cities_type'], meta.get('coordinates'), meta.get('cities_region'),
+            meta.get('regions'), meta.get('tax_per_person', TAX_PER_PRESON),
+            meta.get('tax_rate_payment', TAX_RATE_PAYMENT))
+        government.government_factor = meta['government_factor']
+
+        simulation = Simulation.from_government(
+            meta['months'], meta['start_month'], government, keep_history=False,
+            supply=None if meta.get('supply') is None else meta['supply']['data'])
+        simulation.current_month = meta['current_month']
+        simulation.current_week = meta['current_week']
+        if simulation.supply is not None:
+            supply = simulation.supply
+            supply.in_transit = arrays['supply_in_transit']
+            supply.stock = arrays['supply_stock']
+            supply.transit_head = meta['supply']['transit_head']
+            supply.stock_head = meta['supply']['stock_head']
+            supply.ordered, supply.delivered, supply.distributed, supply.expired, supply.wasted = meta['supply']['totals']
+
+        if keep_history is None:
+            keep_history = 'history_budget' in arrays
+        if keep_history:
+            if 'history_budget' in arrays:
+                length = len(arrays['history_budget'])
+                history = History(government, max(simulation.months * 4, length - 1))
+                for name in ('number_vaccinated', 'number_infected', 'budget', 'government_number_vaccinated',
+                             'government_number_infected', 'number_epidemic_cities'):
+                    getattr(history, name)[:length] = arrays[f'history_{name}']
+                history._length = length
+            else:
+                history = History(government, simulation.months * 4)
+                history.append(government)
+            simulation.history = history
+    return simulation
+
+
+def save_checkpoint(simulation: Simulation, path: str, include_history: bool = True) -> None:
+    """Сохраняет контрольную точку симуляции в файл."""
+    with open(path, 'wb') as file:
+        file.write(dump_checkpoint(simulation, include_history))
+
+
+def load_checkpoint(path: str) -> Simulation:
+    """Загружает симуляцию из файла контрольной точки."""
+    with open(path, 'rb') as file:
+        return restore_checkpoint(file.read())
+
+
+def fork_simulation(simulation: Simulation, budgets: List[int], include_history: bool = False) -> List[Simulation]:
+    """
+    Создаёт независимые ветви симуляции с разными бюджетами на вакцинацию.
+
+    :param simulation: Симуляция, с текущего шага которой начинаются ветви.
+    :param budgets: Бюджет для каждой ветви.
+    :param include_history: Переносить ли в ветви уже записанную историю; без неё ветви
+                            не хранят историю (history равна None).
+    :return: Список ветвей в порядке budgets.
+    """
+    data = dump_checkpoint(simulation, include_history)
+    return [restore_checkpoint(data, budget) for budget in budgets]
@@ -1,5 +1,7 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, TypedDict, Union
+import array
+import enum
 import math
-from typing import Dict, TypedDict
 
 
 VACCINATED_RATE_3_WEEKS = 0.8
@@ -10,12 +12,17 @@ INFECTED_RATE_2_WEEKS = 0.6
 INFECTED_RATE_1_WEEKS = 1 - INFECTED_RATE_3_WEEKS - INFECTED_RATE_2_WEEKS
 
 
+NUMBER_WEEKS      = 3
 BASE_RATE         = 1.5
-W_TYPE_CITY       = lambda x: {'megapolis': 1.5, 'medium': 1.25, 'town': 1}[x]
 W_MONTH           = lambda x: 1.5 if 9 <= x <= 3 else 1
 
 
-class CityData(TypedDict):
+class _CityOptionalData(TypedDict, total=False):
+    coordinates: Tuple[float, float]
+    region: str
+
+
+class CityData(_CityOptionalData):
     name: str
     city_type: str
     population: int
@@ -33,9 +40,67 @@ class CityStatisticsData(TypedDict):
     number_workers: int
 
 
+class CityType(str, enum.Enum):
+    """Тип города с заранее вычисленным весом в скорости заражения."""
+
+    MEGAPOLIS = 'megapolis', 1.5
+    MEDIUM = 'medium', 1.25
+    TOWN = 'town', 1
+
+    def __new__(cls, value: str, weight: float = 1) -> 'CityType':
+        member = str.__new__(cls, value)
+        member._value_ = value
+        member.weight = weight
+        return member
+
+    # Как у строки: str() и f-строки дают значение, а не 'CityType.TOWN'.
+    __str__ = str.__str__
+    __format__ = str.__format__
+
+
+class Cohort(array.array):
+    """
+    Когорта: число людей по неделям 1, 2, 3 в массиве фиксированной длины.
+    Индексируется номером недели, как прежний словарь {неделя: число людей}.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, counts: Union[Dict[int, int], Sequence[int]] = (0,) * NUMBER_WEEKS) -> 'Cohort':
+        if isinstance(counts, dict):
+            counts = [counts.get(week, 0) for week in range(1, NUMBER_WEEKS + 1)]
+        elif len(counts) != NUMBER_WEEKS:
+            raise ValueError(f"cohort must have {NUMBER_WEEKS} weeks")
+        return super().__new__(cls, 'q', counts)
+
+    def __reduce__(self):
+        return Cohort, (self.tolist(),)
+
+    def __getitem__(self, week: int) -> int:
+        return super().__getitem__(week - 1)
+
+    def __setitem__(self, week: int, number: int) -> None:
+        super().__setitem__(week - 1, number)
+
+    def keys(self) -> range:
+        return range(1, NUMBER_WEEKS + 1)
+
+    def values(self) -> List[int]:
+        return self.tolist()
+
+    def items(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.keys(), self.tolist())
+
+    def __delitem__(self, week: int) -> None:
+        raise TypeError("cohort has a fixed number of weeks")
+
+
 class City:
+    __slots__ = ('name', 'population', 'transport', 'city_type', 'coordinates', 'region', '_vaccinated', '_infected')
+
     def __init__(self, name: str, city_type: str, population: int, transport: float,
-                 number_vaccinated: int = 0, number_infected: int = 0) -> None:
+                 number_vaccinated: int = 0, number_infected: int = 0,
+                 coordinates: Optional[Tuple[float, float]] = None, region: Optional[str] = None) -> None:
         """
         Инициализация города.
 
@@ -45,38 +110,62 @@ class City:
         :param transport: Уровень транспорта (0.0 - 1.0).
         :param number_vaccinated: Начальное число вакцин.
         :param number_infected: Начальное число заболевших.
+        :param coordinates: Положение на карте в долях её ширины и высоты (0.0 - 1.0).
+        :param region: Название региона, к которому относится город.
         """
         if not (0 <= transport <= 1):
             raise ValueError("transport must be in [0, 1]")
-        if city_type not in ["megapolis", "medium", "town"]:
+        if city_type not in CityType._value2member_map_:
             raise ValueError("city_type must be 'megapolis', 'medium' or 'town'")
+        city_type = CityType(city_type)
+        if coordinates is not None and not all(0 <= rate <= 1 for rate in coordinates):
+            raise ValueError("coordinates must be in [0, 1]")
 
         self.name = name
         self.population = population
         self.transport = transport
         self.city_type = city_type
+        self.coordinates = None if coordinates is None else tuple(coordinates)
+        self.region = region
+
+        self._vaccinated = Cohort((
+            int(VACCINATED_RATE_1_WEEKS * number_vaccinated),
+            int(VACCINATED_RATE_2_WEEKS * number_vaccinated),
+            int(VACCINATED_RATE_3_WEEKS * number_vaccinated),
+        ))
+        self._infected = Cohort((
+            int(INFECTED_RATE_1_WEEKS * number_infected),
+            int(INFECTED_RATE_2_WEEKS * number_infected),
+            int(INFECTED_RATE_3_WEEKS * number_infected),
+        ))
 
-        self.vaccinated: Dict[int, int] = {
-            3: int(VACCINATED_RATE_3_WEEKS * number_vaccinated),
-            2: int(VACCINATED_RATE_2_WEEKS * number_vaccinated),
-            1: int(VACCINATED_RATE_1_WEEKS * number_vaccinated),
-        }
+    @property
+    def vaccinated(self) -> Cohort:
+        """Возвращает когорты вакцинированных по неделям."""
+        return self._vaccinated
 
-        self.infected: Dict[int, int] = {
-            3: int(INFECTED_RATE_3_WEEKS * number_infected),
-            2: int(INFECTED_RATE_2_WEEKS * number_infected),
-            1: int(INFECTED_RATE_1_WEEKS * number_infected),
-        }
+    @vaccinated.setter
+    def vaccinated(self, cohort: Union[Dict[int, int], Sequence[int]]) -> None:
+        self._vaccinated = Cohort(cohort)
+
+    @property
+    def infected(self) -> Cohort:
+        """Возвращает когорты заболевших по неделям."""
+        return self._infected
+
+    @infected.setter
+    def infected(self, cohort: Union[Dict[int, int], Sequence[int]]) -> None:
+        self._infected = Cohort(cohort)
 
     @property
     def number_vaccinated(self) -> int:
         """Возвращает общее число вакцинированных."""
-        return sum(self.vaccinated.values())
+        return sum(self._vaccinated)
 
     @property
     def number_infected(self) -> int:
         """Возвращает общее число заболевших."""
-        return sum(self.infected.values())
+        return sum(self._infected)
 
     @property
     def number_innocent(self) -> int:
@@ -88,45 +177,48 @@ class City:
         """Возвращает число работающих людей."""
         return self.population - self.number_infected
 
+    # Когорты меняются методами array.array (pop, append, extend), а не индексами недель
+    # Cohort, чтобы в горячем цикле не вызывать переопределённые на Python __getitem__/__setitem__.
     def _allocate_vaccines(self, number_vaccines: int) -> None:
         """Выделяет вакцины для города."""
-        number_innocent = self.number_innocent
-        for week in range(1, 3):
-            self.vaccinated[week] = self.vaccinated[week + 1]
-        self.vaccinated[3] = min(number_vaccines, number_innocent)
+        number_vaccines = min(number_vaccines, self.number_innocent)
+        self._vaccinated.pop(0)
+        self._vaccinated.append(number_vaccines)
 
     def _recover_people(self) -> None:
         """Обновляет данные о выздоровевших людях."""
-        for week in range(1, 3):
-            self.infected[week] = self.infected[week + 1]
-        self.infected[3] = 0
+        self._infected.pop(0)
+        self._infected.append(0)
 
     def _spread_infection(self, month: int, government_factor: float = 0) -> None:
         """Моделирует распространение инфекции."""
-        def modeling_spread_infection() -> int:
-            seasonal_factor = W_MONTH(month)
-            city_factor =  W_TYPE_CITY(self.city_type)
-            transport_factor = self.transport
-            vaccine_effect = math.exp(-self.number_vaccinated / self.population * 5)
-            infection_growth = (self.number_infected / self.population) ** 0.5
-            infection_growth = government_factor if infection_growth == 0 else infection_growth
-
-            new_infected = int(
-                self.number_innocent *
-                BASE_RATE *
-                seasonal_factor *
-                transport_factor *
-                vaccine_effect *
-                infection_growth *
-                city_factor
-            )
-            new_infected = max(0, min(new_infected, self.number_innocent))
-            return new_infected
-
-        new_infected = modeling_spread_infection()
-        self.infected[3] += int(INFECTED_RATE_3_WEEKS * new_infected)
-        self.infected[2] += int(INFECTED_RATE_2_WEEKS * new_infected)
-        self.infected[1] += int(INFECTED_RATE_1_WEEKS * new_infected)
+        seasonal_factor = W_MONTH(month)
+        city_factor = self.city_type.weight
+        transport_factor = self.transport
+        number_vaccinated = sum(self._vaccinated)
+        number_infected = sum(self._infected)
+        vaccine_effect = math.exp(-number_vaccinated / self.population * 5)
+        infection_growth = (number_infected / self.population) ** 0.5
+        infection_growth = government_factor if infection_growth == 0 else infection_growth
+
+        number_innocent = self.population - number_infected - number_vaccinated
+        new_infected = int(
+            number_innocent *
+            BASE_RATE *
+            seasonal_factor *
+            transport_factor *
+            vaccine_effect *
+            infection_growth *
+            city_factor
+        )
+        new_infected = max(0, min(new_infected, number_innocent))
+        infected = self._infected
+        week_3, week_2, week_1 = infected.pop(), infected.pop(), infected.pop()
+        infected.extend((
+            week_1 + int(INFECTED_RATE_1_WEEKS * new_infected),
+            week_2 + int(INFECTED_RATE_2_WEEKS * new_infected),
+            week_3 + int(INFECTED_RATE_3_WEEKS * new_infected),
+        ))
 
     def update_state(self, month: int, number_vaccines: int, government_factor: float = 0) -> None:
         """Обновляет состояние города: вакцинация, распространение, выздоровление."""
@@ -0,0 +1,452 @@
+from .city import City, BASE_RATE, NUMBER_WEEKS, W_MONTH
+from .engine import EPIDEMIC_RATE, cohort_matrix, split_binomial
+from .mobility import MobilityNetwork
+from typing import Dict, List, Optional, TypedDict
+import math
+import numpy as np
+
+
+DAYS_PER_WEEK = 7
+
+
+class _CompartmentOptionalData(TypedDict, total=False):
+    max_step_days: int
+    step_tolerance: float
+
+
+class CompartmentData(_CompartmentOptionalData):
+    step_days: int
+    exposed_days: List[float]
+    infectious_days: List[float]
+    immunity_days: Optional[List[float]]
+    vaccine_days: Optional[List[float]]
+
+
+# Модель, близкая к исходной: недельный шаг, без скрытого периода и иммунитета,
+# болезнь длится 1, 2 или 3 недели, вакцина защищает 3 недели.
+WEEKLY_COMPARTMENTS: CompartmentData = {
+    'step_days': 7,
+    'exposed_days': [],
+    'infectious_days': [0] * 6 + [0.25] + [0] * 6 + [0.6] + [0] * 6 + [0.15],
+    'immunity_days': [],
+    'vaccine_days': [0] * 20 + [1],
+}
+
+# SEIR с ежедневным шагом и угасающим иммунитетом.
+SEIR_COMPARTMENTS: CompartmentData = {
+    'step_days': 1,
+    'exposed_days': [0, 0.2, 0.5, 0.2, 0.1],
+    'infectious_days': [0] * 4 + [0.1, 0.2, 0.3, 0.2, 0.1, 0.1],
+    'immunity_days': [0] * 150 + [1 / 60] * 60,
+    'vaccine_days': [0] * 150 + [1 / 60] * 60,
+}
+
+# Тот же SEIR с адаптивным шагом: до недели в спокойные периоды и по дню при росте вспышки.
+ADAPTIVE_SEIR_COMPARTMENTS: CompartmentData = {
+    **SEIR_COMPARTMENTS,
+    'max_step_days': 7,
+    'step_tolerance': 0.1,
+}
+
+
+def duration_steps(days: List[float], step_days: int) -> np.ndarray:
+    """
+    Переводит распределение длительности по дням в распределение по шагам.
+
+    :param days: Вероятности длительности 1, 2, ... дней.
+    :param step_days: Длительность шага в днях.
+    :return: Вероятности длительности 1, 2, ... шагов (длительность округляется вверх).
+    """
+    days = np.asarray(days, dtype=np.float64)
+    if np.any(days < 0) or days.sum() <= 0:
+        raise ValueError("duration distribution must be non-negative with a positive sum")
+    steps = np.zeros(math.ceil(len(days) / step_days))
+    np.add.at(steps, np.arange(len(days)) // step_days, days)
+    return steps / steps.sum()
+
+
+class CohortRing:
+    def __init__(self, durations: np.ndarray, number_cities: int) -> None:
+        """
+        Инициализация кольцевого буфера когорт по числу оставшихся шагов.
+
+        Строка (head + k - 1) % L хранит людей, покидающих состояние через k шагов,
+        поэтому сдвиг на шаг - это обнуление одной строки и перенос head, а не копирование.
+
+        :param durations: Распределение длительности пребывания по шагам.
+        :param number_cities: Число городов.
+        """
+        offsets = np.flatnonzero(durations)
+        self.first = int(offsets[0])
+        self.shares = durations[self.first:offsets[-1] + 1]
+        self.data = np.zeros((len(durations), number_cities))
+        self.total = np.zeros(number_cities)
+        self.head = 0
+
+    def pop(self, steps: int = 1) -> np.ndarray:
+        """
+        Сдвигает когорты на steps шагов и возвращает покинувших состояние.
+
+        :param steps: Число шагов.
+        """
+        rows = min(steps, len(self.data))
+        end = min(self.head + rows, len(self.data))
+        wrapped = self.head + rows - end
+        leaving = self.data[self.head:end].sum(axis=0)
+        self.data[self.head:end] = 0
+        if wrapped:
+            leaving += self.data[:wrapped].sum(axis=0)
+            self.data[:wrapped] = 0
+        self.head = (self.head + steps) % len(self.data)
+        # Итог ведётся нарастающим, поэтому ошибки округления не должны уводить его ниже нуля.
+        np.maximum(self.total - leaving, 0, out=self.total)
+        return leaving
+
+    def add(self, inflow: np.ndarray, rng: Optional[np.random.Generator] = None, elapsed: int = 0) -> None:
+        """
+        Распределяет поступивших по длительностям пребывания.
+
+        :param inflow: Число поступивших по городам.
+        :param rng: Генератор для случайного распределения (иначе - по ожиданию).
+        :param elapsed: Сколько шагов назад в среднем поступили люди (их сроки сокращаются,
+                        но не меньше чем до одного шага).
+        """
+        if rng is None:
+            parts = np.multiply.outer(self.shares, inflow)
+        else:
+            parts = split_binomial(rng, inflow.astype(np.int64), self.shares)
+        # Поступившие пишутся в подряд идущие строки, которые в кольце занимают не больше двух срезов.
+        start = (self.head + self.first - min(elapsed, self.first)) % len(self.data)
+        wrapped = max(0, start + len(self.shares) - len(self.data))
+        self.data[start:start + len(self.shares) - wrapped] += parts[:len(self.shares) - wrapped]
+        if wrapped:
+            self.data[:wrapped] += parts[len(self.shares) - wrapped:]
+        self.total += inflow
+
+    def place(self, steps: int, number: np.ndarray) -> None:
+        """Добавляет людей, покидающих состояние через steps шагов (не дальше длины буфера)."""
+        self.data[(self.head + min(steps, len(self.data)) - 1) % len(self.data)] += number
+        self.total += number
+
+    def by_steps(self) -> np.ndarray:
+        """Возвращает когорты, упорядоченные по числу оставшихся шагов (1, 2, ...)."""
+        return np.roll(self.data, -self.head, axis=0)
+
+
+class CompartmentEngine:
+    def __init__(self, population: np.ndarray, transport: np.ndarray, city_weight: np.ndarray,
+                 vaccinated: np.ndarray, infected: np.ndarray, compartments: CompartmentData,
+                 base_rate: float = BASE_RATE, mobility: Optional[MobilityNetwork] = None,
+                 rng: Optional[np.random.Generator] = None) -> None:
+        """
+        Инициализация движка с настраиваемой камерной моделью.
+
+        Состояния: восприимчивые (S), заражённые в скрытом периоде (E), больные (I),
+        переболевшие (R) и вакцинированные (V). Пребывание в E, I, R и V длится
+        случайное число шагов с заданными распределениями и хранится кольцевыми
+        буферами. Пустое распределение означает, что состояние пропускается
+        (для R и V - иммунитета нет), None - что оно бессрочно.
+
+        Вероятность заражения восприимчивого за шаг равна 1 - exp(-r * dt / 7),
+        где r - недельная скорость заражения исходной модели, а dt - шаг в днях,
+        так что модель согласована при любом шаге. Без rng состояния хранят
+        ожидаемые (дробные) числа людей, с rng - целые, разыгранные случайно.
+
+        Если в параметрах задан max_step_days, шаг адаптивный: в спокойные периоды
+        модель проходит до max_step_days дней за раз, а при быстром росте числа
+        заражённых (больше step_tolerance за шаг) - по одному шагу. Отчёт при этом
+        по-прежнему недельный.
+
+        :param population: Численность населения городов, форма (n,).
+        :param transport: Уровень транспорта городов, форма (n,).
+        :param city_weight: Вес типа города, форма (n,).
+        :param vaccinated: Начальные когорты вакцинированных по неделям, форма (3, n).
+        :param infected: Начальные когорты больных по неделям, форма (3, n).
+        :param compartments: Параметры камерной модели.
+        :param base_rate: Базовая скорость заражения.
+        :param mobility: Сеть перемещений между городами.
+        :param rng: Генератор случайных чисел для стохастических шагов.
+        """
+        step_days = compartments['step_days']
+        if step_days <= 0 or DAYS_PER_WEEK % step_days:
+            raise ValueError("step_days must divide a week")
+
+        self.population = np.asarray(population, dtype=np.int64)
+        self.transport = np.asarray(transport, dtype=np.float64)
+        self.city_weight = np.asarray(city_weight, dtype=np.float64)
+        self.base_rate = base_rate
+        self.mobility = mobility
+        self.rng = rng
+        self.compartments = compartments
+        self.step_days = step_days
+        self.max_steps = max(1, compartments.get('max_step_days', step_days) // step_days)
+        self.step_tolerance = compartments.get('step_tolerance', 0.05)
+        self.substeps = 0
+        self.external_imported: Optional[np.ndarray] = None
+
+        if mobility is not None and mobility.number_cities != len(self.population):
+            raise ValueError("mobility network must cover all cities")
+        if np.any(self.population <= 0):
+            raise ValueError("population must be positive")
+        if np.any((self.transport < 0) | (self.transport > 1)):
+            raise ValueError("transport must be in [0, 1]")
+
+        number_cities = len(self.population)
+
+        def ring(days: Optional[List[float]]) -> Optional[CohortRing]:
+            if not days:
+                return None
+            return CohortRing(duration_steps(days, step_days), number_cities)
+
+        if not compartments['infectious_days']:
+            raise ValueError("infectious_days cannot be empty")
+        self.exposed = ring(compartments['exposed_days'])
+        self.infectious = ring(compartments['infectious_days'])
+        self.recovered = ring(compartments['immunity_days'])
+        self.vaccinated_ring = ring(compartments['vaccine_days'])
+        self.permanent_recovered = np.zeros(number_cities)
+        self.permanent_vaccinated = np.zeros(number_cities)
+
+        vaccinated = np.asarray(vaccinated, dtype=np.float64).reshape(NUMBER_WEEKS, -1)
+        infected = np.asarray(infected, dtype=np.float64).reshape(NUMBER_WEEKS, -1)
+        for week in range(NUMBER_WEEKS):
+            steps = (week + 1) * DAYS_PER_WEEK // step_days
+            self.infectious.place(steps, infected[week])
+            if self.vaccinated_ring is not None:
+                self.vaccinated_ring.place(steps, vaccinated[week])
+            elif compartments['vaccine_days'] is None:
+                self.permanent_vaccinated += vaccinated[week]
+        # Без состояния V (пустое vaccine_days) вакцинированные остаются восприимчивыми.
+        self.susceptible = self.population - infected.sum(axis=0) - self._vaccinated_total()
+
+        self.epidemic = np.zeros(number_cities, dtype=bool)
+        self.invalidate()
+
+    @classmethod
+    def from_cities(cls, cities: List[City], compartments: CompartmentData, base_rate: float = BASE_RATE,
+                    type_weights: Optional[Dict[str, float]] = None,
+                    mobility: Optional[MobilityNetwork] = None,
+                    rng: Optional[np.random.Generator] = None) -> 'CompartmentEngine':
+        """
+        Создаёт движок по списку городов.
+
+        :param cities: Список городов.
+        :param compartments: Параметры камерной модели.
+        :param base_rate: Базовая скорость заражения.
+        :param type_weights: Веса типов городов (по умолчанию CityType.weight).
+        :param mobility: Сеть перемещений между городами.
+        :param rng: Генератор случайных чисел для стохастических шагов.
+        """
+        return cls(
+            population=[city.population for city in cities],
+            transport=[city.transport for city in cities],
+            city_weight=[city.city_type.weight if type_weights is None else type_weights[city.city_type]
+                         for city in cities],
+            vaccinated=cohort_matrix([city.vaccinated for city in cities]),
+            infected=cohort_matrix([city.infected for city in cities]),
+            compartments=compartments,
+            base_rate=base_rate,
+            mobility=mobility,
+            rng=rng,
+        )
+
+    def __len__(self) -> int:
+        return len(self.population)
+
+    def _vaccinated_total(self) -> np.ndarray:
+        """Возвращает число защищённых вакциной по городам."""
+        if self.vaccinated_ring is None:
+            return self.permanent_vaccinated
+        return self.vaccinated_ring.total
+
+    def _infected_total(self) -> np.ndarray:
+        """Возвращает число заражённых (E и I) по городам."""
+        if self.exposed is None:
+            return self.infectious.total
+        return self.exposed.total + self.infectious.total
+
+    def invalidate(self) -> None:
+        """Пересчитывает итоги по городам и государству и отмечает города с эпидемией."""
+        self.total_population = int(self.population.sum())
+        number_vaccinated = np.rint(self._vaccinated_total()).astype(np.int64)
+        number_infected = np.rint(self._infected_total()).astype(np.int64)
+        number_vaccinated.flags.writeable = False
+        number_infected.flags.writeable = False
+        self._number_vaccinated = number_vaccinated
+        self._number_infected = number_infected
+        self.total_vaccinated = int(number_vaccinated.sum())
+        self.total_infected = int(number_infected.sum())
+        self.epidemic |= number_infected / self.population >= EPIDEMIC_RATE
+        self.number_epidemic = int(self.epidemic.sum())
+
+    @property
+    def number_vaccinated(self) -> np.ndarray:
+        """Возвращает число вакцинированных по городам (только для чтения)."""
+        return self._number_vaccinated
+
+    @property
+    def number_infected(self) -> np.ndarray:
+        """Возвращает число заражённых по городам (только для чтения)."""
+        return self._number_infected
+
+    @property
+    def number_recovered(self) -> np.ndarray:
+        """Возвращает число переболевших с иммунитетом по городам."""
+        recovered = self.permanent_recovered if self.recovered is None else self.recovered.total
+        return np.rint(recovered).astype(np.int64)
+
+    @property
+    def number_innocent(self) -> np.ndarray:
+        """Возвращает число непривитых по городам."""
+        return self.population - self.number_infected - self.number_vaccinated
+
+    @property
+    def number_workers(self) -> np.ndarray:
+        """Возвращает число работающих людей по городам."""
+        return self.population - self.number_infected
+
+    def _infection_rate(self, month: int, government_factor: float, days: int) -> np.ndarray:
+        """
+        Возвращает недельную скорость заражения восприимчивых по городам.
+
+        :param month: Текущий месяц.
+        :param government_factor: Фактор государства.
+        :param days: Длительность шага в днях (для завоза из других городов).
+        """
+        infectious = self.infectious.total
+        if self.mobility is not None or self.external_imported is not None:
+            imported = 0 if self.external_imported is None else self.external_imported
+            if self.mobility is not None:
+                imported = imported + self.mobility.imported(infectious / self.population)
+                government_factor = 0
+            imported = imported * days / DAYS_PER_WEEK
+            infection_growth = np.sqrt(np.minimum(infectious + imported, self.population) / self.population)
+        else:
+            infection_growth = np.sqrt(infectious / self.population)
+        infection_growth = np.where(infection_growth == 0, government_factor, infection_growth)
+        vaccine_effect = np.exp(-self._vaccinated_total() / self.population * 5)
+        return self.base_rate * W_MONTH(month) * self.transport * vaccine_effect * infection_growth * self.city_weight
+
+    def advance(self, month: int, vaccines: np.ndarray, government_factor: float = 0, steps: int = 1) -> None:
+        """
+        Продвигает модель на steps шагов одним проходом.
+
+        Скорость заражения вычисляется один раз в начале прохода. Короткие состояния
+        (E и I) сдвигаются каждый шаг, а долгие (R и V) - сразу на весь проход:
+        выбывшие из них снимаются в начале, а переболевшие добавляются в конце
+        так, как будто пришли в середине прохода. Поэтому при steps > 1 сроки
+        иммунитета смещаются не больше чем на половину прохода.
+
+        :param month: Текущий месяц.
+        :param vaccines: Число вакцин для каждого города.
+        :param government_factor: Фактор государства.
+        :param steps: Число шагов модели.
+        """
+        rng = self.rng
+
+        if self.vaccinated_ring is not None:
+            self.susceptible = self.susceptible + self.vaccinated_ring.pop(steps)
+        if self.recovered is not None:
+            self.susceptible += self.recovered.pop(steps)
+        recovered = np.zeros(len(self))
+        for step in range(steps):
+            recovering = self.infectious.pop()
+            if self.recovered is not None or self.compartments['immunity_days'] is None:
+                recovered += recovering
+            else:
+                self.susceptible += recovering
+            if self.exposed is not None:
+                self.infectious.add(self.exposed.pop(), rng)
+
+            if step == 0:
+                if self.vaccinated_ring is not None or self.compartments['vaccine_days'] is None:
+                    given = np.minimum(vaccines, self.susceptible)
+                    self.susceptible -= given
+                    if self.vaccinated_ring is not None:
+                        self.vaccinated_ring.add(given, rng, steps - 1)
+                    else:
+                        self.permanent_vaccinated += given
+                rate = self._infection_rate(month, government_factor, self.step_days)
+                probability = -np.expm1(-rate * self.step_days / DAYS_PER_WEEK)
+
+            if rng is None:
+                new_infected = self.susceptible * probability
+            else:
+                new_infected = rng.binomial(self.susceptible.astype(np.int64), probability).astype(np.float64)
+            self.susceptible -= new_infected
+            (self.exposed if self.exposed is not None else self.infectious).add(new_infected, rng)
+            self.epidemic |= (self._infected_total() / self.population) >= EPIDEMIC_RATE
+
+        if self.recovered is not None:
+            # Выздоровевшие за проход считаются пришедшими в его середине.
+            self.recovered.add(recovered, rng, (steps - 1) // 2)
+        else:
+            self.permanent_recovered += recovered
+        self.substeps += 1
+
+    def _choose_steps(self, month: int, government_factor: float, remaining: int) -> int:
+        """
+        Выбирает число шагов модели для следующего прохода.
+
+        Изменение числа заражённых за шаг (новые случаи минус выздоравливающие)
+        относительно их числа оценивается по текущей скорости заражения; шаг
+        берётся наибольшим, при котором это изменение по всем городам не превышает step_tolerance.
+
+        :param month: Текущий месяц.
+        :param government_factor: Фактор государства.
+        :param remaining: Число шагов до конца недели.
+        """
+        if self.max_steps == 1:
+            return 1
+        rate = self._infection_rate(month, government_factor, self.step_days)
+        new_infected = self.susceptible * -np.expm1(-rate * self.step_days / DAYS_PER_WEEK)
+        recovering = self.infectious.data[self.infectious.head]
+        growth = float(np.max(np.abs(new_infected - recovering) / (self._infected_total() + 1), initial=0))
+        steps = self.max_steps if growth == 0 else int(self.step_tolerance / growth)
+        return max(1, min(steps, self.max_steps, remaining))
+
+    def update_state(self, month: int, vaccines: np.ndarray, government_factor: float = 0,
+                     imported: Optional[np.ndarray] = None) -> None:
+        """
+        Обновляет состояние всех городов за одну неделю (интервал отчёта).
+        Неделя проходится шагами модели, а при заданном max_step_days - проходами
+        переменной длины, не пересекающими границу недели. Вакцины выдаются в первый проход.
+
+        :param month: Текущий месяц.
+        :param vaccines: Число вакцин для каждого города, форма (n,).
+        :param government_factor: Фактор государства.
+        :param imported: Число заболевших, прибывающих в города извне за неделю
+                         (распределяется по шагам недели пропорционально их длительности).
+        """
+        self.external_imported = imported
+        vaccines = np.asarray(vaccines, dtype=np.float64)
+        remaining = DAYS_PER_WEEK // self.step_days
+        while remaining:
+            steps = self._choose_steps(month, government_factor, remaining)
+            self.advance(month, vaccines, government_factor, steps)
+            vaccines = 0
+            remaining -= steps
+        self.invalidate()
+
+    def write_cities(self, cities: List[City]) -> None:
+        """
+        Переносит состояние в объекты городов, группируя когорты по неделям до выхода
+        (всё, что дольше трёх недель, относится к третьей).
+        """
+        def weekly(ring: Optional[CohortRing], permanent: np.ndarray) -> np.ndarray:
+            cohorts = np.zeros((NUMBER_WEEKS, len(self)))
+            if ring is None:
+                cohorts[-1] = permanent
+                return cohorts
+            weeks = np.minimum(np.arange(len(ring.data)) * self.step_days // DAYS_PER_WEEK, NUMBER_WEEKS - 1)
+            np.add.at(cohorts, weeks, ring.by_steps())
+            return cohorts
+
+        infected = weekly(self.infectious, 0)
+        if self.exposed is not None:
+            infected[-1] += self.exposed.total
+        vaccinated = weekly(self.vaccinated_ring, self.permanent_vaccinated)
+        for city, city_vaccinated, city_infected in zip(cities, np.rint(vaccinated).astype(np.int64).T.tolist(),
+                                                        np.rint(infected).astype(np.int64).T.tolist()):
+            city.vaccinated = city_vaccinated
+            city.infected = city_infected
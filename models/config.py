@@ -78,6 +78,24 @@ city_10 = {
     'number_vaccinated': 0,
     'number_infected': 0,
 }
+# Потоки людей между городами за неделю (ключ 'mobility_data' в параметрах государства).
+mobility_data = [
+    {'origin': 'Москва', 'destination': 'Санкт-Петербург', 'flow': 40},
+    {'origin': 'Санкт-Петербург', 'destination': 'Москва', 'flow': 40},
+    {'origin': 'Москва', 'destination': 'Казань', 'flow': 15},
+    {'origin': 'Казань', 'destination': 'Москва', 'flow': 15},
+    {'origin': 'Москва', 'destination': 'Нижнний Новгород', 'flow': 20},
+    {'origin': 'Нижнний Новгород', 'destination': 'Москва', 'flow': 20},
+    {'origin': 'Казань', 'destination': 'Самара', 'flow': 10},
+    {'origin': 'Самара', 'destination': 'Казань', 'flow': 10},
+    {'origin': 'Екатеринбург', 'destination': 'Пермь', 'flow': 12},
+    {'origin': 'Пермь', 'destination': 'Екатеринбург', 'flow': 12},
+    {'origin': 'Екатеринбург', 'destination': 'Омск', 'flow': 8},
+    {'origin': 'Омск', 'destination': 'Новосибирск', 'flow': 10},
+    {'origin': 'Новосибирск', 'destination': 'Омск', 'flow': 10},
+    {'origin': 'Москва', 'destination': 'Ростов на Дону', 'flow': 10},
+    {'origin': 'Ростов на Дону', 'destination': 'Москва', 'flow': 10},
+]
 government_data = {
     'name': 'Россия',
     'budget': 1000,
@@ -0,0 +1,247 @@
+from .mobility import MobilityNetwork
+from .city import (
+    City, Cohort, BASE_RATE, NUMBER_WEEKS, W_MONTH,
+    INFECTED_RATE_3_WEEKS, INFECTED_RATE_2_WEEKS, INFECTED_RATE_1_WEEKS,
+)
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+
+
+EPIDEMIC_RATE = 0.45
+INFECTED_RATES = (INFECTED_RATE_1_WEEKS, INFECTED_RATE_2_WEEKS, INFECTED_RATE_3_WEEKS)
+
+
+def cohort_matrix(cohorts: List[Cohort]) -> np.ndarray:
+    """Собирает когорты городов в массив формы (3, число городов), склеивая их буферы без разбора по элементам."""
+    return np.frombuffer(b''.join(cohorts), dtype=np.int64).reshape(-1, NUMBER_WEEKS).T
+
+
+def cohort_sum(cohort: np.ndarray) -> np.ndarray:
+    """Суммирует когорты по неделям (ось -2)."""
+    total = cohort[..., 0, :].copy()
+    for week in range(1, cohort.shape[-2]):
+        total += cohort[..., week, :]
+    return total
+
+
+def split_binomial(rng: np.random.Generator, counts: np.ndarray, shares) -> List[np.ndarray]:
+    """
+    Случайно делит counts на части с долями shares (мультиномиальное распределение,
+    разыгранное последовательными биномиальными выборками).
+
+    :param rng: Генератор случайных чисел.
+    :param counts: Делимые числа.
+    :param shares: Доли частей (в сумме 1).
+    :return: Части в порядке shares; последняя получает остаток.
+    """
+    parts, remaining, share = [], counts, 1.0
+    for rate in shares[:-1]:
+        added = rng.binomial(remaining, min(1.0, rate / share))
+        parts.append(added)
+        remaining, share = remaining - added, share - rate
+    parts.append(remaining)
+    return parts
+
+
+def advance_week(population: np.ndarray, transport: np.ndarray, city_weight: np.ndarray,
+                 vaccinated: np.ndarray, infected: np.ndarray, vaccines: np.ndarray,
+                 month: int, government_factor: Union[float, np.ndarray] = 0,
+                 base_rate: Union[float, np.ndarray] = BASE_RATE,
+                 imported: Optional[np.ndarray] = None,
+                 rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Продвигает на неделю массивы когорт всех городов (на месте).
+
+    Повторяет City._allocate_vaccines, City._recover_people и City._spread_infection,
+    включая усечение int(). Когорты хранятся по неделям: строка k массива формы (3, n)
+    соответствует неделе k + 1, так что сдвиг и суммы идут по непрерывным строкам.
+    Допускаются ведущие измерения (например, реплики): форма когорт (..., 3, n).
+
+    Со случайным генератором rng шаг стохастический: каждый непривитый заражается
+    с вероятностью, равной скорости заражения (не больше 1), а длительность болезни
+    заболевшего (1, 2 или 3 недели, то есть срок выздоровления) выбирается с долями
+    INFECTED_RATES. Поэтому новые случаи возможны и там, где усечение дало бы ноль,
+    а среднее совпадает с детерминированной моделью без усечения.
+
+    :param population: Численность населения городов.
+    :param transport: Уровень транспорта городов.
+    :param city_weight: Вес типа города (CityType.weight).
+    :param vaccinated: Когорты вакцинированных.
+    :param infected: Когорты заболевших.
+    :param vaccines: Число вакцин для каждого города.
+    :param month: Текущий месяц.
+    :param government_factor: Фактор государства (скаляр или массив формы (..., n)).
+    :param base_rate: Базовая скорость заражения (скаляр или массив формы (..., 1)).
+    :param imported: Число заболевших, прибывших в города из других городов.
+    :param rng: Генератор случайных чисел для стохастического шага.
+    :return: Новые числа вакцинированных и заболевших по городам.
+    """
+    number_innocent = population - cohort_sum(infected) - cohort_sum(vaccinated)
+    vaccinated[..., :-1, :] = vaccinated[..., 1:, :]
+    vaccinated[..., -1, :] = np.minimum(vaccines, number_innocent)
+
+    infected[..., :-1, :] = infected[..., 1:, :]
+    infected[..., -1, :] = 0
+
+    number_vaccinated = cohort_sum(vaccinated)
+    number_infected = cohort_sum(infected)
+    number_innocent = population - number_infected - number_vaccinated
+
+    vaccine_effect = np.exp(-number_vaccinated / population * 5)
+    if imported is None:
+        infection_growth = np.sqrt(number_infected / population)
+    else:
+        infection_growth = np.sqrt(np.minimum(number_infected + imported, population) / population)
+    infection_growth = np.where(infection_growth == 0, government_factor, infection_growth)
+
+    if rng is None:
+        new_infected = np.trunc(
+            number_innocent *
+            base_rate *
+            W_MONTH(month) *
+            transport *
+            vaccine_effect *
+            infection_growth *
+            city_weight
+        ).astype(np.int64)
+        new_infected = np.maximum(0, np.minimum(new_infected, number_innocent))
+        durations = [np.trunc(rate * new_infected).astype(np.int64) for rate in INFECTED_RATES]
+    else:
+        probability = np.clip(
+            base_rate * W_MONTH(month) * transport * vaccine_effect * infection_growth * city_weight, 0, 1)
+        new_infected = rng.binomial(number_innocent, probability)
+        durations = split_binomial(rng, new_infected, INFECTED_RATES)
+
+    for week, added in enumerate(durations):
+        infected[..., week, :] += added
+        number_infected += added
+
+    return number_vaccinated, number_infected
+
+
+class CitiesEngine:
+    def __init__(self, population: np.ndarray, transport: np.ndarray, city_weight: np.ndarray,
+                 vaccinated: np.ndarray, infected: np.ndarray, base_rate: float = BASE_RATE,
+                 mobility: Optional[MobilityNetwork] = None, rng: Optional[np.random.Generator] = None) -> None:
+        """
+        Инициализация движка, хранящего состояние всех городов в массивах.
+
+        :param population: Численность населения городов, форма (n,).
+        :param transport: Уровень транспорта городов, форма (n,).
+        :param city_weight: Вес типа города, форма (n,).
+        :param vaccinated: Когорты вакцинированных, форма (3, n), строка k - неделя k + 1.
+        :param infected: Когорты заболевших, форма (3, n), строка k - неделя k + 1.
+        :param base_rate: Базовая скорость заражения.
+        :param mobility: Сеть перемещений между городами.
+        :param rng: Генератор случайных чисел; с ним шаги стохастические (см. advance_week).
+        """
+        self.population = np.asarray(population, dtype=np.int64)
+        self.transport = np.asarray(transport, dtype=np.float64)
+        self.city_weight = np.asarray(city_weight, dtype=np.float64)
+        self.vaccinated = np.array(vaccinated, dtype=np.int64).reshape(NUMBER_WEEKS, -1)
+        self.infected = np.array(infected, dtype=np.int64).reshape(NUMBER_WEEKS, -1)
+        self.base_rate = base_rate
+        self.mobility = mobility
+        self.rng = rng
+
+        if mobility is not None and mobility.number_cities != len(self.population):
+            raise ValueError("mobility network must cover all cities")
+        if np.any(self.population <= 0):
+            raise ValueError("population must be positive")
+        if np.any((self.transport < 0) | (self.transport > 1)):
+            raise ValueError("transport must be in [0, 1]")
+
+        self.epidemic = np.zeros(len(self.population), dtype=bool)
+        self.invalidate()
+
+    @classmethod
+    def from_cities(cls, cities: List[City], base_rate: float = BASE_RATE,
+                    type_weights: Optional[Dict[str, float]] = None,
+                    mobility: Optional[MobilityNetwork] = None,
+                    rng: Optional[np.random.Generator] = None) -> 'CitiesEngine':
+        """
+        Создаёт движок по списку городов.
+
+        :param cities: Список городов.
+        :param base_rate: Базовая скорость заражения.
+        :param type_weights: Веса типов городов (по умолчанию CityType.weight).
+        :param mobility: Сеть перемещений между городами.
+        :param rng: Генератор случайных чисел для стохастических шагов.
+        """
+        return cls(
+            population=[city.population for city in cities],
+            transport=[city.transport for city in cities],
+            city_weight=[city.city_type.weight if type_weights is None else type_weights[city.city_type]
+                         for city in cities],
+            vaccinated=cohort_matrix([city.vaccinated for city in cities]),
+            infected=cohort_matrix([city.infected for city in cities]),
+            base_rate=base_rate,
+            mobility=mobility,
+            rng=rng,
+        )
+
+    def __len__(self) -> int:
+        return len(self.population)
+
+    def _set_totals(self, number_vaccinated: np.ndarray, number_infected: np.ndarray) -> None:
+        """Запоминает итоги по городам и государству и отмечает города с эпидемией."""
+        number_vaccinated.flags.writeable = False
+        number_infected.flags.writeable = False
+        self._number_vaccinated = number_vaccinated
+        self._number_infected = number_infected
+        self.total_vaccinated = int(number_vaccinated.sum())
+        self.total_infected = int(number_infected.sum())
+        self.epidemic |= number_infected / self.population >= EPIDEMIC_RATE
+        self.number_epidemic = int(self.epidemic.sum())
+
+    def invalidate(self) -> None:
+        """Пересчитывает кэшированные итоги после изменения массивов извне."""
+        self.total_population = int(self.population.sum())
+        self._set_totals(cohort_sum(self.vaccinated), cohort_sum(self.infected))
+
+    @property
+    def number_vaccinated(self) -> np.ndarray:
+        """Возвращает число вакцинированных по городам (только для чтения)."""
+        return self._number_vaccinated
+
+    @property
+    def number_infected(self) -> np.ndarray:
+        """Возвращает число заболевших по городам (только для чтения)."""
+        return self._number_infected
+
+    @property
+    def number_innocent(self) -> np.ndarray:
+        """Возвращает число непривитых по городам."""
+        return self.population - self.number_infected - self.number_vaccinated
+
+    @property
+    def number_workers(self) -> np.ndarray:
+        """Возвращает число работающих людей по городам."""
+        return self.population - self.number_infected
+
+    def update_state(self, month: int, vaccines: np.ndarray, government_factor: float = 0,
+                     imported: Optional[np.ndarray] = None) -> None:
+        """
+        Обновляет состояние всех городов за одну неделю.
+
+        Если задана сеть перемещений, к заболевшим города добавляются прибывшие
+        из соседних городов, а фактор государства не используется.
+
+        :param month: Текущий месяц.
+        :param vaccines: Число вакцин для каждого города, форма (n,).
+        :param government_factor: Фактор государства.
+        :param imported: Число заболевших, прибывающих в города извне (например, из других стран).
+        """
+        if self.mobility is not None:
+            domestic = self.mobility.imported(self._number_infected / self.population)
+            imported = domestic if imported is None else domestic + imported
+            government_factor = 0
+        self._set_totals(*advance_week(self.population, self.transport, self.city_weight,
+                                       self.vaccinated, self.infected, np.asarray(vaccines, dtype=np.int64),
+                                       month, government_factor, self.base_rate, imported, self.rng))
+
+    def write_cities(self, cities: List[City]) -> None:
+        """Переносит состояние когорт из массивов в объекты городов."""
+        for city, vaccinated, infected in zip(cities, self.vaccinated.T.tolist(), self.infected.T.tolist()):
+            city.vaccinated = vaccinated
+            city.infected = infected
@@ -0,0 +1,167 @@
+from .government import Government
+from typing import Dict, List, Optional
+import csv
+import json
+import numpy as np
+import os
+
+
+EXPORT_FORMATS = ('parquet', 'csv', 'ndjson')
+EXPORT_COLUMNS = ('step', 'name', 'population', 'number_vaccinated', 'number_infected',
+                  'number_innocent', 'number_workers', 'budget', 'number_epidemic_cities')
+EXPORT_SUFFIXES = {'.parquet': 'parquet', '.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+
+
+def step_columns(step: int, government: Government) -> Dict[str, np.ndarray]:
+    """
+    Возвращает статистику шага в виде столбцов: строка на каждый город,
+    показатели государства (бюджет, число городов с эпидемией) повторяются в каждой строке.
+
+    :param step: Номер шага.
+    :param government: Государство.
+    """
+    engine = government.engine
+    number_cities = len(engine)
+    return {
+        'step': np.full(number_cities, step, dtype=np.int64),
+        'name': government.names,
+        'population': engine.population,
+        'number_vaccinated': engine.number_vaccinated,
+        'number_infected': engine.number_infected,
+        'number_innocent': engine.number_innocent,
+        'number_workers': engine.number_workers,
+        'budget': np.full(number_cities, government.budget, dtype=np.int64),
+        'number_epidemic_cities': np.full(number_cities, government.number_epidemic_cities, dtype=np.int64),
+    }
+
+
+class HistoryWriter:
+    """Потоковая запись статистики по шагам в файл: в памяти держится не больше одной порции."""
+
+    def write(self, step: int, government: Government) -> None:
+        """
+        Дописывает статистику шага.
+
+        :param step: Номер шага.
+        :param government: Государство после шага.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Дописывает буферы и закрывает файл."""
+        raise NotImplementedError
+
+    def __enter__(self) -> 'HistoryWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class CsvWriter(HistoryWriter):
+    def __init__(self, path: str) -> None:
+        """
+        Инициализация записи в CSV: строка на каждый город и шаг.
+
+        :param path: Путь к файлу.
+        """
+        self.file = open(path, 'w', encoding='utf-8', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(EXPORT_COLUMNS)
+
+    def write(self, step: int, government: Government) -> None:
+        columns = step_columns(step, government)
+        self.writer.writerows(zip(*(columns[name] if name == 'name' else columns[name].tolist()
+                                    for name in EXPORT_COLUMNS)))
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class NdjsonWriter(HistoryWriter):
+    def __init__(self, path: str) -> None:
+        """
+        Инициализация записи в NDJSON: строка на каждый шаг в формате Government.get_statistics
+        с дополнительным полем step.
+
+        :param path: Путь к файлу.
+        """
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, step: int, government: Government) -> None:
+        statistics = government.get_statistics()
+        json.dump({'step': step, **statistics}, self.file, ensure_ascii=False)
+        self.file.write('\n')
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ParquetWriter(HistoryWriter):
+    def __init__(self, path: str, chunk_rows: int = 65536) -> None:
+        """
+        Инициализация записи в Parquet (нужен пакет pyarrow).
+
+        Строки копятся в буфере и записываются группами строк не меньше chunk_rows,
+        поэтому файл читается по частям, а память ограничена размером буфера.
+
+        :param path: Путь к файлу.
+        :param chunk_rows: Число строк в группе.
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow; use CSV or NDJSON instead") from None
+        self.pyarrow = pyarrow
+        self.chunk_rows = chunk_rows
+        self.schema = pyarrow.schema([(name, pyarrow.string() if name == 'name' else pyarrow.int64())
+                                      for name in EXPORT_COLUMNS])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+        self.buffer: List[Dict[str, np.ndarray]] = []
+        self.buffered_rows = 0
+
+    def write(self, step: int, government: Government) -> None:
+        columns = step_columns(step, government)
+        self.buffer.append(columns)
+        self.buffered_rows += len(columns['step'])
+        if self.buffered_rows >= self.chunk_rows:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Записывает буфер группой строк."""
+        if not self.buffer:
+            return
+        arrays = [self.pyarrow.array([name for columns in self.buffer for name in columns['name']],
+                                     self.pyarrow.string())
+                  if name == 'name' else
+                  self.pyarrow.array(np.concatenate([columns[name] for columns in self.buffer]), self.pyarrow.int64())
+                  for name in EXPORT_COLUMNS]
+        self.writer.write_table(self.pyarrow.Table.from_arrays(arrays, schema=self.schema))
+        self.buffer = []
+        self.buffered_rows = 0
+
+    def close(self) -> None:
+        self._flush()
+        self.writer.close()
+
+
+def open_writer(path: str, format: Optional[str] = None, chunk_rows: int = 65536) -> HistoryWriter:
+    """
+    Открывает потоковую запись статистики.
+
+    :param path: Путь к файлу.
+    :param format: 'parquet', 'csv' или 'ndjson'; по умолчанию определяется по расширению файла.
+    :param chunk_rows: Число строк в группе для Parquet.
+    """
+    if format is None:
+        format = EXPORT_SUFFIXES.get(os.path.splitext(path)[1].lower())
+        if format is None:
+            raise ValueError(f"Cannot infer export format from {path!r}; expected one of {', '.join(EXPORT_SUFFIXES)}")
+    if format == 'parquet':
+        return ParquetWriter(path, chunk_rows)
+    if format == 'csv':
+        return CsvWriter(path)
+    if format == 'ndjson':
+        return NdjsonWriter(path)
+    raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
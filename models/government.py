@@ -1,5 +1,10 @@
-from .city import City, CityData, CityStatisticsData
-from typing import List, Dict, TypedDict
+from .city import City, CityData, CityStatisticsData, CityType, BASE_RATE
+from .compartments import CompartmentData, CompartmentEngine
+from .engine import CitiesEngine
+from .mobility import MobilityData, MobilityNetwork
+from .regions import RegionData, Regions
+from typing import List, Dict, Optional, Tuple, TypedDict, Union
+import numpy as np
 
 
 TAX_PER_PRESON = 1.5
@@ -26,7 +31,13 @@ class StatisticsData(TypedDict):
 
 
 class Government:
-    def __init__(self, name: str, budget: int, vaccine_cost: int, cities_data: List[CityData]) -> None:
+    def __init__(self, name: str, budget: int, vaccine_cost: int, cities_data: List[CityData],
+                 base_rate: float = BASE_RATE, type_weights: Optional[Dict[str, float]] = None,
+                 mobility_data: Optional[List[MobilityData]] = None,
+                 stochastic: bool = False, seed: Optional[int] = None,
+                 compartments: Optional[CompartmentData] = None,
+                 regions_data: Optional[List[RegionData]] = None,
+                 tax_per_person: float = TAX_PER_PRESON, tax_rate_payment: float = TAX_RATE_PAYMENT) -> None:
         """
         Инициализация государства.
 
@@ -34,7 +45,76 @@ class Government:
         :param budget: Бюджет на вакцинацию.
         :param vaccine_cost: Стоимость одной вакцины.
         :param cities_data: Список параметров городов.
+        :param base_rate: Базовая скорость заражения.
+        :param type_weights: Веса типов городов (по умолчанию CityType.weight).
+        :param mobility_data: Потоки людей между городами; если заданы, заражение
+                              из других городов идёт по ним, а не через фактор государства.
+        :param stochastic: Стохастический режим: новые случаи и сроки болезни разыгрываются случайно.
+        :param seed: Зерно генератора случайных чисел стохастического режима.
+        :param compartments: Параметры камерной модели (например, SEIR_COMPARTMENTS);
+                             по умолчанию используется исходная недельная модель.
+        :param regions_data: Регионы с собственными бюджетами. Если заданы они или регионы
+                             у городов, заражение извне города идёт через фактор его региона,
+                             а вакцины оплачиваются сначала из бюджета региона.
+                             Города без региона относятся к региону с названием государства.
+        :param tax_per_person: Налог с одного работающего за неделю.
+        :param tax_rate_payment: Доля собираемых налогов.
         """
+        cities = [City(**params) for params in cities_data]
+        names = [city.name for city in cities]
+        mobility = None if mobility_data is None else MobilityNetwork.from_data(mobility_data, names)
+        rng = np.random.default_rng(seed) if stochastic else None
+        if compartments is None:
+            engine = CitiesEngine.from_cities(cities, base_rate, type_weights, mobility, rng)
+        else:
+            engine = CompartmentEngine.from_cities(cities, compartments, base_rate, type_weights, mobility, rng)
+        self._setup(name, budget, vaccine_cost, engine, names, [city.city_type for city in cities],
+                    [city.coordinates for city in cities], [city.region for city in cities],
+                    regions_data, tax_per_person, tax_rate_payment)
+
+    @classmethod
+    def from_engine(cls, name: str, budget: int, vaccine_cost: int, engine: Union[CitiesEngine, CompartmentEngine],
+                    names: List[str], cities_type: List[str],
+                    coordinates: Optional[List[Optional[Tuple[float, float]]]] = None,
+                    cities_region: Optional[List[Optional[str]]] = None,
+                    regions_data: Optional[List[RegionData]] = None,
+                    tax_per_person: float = TAX_PER_PRESON, tax_rate_payment: float = TAX_RATE_PAYMENT) -> 'Government':
+        """
+        Создаёт государство по готовому движку, не строя объекты городов
+        (например, при восстановлении контрольной точки).
+
+        :param name: Название государства.
+        :param budget: Бюджет на вакцинацию.
+        :param vaccine_cost: Стоимость одной вакцины.
+        :param engine: Движок с состоянием городов.
+        :param names: Названия городов в порядке движка.
+        :param cities_type: Типы городов.
+        :param coordinates: Положение городов на карте (None - встроенная схема).
+        :param cities_region: Регионы городов (None - без региона).
+        :param regions_data: Регионы с собственными бюджетами.
+        :param tax_per_person: Налог с одного работающего за неделю.
+        :param tax_rate_payment: Доля собираемых налогов.
+        """
+        number_cities = len(names)
+        if len(engine) != number_cities or len(cities_type) != number_cities:
+            raise ValueError("engine, names and cities_type must describe the same cities")
+        types = CityType._value2member_map_
+        unknown = [value for value in set(cities_type) if value not in types]
+        if unknown:
+            raise ValueError(f"Unknown city types: {', '.join(map(str, unknown))}")
+        government = cls.__new__(cls)
+        government._setup(name, budget, vaccine_cost, engine, list(names), [types[value] for value in cities_type],
+                          [None] * number_cities if coordinates is None else
+                          [None if point is None else tuple(point) for point in coordinates],
+                          [None] * number_cities if cities_region is None else list(cities_region),
+                          regions_data, tax_per_person, tax_rate_payment)
+        return government
+
+    def _setup(self, name: str, budget: int, vaccine_cost: int, engine: Union[CitiesEngine, CompartmentEngine],
+               names: List[str], cities_type: List[CityType], coordinates: List[Optional[Tuple[float, float]]],
+               cities_region: List[Optional[str]], regions_data: Optional[List[RegionData]],
+               tax_per_person: float, tax_rate_payment: float) -> None:
+        """Заполняет состояние государства по движку и описаниям городов."""
         if budget < 0:
             raise ValueError("Budget cannot be negative")
         if vaccine_cost <= 0:
@@ -43,72 +123,148 @@ class Government:
         self.name = name
         self.budget = budget
         self.vaccine_cost = vaccine_cost
-        self.cities = [City(**params) for params in cities_data]
+        self.tax_per_person = tax_per_person
+        self.tax_rate_payment = tax_rate_payment
+        self._cities_snapshot: Optional[Tuple[City, ...]] = None
+        self.names = names
+        self.cities_type = cities_type
+        self.coordinates = coordinates
+        self.cities_region = cities_region
+        self.engine = engine
         self.government_factor = (self.number_infected / self.population) ** 0.5
-        self.epidemic_citites: Dict[str, bool] = {city.name: False for city in self.cities}
+        self.regions: Optional[Regions] = None
+        if regions_data is not None or any(region is not None for region in self.cities_region):
+            self.regions = Regions([self.name if region is None else region for region in self.cities_region],
+                                   self.engine.population, regions_data)
+            self._update_regions()
+
+    @property
+    def cities(self) -> Tuple[City, ...]:
+        """
+        Возвращает снимок городов с состоянием, перенесённым из движка.
+
+        Состояние хранится в движке, поэтому снимок только для чтения: это кортеж
+        (а не список) городов, которые строятся при первом обращении после шага
+        и переиспользуются до следующего шага. Их изменения не влияют на моделирование.
+        """
+        if self._cities_snapshot is None:
+            engine = self.engine
+            cities = [City(name, city_type, population, transport, coordinates=coordinates, region=region)
+                      for name, city_type, population, transport, coordinates, region in zip(
+                          self.names, self.cities_type, engine.population.tolist(), engine.transport.tolist(),
+                          self.coordinates, self.cities_region)]
+            engine.write_cities(cities)
+            self._cities_snapshot = tuple(cities)
+        return self._cities_snapshot
+
+    def _vaccines_array(self, vaccines: Union[Dict[str, int], np.ndarray]) -> np.ndarray:
+        """Приводит распределение вакцин к массиву в порядке городов."""
+        if isinstance(vaccines, dict):
+            return np.array([vaccines.get(name, 0) for name in self.names], dtype=np.int64)
+        vaccines = np.asarray(vaccines, dtype=np.int64)
+        if vaccines.shape != (len(self.names),):
+            raise ValueError("vaccines must contain one value per city")
+        return vaccines
 
     def _update_budget(self) -> None:
         """Обновляет бюджет с учётом оплаты налогов."""
-        self.budget += int(TAX_RATE_PAYMENT * TAX_PER_PRESON * sum(city.number_workers for city in self.cities))
+        self.budget += int(self.tax_rate_payment * self.tax_per_person * self.number_workers)
 
-    def _update_cities_state(self, month: int, vaccines: Dict[str, int]) -> None:
+    def _update_cities_state(self, month: int, vaccines: Union[Dict[str, int], np.ndarray],
+                             imported: Optional[np.ndarray] = None, paid: bool = False) -> None:
         """
         Обновляет состояние всех городов, распределяя вакцины и моделируя заражение.
 
         :param month: Текущий месяц.
-        :param vaccines: Распределение вакцин по городам {"город": кол-во вакцин}.
+        :param vaccines: Распределение вакцин по городам {"город": кол-во вакцин}
+                         или массив в порядке городов.
+        :param imported: Число заболевших, прибывающих в города из-за границы.
+        :param paid: Вакцины уже оплачены (например, при заказе в цепочке поставок).
         """
-        for city in self.cities:
-            num_vaccines = vaccines.get(city.name, 0)
-            if self.budget < num_vaccines * self.vaccine_cost:
-                raise ValueError(f"Недостаточно бюджета для распределения {num_vaccines} вакцин в городе {city.name}. \
-                                 Требуется: {num_vaccines * self.vaccine_cost}, доступно: {self.budget}")
-            self.budget -= num_vaccines * self.vaccine_cost
-            city.update_state(month, num_vaccines, self.government_factor)
-
-    def update_state(self, month: int, vaccines: Dict[str, int]) -> None:
+        vaccines = self._vaccines_array(vaccines)
+        if not paid:
+            self._pay_vaccines(vaccines)
+        self.engine.update_state(month, vaccines, self.infection_factor(), imported)
+        self._cities_snapshot = None
+
+    def _pay_vaccines(self, vaccines: np.ndarray) -> None:
+        """Оплачивает вакцины из бюджета (при заданных регионах - сначала из бюджетов регионов)."""
+        if self.regions is not None:
+            self._pay_regions(vaccines)
+            return
+        costs = np.cumsum(vaccines * self.vaccine_cost)
+        if len(costs) and costs[-1] > self.budget:
+            index = int(np.argmax(costs > self.budget))
+            num_vaccines = int(vaccines[index])
+            available = self.budget - (int(costs[index - 1]) if index else 0)
+            raise ValueError(f"Недостаточно бюджета для распределения {num_vaccines} вакцин в городе {self.names[index]}. \
+                             Требуется: {num_vaccines * self.vaccine_cost}, доступно: {available}")
+        self.budget -= int(costs[-1]) if len(costs) else 0
+
+    def _pay_regions(self, vaccines: np.ndarray) -> None:
+        """Оплачивает вакцины из бюджетов регионов, а недостающее - из бюджета государства."""
+        costs = vaccines * self.vaccine_cost
+        shortfall = self.regions.shortfall(costs)
+        if shortfall > self.budget:
+            raise ValueError(f"Недостаточно бюджета для распределения вакцин. \
+                             Сверх бюджетов регионов требуется: {shortfall}, доступно: {self.budget}")
+        self.budget -= self.regions.pay(costs)
+
+    def _update_regions(self) -> None:
+        """Пересчитывает показатели регионов по состоянию городов."""
+        engine = self.engine
+        self.regions.update(engine.number_vaccinated, engine.number_infected, engine.epidemic)
+
+    def infection_factor(self) -> Union[float, np.ndarray]:
+        """Возвращает фактор заражения извне для движка: государства или региона каждого города."""
+        return self.government_factor if self.regions is None else self.regions.city_factor()
+
+    def update_state(self, month: int, vaccines: Union[Dict[str, int], np.ndarray],
+                     imported: Optional[np.ndarray] = None, paid: bool = False) -> None:
         """
         Возвращает новое состояние государства после очередного шага моделирования.
 
         :param month: Текущий месяц.
         :param vaccines: Распределение вакцин по городам.
+        :param imported: Число заболевших, прибывающих в города из-за границы за неделю.
+        :param paid: Вакцины уже оплачены и не списываются с бюджета.
         :return: Обновлённое состояние государства.
         """
         self._update_budget()
-        self._update_cities_state(month, vaccines)
+        self._update_cities_state(month, vaccines, imported, paid)
         self.government_factor = (self.number_infected / self.population) ** 0.5
+        if self.regions is not None:
+            self._update_regions()
 
     @property
     def population(self) -> int:
         """Возвращает число жителей государства."""
-        return sum(city.population for city in self.cities)
+        return self.engine.total_population
 
     @property
     def number_vaccinated(self) -> int:
         """Возвращает общее число вакцинированных."""
-        return sum(city.number_vaccinated for city in self.cities)
+        return self.engine.total_vaccinated
 
     @property
     def number_infected(self) -> int:
         """Возвращает общее число заболевших."""
-        return sum(city.number_infected for city in self.cities)
+        return self.engine.total_infected
 
     @property
     def number_innocent(self) -> int:
         """Возвращает число непривитых."""
-        return sum(city.number_innocent for city in self.cities)
+        return self.population - self.number_infected - self.number_vaccinated
 
     @property
     def number_workers(self) -> int:
         """Возвращает число работающих людей."""
-        return sum(city.number_workers for city in self.cities)
+        return self.population - self.number_infected
 
     @property
     def number_epidemic_cities(self) -> int:
         """Выдать количество городов в которых была или есть эпидемия."""
-        for city in self.cities:
-            self.epidemic_citites[city.name] = self.epidemic_citites[city.name] or (city.number_infected / city.population >= 0.45)
-        return sum(self.epidemic_citites.values())
+        return self.engine.number_epidemic
 
     def get_statistics(self) -> StatisticsData:
         """Возвращает статистику по государству c городами."""
@@ -121,8 +277,55 @@ class Government:
             "number_workers": self.number_workers,
             "budget": self.budget,
             "vaccine_cost": self.vaccine_cost,
-            "number_cities": len(self.cities),
+            "number_cities": len(self.names),
             "number_epidemic_cities": self.number_epidemic_cities
         }
-        cities_statistics = [city.get_statistics() for city in self.cities]
+        engine = self.engine
+        cities_statistics = [
+            {
+                "name": name,
+                "population": population,
+                "number_vaccinated": number_vaccinated,
+                "number_infected": number_infected,
+                "number_innocent": number_innocent,
+                "number_workers": number_workers,
+            }
+            for name, population, number_vaccinated, number_infected, number_innocent, number_workers in zip(
+                self.names,
+                engine.population.tolist(),
+                engine.number_vaccinated.tolist(),
+                engine.number_infected.tolist(),
+                engine.number_innocent.tolist(),
+                engine.number_workers.tolist(),
+            )
+        ]
         return {"government": government_statistics, "cities": cities_statistics}
+
+    def get_region_statistics(self) -> List[GovernmentStatisticsData]:
+        """Возвращает статистику по регионам (пустой список, если регионы не заданы)."""
+        regions = self.regions
+        if regions is None:
+            return []
+        return [
+            {
+                "name": name,
+                "population": population,
+                "number_vaccinated": number_vaccinated,
+                "number_infected": number_infected,
+                "number_innocent": population - number_infected - number_vaccinated,
+                "number_workers": population - number_infected,
+                "budget": budget,
+                "vaccine_cost": self.vaccine_cost,
+                "number_cities": number_cities,
+                "number_epidemic_cities": number_epidemic,
+            }
+            for name, population, number_vaccinated, number_infected, budget, number_cities, number_epidemic in zip(
+                regions.names,
+                regions.population.tolist(),
+                regions.number_vaccinated.tolist(),
+                regions.number_infected.tolist(),
+                regions.budget.tolist(),
+                regions.number_cities.tolist(),
+                regions.number_epidemic.tolist(),
+            )
+        ]
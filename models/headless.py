@@ -0,0 +1,157 @@
+from .export import EXPORT_SUFFIXES, HistoryWriter, open_writer
+from .government import GovernmentData
+from .loader import LOADER_SUFFIXES, load_cities
+from .recording import RecordingWriter
+from .simulation import Simulation
+from typing import List, Optional, Union
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import sys
+
+
+logger = logging.getLogger(__name__)
+
+
+def load_government_data(path: str) -> GovernmentData:
+    """
+    Загружает параметры государства из JSON файла.
+
+    :param path: Путь к файлу с GovernmentData.
+    :return: Параметры государства.
+    """
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def _parse_money(value: Union[str, int, float]) -> int:
+    """
+    Разбирает затраты на вакцины за неделю.
+
+    :param value: Неотрицательное целое число (допускается запись вида 1e6 или 100.0).
+    :return: Затраты.
+    """
+    try:
+        money = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"budget must be a number, got {value!r}") from None
+    if not money.is_integer():
+        raise ValueError(f"budget must be a whole number, got {value!r}")
+    if money < 0:
+        raise ValueError(f"budget must be non-negative, got {value!r}")
+    return value if isinstance(value, int) else int(money)
+
+
+def load_budget_schedule(spec: str) -> Union[int, List[int]]:
+    """
+    Разбирает расписание затрат на вакцины.
+
+    :param spec: Число (одинаковые затраты каждую неделю) или путь к файлу
+                 с JSON списком либо с одним числом на строку.
+    :return: Затраты на неделю или список затрат по неделям.
+    """
+    try:
+        float(spec)
+    except ValueError:
+        pass
+    else:
+        return _parse_money(spec)
+    with open(spec, encoding='utf-8') as file:
+        content = file.read().strip()
+    if content.startswith('['):
+        return [_parse_money(money) for money in json.loads(content)]
+    return [_parse_money(line.strip()) for line in content.splitlines() if line.strip()]
+
+
+def run_headless(months: int, start_month: int, government_data: GovernmentData,
+                 budget_schedule: Union[int, List[int]] = 0,
+                 writers: Optional[List[HistoryWriter]] = None, keep_history: bool = True) -> Simulation:
+    """
+    Проводит моделирование до конца без графического интерфейса.
+
+    :param months: Количество месяцев моделирования.
+    :param start_month: Номер начального месяца.
+    :param government_data: Параметры государства.
+    :param budget_schedule: Затраты на вакцины каждую неделю или список затрат по неделям
+                            (недостающие недели считаются нулевыми).
+    :param writers: Потоковые записи статистики по шагам.
+    :param keep_history: Хранить ли историю в памяти.
+    :return: Завершённая симуляция.
+    """
+    simulation = Simulation(months, start_month, government_data, writers=writers, keep_history=keep_history)
+    for week in range(months * 4):
+        if isinstance(budget_schedule, int):
+            money = budget_schedule
+        else:
+            money = budget_schedule[week] if week < len(budget_schedule) else 0
+        if money > simulation.government.budget:
+            logger.warning("week %d: planned spending %d exceeds the budget %d, spending the budget",
+                           week + 1, money, simulation.government.budget)
+            money = simulation.government.budget
+        simulation.make_step(money)
+    return simulation
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа для запуска моделирования из командной строки."""
+    parser = argparse.ArgumentParser(prog='python -m models', description="Моделирование без графического интерфейса.")
+    parser.add_argument('government', help="JSON файл с параметрами государства (GovernmentData).")
+    parser.add_argument('--months', type=int, default=1, help="Количество месяцев моделирования.")
+    parser.add_argument('--start-month', type=int, default=1, help="Номер начального месяца.")
+    parser.add_argument('--budget', default='0',
+                        help="Затраты на вакцины в неделю или файл с расписанием затрат по неделям.")
+    parser.add_argument('--history', action='store_true', help="Вывести статистику по всем шагам, а не только по последнему.")
+    parser.add_argument('--output', help="Файл для результата (по умолчанию стандартный вывод).")
+    parser.add_argument('--cities', help="Файл с городами (.csv, .parquet или .geojson), заменяющий города из JSON.")
+    parser.add_argument('--seed', type=int, help="Включить стохастический режим с заданным зерном.")
+    parser.add_argument('--export', help="Файл для потоковой записи статистики по шагам и городам "
+                                         "(.parquet, .csv или .ndjson).")
+    parser.add_argument('--record', help="Файл для двоичной записи прогона, открываемой в окне просмотра "
+                                         "(python main.py файл).")
+    args = parser.parse_args(argv)
+
+    if not (1 <= args.start_month <= 12):
+        parser.error("start month must be in [1, 12]")
+    if args.months < 1:
+        parser.error("months must be positive")
+    # Форматы проверяются до моделирования, чтобы не получить ошибку после долгого прогона.
+    for option, path, suffixes in (('--export', args.export, EXPORT_SUFFIXES), ('--cities', args.cities, LOADER_SUFFIXES)):
+        if path is None:
+            continue
+        format = suffixes.get(os.path.splitext(path)[1].lower())
+        if format is None:
+            parser.error(f"{option}: cannot infer format from {path!r}; expected one of {', '.join(suffixes)}")
+        if format == 'parquet' and importlib.util.find_spec('pyarrow') is None:
+            parser.error(f"{option}: Parquet requires pyarrow; install it or use another format")
+
+    try:
+        budget_schedule = load_budget_schedule(args.budget)
+    except (OSError, ValueError) as error:
+        parser.error(f"--budget: {error}")
+
+    government_data = load_government_data(args.government)
+    if args.cities is not None:
+        government_data['cities_data'] = load_cities(args.cities)
+    if args.seed is not None:
+        government_data.update(stochastic=True, seed=args.seed)
+    writers = [] if args.export is None else [open_writer(args.export)]
+    if args.record is not None:
+        writers.append(RecordingWriter(args.record, args.start_month))
+    try:
+        simulation = run_headless(args.months, args.start_month,
+                                  government_data,
+                                  budget_schedule,
+                                  writers=writers, keep_history=args.history)
+    finally:
+        for writer in writers:
+            writer.close()
+    result = list(simulation.history) if args.history else simulation.government.get_statistics()
+
+    if args.output is None:
+        json.dump(result, sys.stdout, ensure_ascii=False)
+        sys.stdout.write('\n')
+    else:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(result, file, ensure_ascii=False)
@@ -0,0 +1,124 @@
+from .city import CityStatisticsData
+from .government import Government, GovernmentStatisticsData, StatisticsData
+from typing import Iterator, List
+import numpy as np
+
+
+class History:
+    def __init__(self, government: Government, steps: int) -> None:
+        """
+        Инициализация истории моделирования в виде столбцов.
+
+        Для каждого показателя заранее выделяется массив формы (steps + 1, число городов),
+        а показатели государства хранятся отдельными рядами длины steps + 1.
+        При выходе за steps массивы расширяются.
+
+        :param government: Государство, состояние которого записывается.
+        :param steps: Ожидаемое число шагов моделирования.
+        """
+        self.name = government.name
+        self.names: List[str] = list(government.names)
+        self.cities_type: List[str] = list(government.cities_type)
+        self.coordinates = list(government.coordinates)
+        self.population = government.engine.population.copy()
+        self.total_population = government.population
+        self.vaccine_cost = government.vaccine_cost
+
+        capacity, number_cities = steps + 1, len(self.names)
+        self.number_vaccinated = np.zeros((capacity, number_cities), dtype=np.int64)
+        self.number_infected = np.zeros((capacity, number_cities), dtype=np.int64)
+        self.budget = np.zeros(capacity, dtype=np.int64)
+        self.government_number_vaccinated = np.zeros(capacity, dtype=np.int64)
+        self.government_number_infected = np.zeros(capacity, dtype=np.int64)
+        self.number_epidemic_cities = np.zeros(capacity, dtype=np.int64)
+        self._length = 0
+        self._cached_step: int = None
+        self._cached_statistics: StatisticsData = None
+
+    def _grow(self) -> None:
+        """Удваивает ёмкость массивов истории."""
+        for name in ('number_vaccinated', 'number_infected', 'budget', 'government_number_vaccinated',
+                     'government_number_infected', 'number_epidemic_cities'):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.zeros_like(array)]))
+
+    def append(self, government: Government) -> None:
+        """Записывает текущее состояние государства как очередной шаг."""
+        if self._length == len(self.budget):
+            self._grow()
+        step = self._length
+        engine = government.engine
+        self.number_vaccinated[step] = engine.number_vaccinated
+        self.number_infected[step] = engine.number_infected
+        self.budget[step] = government.budget
+        self.government_number_vaccinated[step] = government.number_vaccinated
+        self.government_number_infected[step] = government.number_infected
+        self.number_epidemic_cities[step] = government.number_epidemic_cities
+        self._length += 1
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[StatisticsData]:
+        for step in range(self._length):
+            yield self[step]
+
+    def _step_index(self, step: int) -> int:
+        if step < 0:
+            step += self._length
+        if not (0 <= step < self._length):
+            raise IndexError("history index out of range")
+        return step
+
+    def get_government_statistics(self, step: int) -> GovernmentStatisticsData:
+        """Возвращает статистику по государству на шаге step."""
+        step = self._step_index(step)
+        population = self.total_population
+        number_vaccinated = int(self.government_number_vaccinated[step])
+        number_infected = int(self.government_number_infected[step])
+        return {
+            "name": self.name,
+            "population": population,
+            "number_vaccinated": number_vaccinated,
+            "number_infected": number_infected,
+            "number_innocent": population - number_infected - number_vaccinated,
+            "number_workers": population - number_infected,
+            "budget": int(self.budget[step]),
+            "vaccine_cost": self.vaccine_cost,
+            "number_cities": len(self.names),
+            "number_epidemic_cities": int(self.number_epidemic_cities[step]),
+        }
+
+    def get_cities_statistics(self, step: int) -> List[CityStatisticsData]:
+        """Возвращает статистику по городам на шаге step."""
+        step = self._step_index(step)
+        return [
+            {
+                "name": name,
+                "population": population,
+                "number_vaccinated": number_vaccinated,
+                "number_infected": number_infected,
+                "number_innocent": population - number_infected - number_vaccinated,
+                "number_workers": population - number_infected,
+            }
+            for name, population, number_vaccinated, number_infected in zip(
+                self.names,
+                self.population.tolist(),
+                self.number_vaccinated[step].tolist(),
+                self.number_infected[step].tolist(),
+            )
+        ]
+
+    def __getitem__(self, step: int) -> StatisticsData:
+        """
+        Возвращает статистику на шаге step в формате Government.get_statistics.
+
+        Записанные шаги не меняются, поэтому статистика последнего запрошенного шага
+        запоминается: интерфейс читает один и тот же шаг в каждом кадре.
+        """
+        step = self._step_index(step)
+        if step != self._cached_step:
+            self._cached_statistics = {"government": self.get_government_statistics(step),
+                                       "cities": self.get_cities_statistics(step)}
+            self._cached_step = step
+        return self._cached_statistics
@@ -0,0 +1,205 @@
+from .city import CityData, CityType
+from typing import Dict, Iterator, List, Optional
+import csv
+import itertools
+import json
+import numpy as np
+import os
+
+
+LOADER_FORMATS = ('csv', 'parquet', 'geojson')
+LOADER_SUFFIXES = {'.csv': 'csv', '.parquet': 'parquet', '.geojson': 'geojson', '.json': 'geojson'}
+REQUIRED_COLUMNS = ('name', 'city_type', 'population', 'transport')
+COUNT_COLUMNS = ('number_vaccinated', 'number_infected')
+COORDINATE_COLUMNS = ('x', 'y')
+REGION_COLUMN = 'region'
+
+
+def _fill_blanks(values, default):
+    """Заменяет пропуски (None, пустая строка, NaN) значением default."""
+    if isinstance(values, np.ndarray) and values.dtype.kind != 'O':
+        return np.where(np.isnan(values), default, values) if values.dtype.kind == 'f' else values
+    return [default if value is None or value == '' else value for value in values]
+
+
+def _column(batch: Dict[str, list], name: str, dtype, first_row: int, default=None) -> np.ndarray:
+    """
+    Преобразует столбец порции к массиву, сообщая о первой неразобранной строке.
+
+    :param default: Значение для пропусков необязательного столбца; None - пропуски недопустимы.
+    """
+    values = batch[name] if default is None else _fill_blanks(batch[name], default)
+    try:
+        return np.asarray(values, dtype=dtype)
+    except (ValueError, TypeError):
+        for index, value in enumerate(values):
+            try:
+                np.asarray(value, dtype=dtype)
+            except (ValueError, TypeError):
+                raise ValueError(f"row {first_row + index}: invalid {name} {value!r}") from None
+        raise
+
+
+def _first_invalid(valid: np.ndarray, first_row: int, message: str) -> None:
+    """Возбуждает ValueError для первой строки, не прошедшей проверку."""
+    if not valid.all():
+        raise ValueError(f"row {first_row + int(np.argmin(valid))}: {message}")
+
+
+def validate_columns(batch: Dict[str, list], first_row: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Проверяет порцию городов целиком и приводит её столбцы к массивам.
+
+    Правила те же, что в City.__init__ (уровень транспорта и тип города, координаты),
+    плюс положительное население, которого требует движок.
+
+    :param batch: Столбцы порции {"столбец": значения}.
+    :param first_row: Номер первой строки порции в файле (для сообщений об ошибках).
+    :return: Столбцы в виде массивов; пропущенные (или пустые) числа вакцинированных
+             и заболевших равны 0, пустой регион - None.
+    """
+    missing = [name for name in REQUIRED_COLUMNS if name not in batch]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+    number_rows = len(batch['name'])
+    columns = {
+        'name': np.asarray(batch['name'], dtype=object),
+        'city_type': np.asarray(batch['city_type'], dtype=object),
+        'population': _column(batch, 'population', np.int64, first_row),
+        'transport': _column(batch, 'transport', np.float64, first_row),
+    }
+    for name in COUNT_COLUMNS:
+        columns[name] = (_column(batch, name, np.int64, first_row, default=0) if name in batch
+                         else np.zeros(number_rows, dtype=np.int64))
+
+    _first_invalid((columns['transport'] >= 0) & (columns['transport'] <= 1), first_row,
+                   "transport must be in [0, 1]")
+    _first_invalid(np.isin(columns['city_type'], list(CityType._value2member_map_)), first_row,
+                   "city_type must be 'megapolis', 'medium' or 'town'")
+    _first_invalid(columns['population'] > 0, first_row, "population must be positive")
+
+    if all(name in batch for name in COORDINATE_COLUMNS):
+        coordinates = np.stack([_column(batch, name, np.float64, first_row) for name in COORDINATE_COLUMNS], axis=1)
+        _first_invalid(((coordinates >= 0) & (coordinates <= 1)).all(axis=1), first_row,
+                       "coordinates must be in [0, 1]")
+        columns['coordinates'] = coordinates
+    if REGION_COLUMN in batch:
+        columns[REGION_COLUMN] = np.array([None if region is None or region == '' else str(region)
+                                           for region in batch[REGION_COLUMN]], dtype=object)
+    return columns
+
+
+def _csv_batches(path: str, batch_rows: int) -> Iterator[Dict[str, list]]:
+    """Читает CSV с заголовком порциями по batch_rows строк."""
+    with open(path, encoding='utf-8', newline='') as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return
+        header = [name.strip() for name in header]
+        while True:
+            rows = list(itertools.islice(reader, batch_rows))
+            if not rows:
+                return
+            if any(len(row) != len(header) for row in rows):
+                raise ValueError(f"{path!r}: every row must have {len(header)} fields")
+            yield dict(zip(header, map(list, zip(*rows))))
+
+
+def _parquet_batches(path: str, batch_rows: int) -> Iterator[Dict[str, list]]:
+    """Читает Parquet группами по batch_rows строк (нужен пакет pyarrow)."""
+    try:
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet loading requires pyarrow; use CSV or GeoJSON instead") from None
+    for record_batch in pyarrow.parquet.ParquetFile(path).iter_batches(batch_size=batch_rows):
+        yield {name: column.to_numpy(zero_copy_only=False)
+               for name, column in zip(record_batch.schema.names, record_batch.columns)}
+
+
+def _geojson_batches(path: str, batch_rows: int) -> Iterator[Dict[str, list]]:
+    """
+    Читает GeoJSON FeatureCollection с точками городов.
+
+    Свойства объекта дают столбцы городов, а долгота и широта точки переводятся
+    в доли карты по охватывающему прямоугольнику всех городов (север сверху).
+    """
+    with open(path, encoding='utf-8') as file:
+        features = json.load(file)['features']
+    if not features:
+        return
+    points = np.array([feature['geometry']['coordinates'][:2] for feature in features], dtype=np.float64)
+    low, high = points.min(axis=0), points.max(axis=0)
+    span = np.where(high > low, high - low, 1)
+    x = (points[:, 0] - low[0]) / span[0]
+    y = (high[1] - points[:, 1]) / span[1]
+    names = list(dict.fromkeys(name for feature in features for name in feature['properties']))
+    for start in range(0, len(features), batch_rows):
+        chunk = features[start:start + batch_rows]
+        batch = {name: [feature['properties'].get(name) for feature in chunk] for name in names}
+        batch.update(x=x[start:start + batch_rows], y=y[start:start + batch_rows])
+        yield batch
+
+
+def iter_city_batches(path: str, format: Optional[str] = None,
+                      batch_rows: int = 65536) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Потоково читает и проверяет описания городов порциями.
+
+    CSV и Parquet содержат столбцы name, city_type, population, transport,
+    необязательные number_vaccinated, number_infected, region и координаты x, y (доли карты).
+
+    :param path: Путь к файлу.
+    :param format: 'csv', 'parquet' или 'geojson'; по умолчанию определяется по расширению файла.
+    :param batch_rows: Число строк в порции.
+    :return: Итератор по проверенным порциям столбцов (см. validate_columns).
+    """
+    if format is None:
+        format = LOADER_SUFFIXES.get(os.path.splitext(path)[1].lower())
+        if format is None:
+            raise ValueError(f"Cannot infer cities format from {path!r}; expected one of {', '.join(LOADER_SUFFIXES)}")
+    if format == 'csv':
+        batches = _csv_batches(path, batch_rows)
+    elif format == 'parquet':
+        batches = _parquet_batches(path, batch_rows)
+    elif format == 'geojson':
+        batches = _geojson_batches(path, batch_rows)
+    else:
+        raise ValueError(f"format must be one of {', '.join(LOADER_FORMATS)}")
+
+    first_row = 1
+    rows: Dict[str, int] = {} # Строка первого появления каждого названия
+    for batch in batches:
+        columns = validate_columns(batch, first_row)
+        for row, name in enumerate(columns['name'].tolist(), first_row):
+            if rows.setdefault(name, row) != row:
+                raise ValueError(f"row {row}: duplicate name {name!r} (first at row {rows[name]})")
+        first_row += len(columns['name'])
+        yield columns
+
+
+def load_cities(path: str, format: Optional[str] = None, batch_rows: int = 65536) -> List[CityData]:
+    """
+    Загружает описания городов из CSV, Parquet или GeoJSON файла.
+
+    :param path: Путь к файлу.
+    :param format: 'csv', 'parquet' или 'geojson'; по умолчанию определяется по расширению файла.
+    :param batch_rows: Число строк в порции проверки.
+    :return: Список параметров городов для GovernmentData.
+    """
+    cities_data: List[CityData] = []
+    for columns in iter_city_batches(path, format, batch_rows):
+        fields = ('name', 'city_type', 'population', 'transport') + COUNT_COLUMNS
+        rows = zip(*(columns[name].tolist() for name in fields))
+        if 'coordinates' in columns:
+            rows = (row + (tuple(point),) for row, point in zip(rows, columns['coordinates'].tolist()))
+            fields += ('coordinates',)
+        batch = [dict(zip(fields, row)) for row in rows]
+        if REGION_COLUMN in columns:
+            for city_data, region in zip(batch, columns[REGION_COLUMN].tolist()):
+                if region is not None:
+                    city_data['region'] = region
+        cities_data.extend(batch)
+    if not cities_data:
+        raise ValueError(f"{path!r} contains no cities")
+    return cities_data
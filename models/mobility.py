@@ -0,0 +1,70 @@
+from typing import List, TypedDict
+import numpy as np
+
+
+class MobilityData(TypedDict):
+    origin: str
+    destination: str
+    flow: float
+
+
+class MobilityNetwork:
+    def __init__(self, number_cities: int, origins: np.ndarray, destinations: np.ndarray, flows: np.ndarray) -> None:
+        """
+        Инициализация разреженной матрицы перемещений между городами.
+
+        Матрица хранится списком рёбер, отсортированным по городу назначения,
+        поэтому произведение на вектор стоит O(число рёбер), а не O(n²).
+
+        :param number_cities: Число городов.
+        :param origins: Индексы городов отправления.
+        :param destinations: Индексы городов назначения.
+        :param flows: Число людей, перемещающихся по ребру за неделю.
+        """
+        origins = np.asarray(origins, dtype=np.int64)
+        destinations = np.asarray(destinations, dtype=np.int64)
+        flows = np.asarray(flows, dtype=np.float64)
+        if not (origins.shape == destinations.shape == flows.shape):
+            raise ValueError("origins, destinations and flows must have the same length")
+        if np.any(flows < 0):
+            raise ValueError("flow cannot be negative")
+        if len(flows) and (min(origins.min(), destinations.min()) < 0 or
+                           max(origins.max(), destinations.max()) >= number_cities):
+            raise ValueError("city index out of range")
+
+        order = np.argsort(destinations, kind='stable')
+        self.number_cities = number_cities
+        self.origins = origins[order]
+        self.destinations = destinations[order]
+        self.flows = flows[order]
+
+    @classmethod
+    def from_data(cls, mobility_data: List[MobilityData], names: List[str]) -> 'MobilityNetwork':
+        """
+        Создаёт сеть перемещений по списку потоков между городами.
+
+        :param mobility_data: Потоки {"origin": город, "destination": город, "flow": число людей}.
+        :param names: Названия городов в порядке движка.
+        """
+        index = {name: i for i, name in enumerate(names)}
+        try:
+            origins = [index[flow['origin']] for flow in mobility_data]
+            destinations = [index[flow['destination']] for flow in mobility_data]
+        except KeyError as error:
+            raise ValueError(f"Unknown city in mobility data: {error.args[0]}") from None
+        return cls(len(names), origins, destinations, [flow['flow'] for flow in mobility_data])
+
+    def imported(self, prevalence: np.ndarray) -> np.ndarray:
+        """
+        Возвращает число заболевших, прибывающих в каждый город за неделю.
+
+        :param prevalence: Доля заболевших в каждом городе, форма (..., n);
+                           ведущие измерения (например, реплики) считаются независимо.
+        """
+        if prevalence.ndim == 1:
+            return np.bincount(self.destinations, weights=self.flows * prevalence[self.origins],
+                               minlength=self.number_cities)
+        rows = prevalence.reshape(-1, self.number_cities)
+        index = (np.arange(len(rows))[:, None] * self.number_cities + self.destinations).ravel()
+        weights = (self.flows * rows[:, self.origins]).ravel()
+        return np.bincount(index, weights=weights, minlength=rows.size).reshape(prevalence.shape)
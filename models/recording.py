@@ -0,0 +1,125 @@
+from .export import HistoryWriter
+from .government import Government
+from .history import History
+import json
+import numpy as np
+import os
+
+
+RECORDING_MAGIC = b'VDMREC\x00\x00'
+RECORDING_VERSION = 1
+PAGE_SIZE = 4096
+
+
+def recording_dtype(number_cities: int) -> np.dtype:
+    """
+    Возвращает тип записи одного шага: показатели государства и столбцы по городам.
+
+    :param number_cities: Число городов.
+    """
+    return np.dtype([
+        ('budget', '<i8'),
+        ('government_number_vaccinated', '<i8'),
+        ('government_number_infected', '<i8'),
+        ('number_epidemic_cities', '<i8'),
+        ('number_vaccinated', '<i8', (number_cities,)),
+        ('number_infected', '<i8', (number_cities,)),
+    ])
+
+
+class RecordingWriter(HistoryWriter):
+    def __init__(self, path: str, start_month: int) -> None:
+        """
+        Инициализация записи прогона в двоичный файл для просмотра.
+
+        Файл состоит из заголовка (сигнатура, длина и JSON с неизменными данными городов),
+        выровненного по странице, за которым шаги идут записями фиксированного размера.
+        Поэтому файл можно открывать через отображение в память ещё во время записи.
+
+        :param path: Путь к файлу.
+        :param start_month: Номер начального месяца.
+        """
+        self.file = open(path, 'wb')
+        self.start_month = start_month
+        self.dtype: np.dtype = None
+        self.steps = 0
+
+    def _write_header(self, government: Government) -> None:
+        """Записывает заголовок по первому шагу."""
+        meta = json.dumps({
+            'version': RECORDING_VERSION,
+            'name': government.name,
+            'start_month': self.start_month,
+            'vaccine_cost': government.vaccine_cost,
+            'names': government.names,
+            'cities_type': government.cities_type,
+            'coordinates': government.coordinates,
+            'population': government.engine.population.tolist(),
+        }, ensure_ascii=False).encode('utf-8')
+        header = RECORDING_MAGIC + len(meta).to_bytes(8, 'little') + meta
+        self.file.write(header + bytes(-len(header) % PAGE_SIZE))
+        self.dtype = recording_dtype(len(government.names))
+
+    def write(self, step: int, government: Government) -> None:
+        if step != self.steps:
+            raise ValueError("recording steps must be consecutive from 0")
+        if self.dtype is None:
+            self._write_header(government)
+        record = np.zeros((), dtype=self.dtype)
+        record['budget'] = government.budget
+        record['government_number_vaccinated'] = government.number_vaccinated
+        record['government_number_infected'] = government.number_infected
+        record['number_epidemic_cities'] = government.number_epidemic_cities
+        record['number_vaccinated'] = government.engine.number_vaccinated
+        record['number_infected'] = government.engine.number_infected
+        self.file.write(record.tobytes())
+        self.steps += 1
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class Recording(History):
+    def __init__(self, path: str) -> None:
+        """
+        Открывает записанный прогон только для чтения через отображение в память.
+
+        Предоставляет тот же доступ к шагам, что и History, но столбцы - это виды
+        на файл: чтение шага затрагивает лишь страницы его записи, поэтому открытие
+        даже очень большого файла не зависит от его размера. Незавершённая последняя
+        запись (файл ещё пишется) не учитывается.
+
+        :param path: Путь к файлу записи.
+        """
+        with open(path, 'rb') as file:
+            if file.read(len(RECORDING_MAGIC)) != RECORDING_MAGIC:
+                raise ValueError(f"{path!r} is not a simulation recording")
+            meta_size = int.from_bytes(file.read(8), 'little')
+            meta = json.loads(file.read(meta_size).decode('utf-8'))
+        if meta['version'] != RECORDING_VERSION:
+            raise ValueError(f"Unsupported recording version: {meta['version']}")
+
+        header_size = len(RECORDING_MAGIC) + 8 + meta_size
+        offset = header_size + -header_size % PAGE_SIZE
+        dtype = recording_dtype(len(meta['names']))
+        steps = (os.path.getsize(path) - offset) // dtype.itemsize
+        if steps < 1:
+            raise ValueError(f"{path!r} contains no recorded steps")
+        self.records = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(steps,))
+
+        self.name = meta['name']
+        self.start_month = meta['start_month']
+        self.names = meta['names']
+        self.cities_type = meta['cities_type']
+        self.coordinates = meta['coordinates']
+        self.population = np.array(meta['population'], dtype=np.int64)
+        self.total_population = int(self.population.sum())
+        self.vaccine_cost = meta['vaccine_cost']
+        for name in dtype.names:
+            setattr(self, name, self.records[name])
+        self._length = steps
+        self._cached_step = None
+        self._cached_statistics = None
+
+    def append(self, government: Government) -> None:
+        raise TypeError("Recording is read-only")
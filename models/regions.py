@@ -0,0 +1,107 @@
+from typing import List, Optional, TypedDict
+import numpy as np
+
+
+class RegionData(TypedDict):
+    name: str
+    budget: int
+
+
+class Regions:
+    def __init__(self, cities_region: List[str], population: np.ndarray,
+                 regions_data: Optional[List[RegionData]] = None) -> None:
+        """
+        Инициализация уровня регионов между государством и городами.
+
+        Показатели регионов получаются сегментными суммами по массивам городов:
+        города упорядочиваются по регионам один раз, после чего каждый показатель
+        сворачивается одним проходом np.add.reduceat, а показатели государства
+        складываются уже из итогов регионов. Население регионов не меняется
+        и считается один раз.
+
+        :param cities_region: Регион каждого города.
+        :param population: Численность населения городов.
+        :param regions_data: Параметры регионов; регионы, упомянутые только у городов,
+                             получают нулевой бюджет.
+        """
+        regions_data = [] if regions_data is None else regions_data
+        self.names = [region['name'] for region in regions_data]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("region names must be unique")
+        budget = [region['budget'] for region in regions_data]
+        positions = {name: index for index, name in enumerate(self.names)}
+        for region in cities_region:
+            if region not in positions:
+                positions[region] = len(self.names)
+                self.names.append(region)
+                budget.append(0)
+        self.budget = np.array(budget, dtype=np.int64)
+        if np.any(self.budget < 0):
+            raise ValueError("Budget cannot be negative")
+
+        self.index = np.array([positions[region] for region in cities_region], dtype=np.intp)
+        self.number_cities = np.bincount(self.index, minlength=len(self.names))
+        order = np.argsort(self.index, kind='stable')
+        # Если города уже сгруппированы по регионам, перестановка не нужна.
+        self.order = None if np.array_equal(order, np.arange(len(order))) else order
+        starts = np.concatenate([[0], np.cumsum(self.number_cities)[:-1]])
+        # reduceat суммирует только непустые сегменты: начало пустого совпало бы с началом
+        # следующего сегмента (или вышло бы за массив) и обрезало бы предыдущий.
+        self._nonempty = np.flatnonzero(self.number_cities)
+        self._starts = starts[self._nonempty]
+
+        self.population = self.reduce(np.asarray(population, dtype=np.int64))
+        self.number_vaccinated = np.zeros(len(self.names), dtype=np.int64)
+        self.number_infected = np.zeros(len(self.names), dtype=np.int64)
+        self.number_epidemic = np.zeros(len(self.names), dtype=np.int64)
+        self.government_factor = np.zeros(len(self.names))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def reduce(self, values: np.ndarray) -> np.ndarray:
+        """
+        Суммирует значения по городам каждого региона.
+
+        :param values: Значения по городам, форма (число городов,).
+        :return: Суммы по регионам, форма (число регионов,).
+        """
+        if self.order is not None:
+            values = values[self.order]
+        totals = np.zeros(len(self.names), dtype=values.dtype)
+        if len(values):
+            totals[self._nonempty] = np.add.reduceat(values, self._starts)
+        return totals
+
+    def update(self, number_vaccinated: np.ndarray, number_infected: np.ndarray, epidemic: np.ndarray) -> None:
+        """
+        Пересчитывает показатели и факторы регионов по состоянию городов.
+
+        :param number_vaccinated: Число вакцинированных по городам.
+        :param number_infected: Число заболевших по городам.
+        :param epidemic: Отметки городов с эпидемией.
+        """
+        self.number_vaccinated = self.reduce(number_vaccinated)
+        self.number_infected = self.reduce(number_infected)
+        self.number_epidemic = self.reduce(epidemic.astype(np.int64))
+        self.government_factor = np.sqrt(self.number_infected / np.maximum(self.population, 1))
+
+    def city_factor(self) -> np.ndarray:
+        """Возвращает фактор региона для каждого города."""
+        return self.government_factor[self.index]
+
+    def pay(self, costs: np.ndarray) -> int:
+        """
+        Оплачивает вакцины из бюджетов регионов.
+
+        :param costs: Стоимость вакцин по городам.
+        :return: Часть стоимости, не покрытая бюджетами регионов.
+        """
+        region_costs = self.reduce(costs)
+        paid = np.minimum(region_costs, self.budget)
+        self.budget -= paid
+        return int((region_costs - paid).sum())
+
+    def shortfall(self, costs: np.ndarray) -> int:
+        """Возвращает часть стоимости вакцин по городам, не покрытую бюджетами регионов (без оплаты)."""
+        return int(np.maximum(self.reduce(costs) - self.budget, 0).sum())
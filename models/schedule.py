@@ -0,0 +1,120 @@
+from .allocation import AllocationStrategy
+from .checkpoint import dump_checkpoint, restore_checkpoint
+from .simulation import Simulation
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple, TypedDict
+import os
+
+
+SCHEDULE_OBJECTIVES = ('infected', 'epidemic_cities')
+
+
+class ScheduleResult(TypedDict):
+    fractions: List[float]
+    spends: List[int]
+    number_infected: int
+    number_epidemic_cities: int
+
+
+def apply_schedule(simulation: Simulation, fractions: Sequence[float]) -> Tuple[List[int], int]:
+    """
+    Проводит шаги симуляции, тратя каждую неделю долю доступного бюджета.
+
+    Доля берётся от бюджета до начисления налогов, поэтому расписание
+    всегда выполнимо при любой динамике бюджета.
+
+    :param simulation: Симуляция.
+    :param fractions: Доли бюджета, расходуемые на вакцины, по неделям.
+    :return: Потраченные по неделям деньги и суммарное число заболевших по шагам.
+    """
+    spends, burden = [], 0
+    for fraction in fractions:
+        money = int(fraction * simulation.government.budget)
+        simulation.make_step(money)
+        spends.append(money)
+        burden += simulation.government.number_infected
+    return spends, burden
+
+
+def _evaluate(data: bytes, fractions: List[float], objective: str,
+              allocation: AllocationStrategy) -> Tuple[int, int]:
+    """Оценивает расписание от контрольной точки: возвращает ключ сравнения (меньше - лучше)."""
+    simulation = restore_checkpoint(data)
+    simulation.allocation = allocation
+    _, burden = apply_schedule(simulation, fractions)
+    if objective == 'epidemic_cities':
+        return simulation.government.number_epidemic_cities, burden
+    return burden, simulation.government.number_epidemic_cities
+
+
+def optimize_schedule(simulation: Simulation, objective: str = 'infected',
+                      levels: Sequence[float] = (0, 0.25, 0.5, 0.75, 1), block: int = 4,
+                      sweeps: int = 2, workers: Optional[int] = None,
+                      allocation: Optional[AllocationStrategy] = None) -> ScheduleResult:
+    """
+    Подбирает расписание затрат на вакцины до конца моделирования.
+
+    Расписание задаётся долей доступного бюджета на каждый блок из block недель.
+    Блоки перебираются по очереди (покоординатный спуск): для каждого блока все доли
+    из levels оцениваются параллельно от контрольной точки в начале блока, так что
+    уже выбранное начало расписания заново не моделируется. Налоговые поступления
+    учитываются, так как каждое расписание проигрывается настоящей симуляцией.
+    Исходная симуляция не изменяется.
+
+    :param simulation: Симуляция, с текущего шага которой строится расписание.
+    :param objective: 'infected' - суммарное по шагам число заболевших,
+                      'epidemic_cities' - число городов с эпидемией в конце.
+    :param levels: Допустимые доли бюджета.
+    :param block: Число недель с одинаковой долей.
+    :param sweeps: Наибольшее число проходов по блокам.
+    :param workers: Число процессов (по умолчанию число ядер); 1 - без пула.
+    :param allocation: Стратегия распределения вакцин при оценке (по умолчанию стратегия симуляции).
+    :return: Доли и траты по неделям и итоговые показатели.
+    """
+    if objective not in SCHEDULE_OBJECTIVES:
+        raise ValueError(f"objective must be one of {', '.join(SCHEDULE_OBJECTIVES)}")
+    if block < 1:
+        raise ValueError("block must be positive")
+    # Контрольная точка не хранит стратегию, поэтому она переносится в каждую ветвь явно.
+    allocation = simulation.allocation if allocation is None else allocation
+
+    weeks = simulation.months * 4 - simulation.current_week
+    number_blocks = -(-weeks // block)
+    choice = [levels[0]] * number_blocks
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def expand(blocks: List[float]) -> List[float]:
+        return [blocks[week // block] for week in range(weeks)]
+
+    try:
+        for _ in range(sweeps):
+            changed = False
+            start = restore_checkpoint(dump_checkpoint(simulation, include_history=False))
+            start.allocation = allocation
+            for index in range(number_blocks):
+                data = dump_checkpoint(start, include_history=False)
+                candidates = [choice[:index] + [level] + choice[index + 1:] for level in levels]
+                suffixes = [expand(candidate)[index * block:] for candidate in candidates]
+                arguments = ([data] * len(levels), suffixes, [objective] * len(levels), [allocation] * len(levels))
+                scores = list(executor.map(_evaluate, *arguments) if executor else map(_evaluate, *arguments))
+                best = levels[min(range(len(levels)), key=scores.__getitem__)]
+                if best != choice[index]:
+                    choice[index], changed = best, True
+                apply_schedule(start, [best] * min(block, weeks - index * block))
+            if not changed:
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    fractions = expand(choice)
+    replay = restore_checkpoint(dump_checkpoint(simulation, include_history=False))
+    replay.allocation = allocation
+    spends, _ = apply_schedule(replay, fractions)
+    return {
+        'fractions': fractions,
+        'spends': spends,
+        'number_infected': replay.government.number_infected,
+        'number_epidemic_cities': replay.government.number_epidemic_cities,
+    }
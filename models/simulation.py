@@ -1,10 +1,18 @@
+from .allocation import AllocationStrategy, ProportionalAllocation
+from .export import HistoryWriter
 from .government import Government, GovernmentData, StatisticsData
-from typing import List, Dict
+from .history import History
+from .supply import SupplyData, VaccineSupply
+from typing import List, Optional
+import numpy as np
 
 
 class Simulation:
     def __init__(self, months: int, start_month: int,
-                 government_data: GovernmentData) -> None:
+                 government_data: GovernmentData,
+                 allocation: Optional[AllocationStrategy] = None,
+                 writers: Optional[List[HistoryWriter]] = None, keep_history: bool = True,
+                 supply: Optional[SupplyData] = None) -> None:
         """
         Инициализация симуляции.
 
@@ -12,42 +20,103 @@ class Simulation:
         :param start_month: Номер месяца, с которого начинается симуляция.
         :param government_data: Параметры правительства.
         :param user_play: Флаг, указывающий на ручное или автоматическое распределение вакцин.
+        :param allocation: Стратегия распределения вакцин (по умолчанию пропорционально населению).
+        :param writers: Потоковые записи статистики, получающие каждый шаг, включая начальный.
+        :param keep_history: Хранить ли историю в памяти; без неё history равна None.
+        :param supply: Параметры цепочки поставок вакцин. Если заданы, деньги тратятся
+                       на заказ доз, а города получают дозы со склада по мере доставки.
         """
+        self._setup(months, start_month, Government(**government_data), allocation, writers, keep_history, supply)
+
+    @classmethod
+    def from_government(cls, months: int, start_month: int, government: Government,
+                        allocation: Optional[AllocationStrategy] = None,
+                        writers: Optional[List[HistoryWriter]] = None, keep_history: bool = True,
+                        supply: Optional[SupplyData] = None) -> 'Simulation':
+        """
+        Создаёт симуляцию для готового государства (например, восстановленного из контрольной точки).
+
+        :param months: Количество месяцев, на которое запускается симуляция.
+        :param start_month: Номер месяца, с которого начинается симуляция.
+        :param government: Государство.
+        :param allocation: Стратегия распределения вакцин (по умолчанию пропорционально населению).
+        :param writers: Потоковые записи статистики, получающие каждый шаг, включая начальный.
+        :param keep_history: Хранить ли историю в памяти; без неё history равна None.
+        :param supply: Параметры цепочки поставок вакцин.
+        """
+        simulation = cls.__new__(cls)
+        simulation._setup(months, start_month, government, allocation, writers, keep_history, supply)
+        return simulation
+
+    def _setup(self, months: int, start_month: int, government: Government,
+               allocation: Optional[AllocationStrategy], writers: Optional[List[HistoryWriter]],
+               keep_history: bool, supply: Optional[SupplyData]) -> None:
+        """Заполняет состояние симуляции и записывает начальный шаг."""
         self.months = months
         self.start_month = start_month
         self.current_month = start_month
         self.current_week = 0
-        self.government = Government(**government_data)
-        self.history: List[StatisticsData] = [self.government.get_statistics()] # Статистика по всем шагам симуляции
+        self.allocation = ProportionalAllocation() if allocation is None else allocation
+        self.government = government
+        self.supply = None if supply is None else VaccineSupply(supply, len(self.government.names))
+        self.writers = [] if writers is None else writers
+        self.history = History(self.government, months * 4) if keep_history else None # Статистика по всем шагам симуляции
+        self._record()
+
+    def _record(self) -> None:
+        """Записывает текущее состояние в историю и потоковые записи."""
+        if self.history is not None:
+            self.history.append(self.government)
+        for writer in self.writers:
+            writer.write(self.current_week, self.government)
 
-    def _allocate_vaccines(self, money: int) -> Dict[str, int]:
+    def _allocate_vaccines(self, money: int) -> np.ndarray:
         """
         Определяет распределение вакцин по городам на текущий шаг.
 
         :param money: Доступный бюджет.
-        :return: Словарь {название_города: кол-во вакцин}.
+        :return: Массив числа вакцин в порядке городов.
         """
         if money > self.government.budget:
             raise ValueError("Недостаточно бюджета для распределения вакцин.")
 
-        allocation = {}
-        can_vaccinate_rate = money / self.government.vaccine_cost / self.government.population
-        for city in self.government.cities:
-            allocation[city.name] = int(can_vaccinate_rate * city.population)
+        return self.allocation.allocate(self.government, money, self.current_month)
+
+    def _supply_step(self, money: int, imported: Optional[np.ndarray] = None) -> None:
+        """
+        Выполняет неделю с цепочкой поставок: заказ на деньги, приём доставленных доз,
+        распределение запаса стратегией, раздача с учётом пропускной способности городов
+        и списание просроченных доз.
 
-        return allocation
+        :param money: Деньги на заказ доз.
+        :param imported: Число заболевших, прибывающих в города из-за границы за неделю.
+        """
+        government = self.government
+        if money > government.budget:
+            raise ValueError("Недостаточно бюджета для распределения вакцин.")
+        government.budget -= self.supply.order(money // government.vaccine_cost) * government.vaccine_cost
+        self.supply.receive()
+        requested = self.allocation.allocate(government, self.supply.number_stock * government.vaccine_cost,
+                                             self.current_month)
+        vaccines = self.supply.distribute(requested)
+        government.update_state(self.current_month, vaccines, imported, paid=True)
+        self.supply.end_week()
 
-    def make_step(self, money: int) -> None:
+    def make_step(self, money: int, imported: Optional[np.ndarray] = None) -> None:
         """
         Выполняет один шаг симуляции (неделя).
 
         :param money: Количество денег для вакцин.
+        :param imported: Число заболевших, прибывающих в города из-за границы за неделю.
         """
-        vaccine_distribution = self._allocate_vaccines(money)
-        self.government.update_state(self.current_month, vaccine_distribution)
+        if self.supply is None:
+            vaccine_distribution = self._allocate_vaccines(money)
+            self.government.update_state(self.current_month, vaccine_distribution, imported)
+        else:
+            self._supply_step(money, imported)
 
         self.current_week += 1
         if self.current_week % 4 == 0:
             self.current_month = (self.current_month + 1) % 12
 
-        self.history.append(self.government.get_statistics())
+        self._record()
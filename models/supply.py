@@ -0,0 +1,157 @@
+from typing import List, TypedDict, Union
+import numpy as np
+
+
+class _SupplyOptionalData(TypedDict, total=False):
+    storage_capacity: int
+    distribution_capacity: Union[int, List[int]]
+
+
+class SupplyData(_SupplyOptionalData):
+    production_capacity: int
+    delivery_weeks: int
+    shelf_life_weeks: int
+
+
+class SupplyStatisticsData(TypedDict):
+    stock: int
+    in_transit: int
+    ordered: int
+    delivered: int
+    distributed: int
+    expired: int
+    wasted: int
+
+
+class VaccineSupply:
+    def __init__(self, supply_data: SupplyData, number_cities: int) -> None:
+        """
+        Инициализация цепочки поставок вакцин: заказ, доставка, склад, раздача по городам.
+
+        Заказанные дозы производятся не больше production_capacity в неделю и прибывают
+        на склад через delivery_weeks недель. На складе дозы хранятся shelf_life_weeks
+        недель (включая неделю прибытия), после чего списываются; прибывшее сверх
+        storage_capacity теряется. Со склада раздаются сначала дозы с ближайшим сроком
+        годности, не больше distribution_capacity доз в неделю на город.
+
+        Заказы в пути и запасы хранятся кольцевыми массивами по неделе прибытия
+        и неделе списания, поэтому неделя стоит O(срок доставки + срок хранения + число городов)
+        независимо от числа заказов.
+
+        :param supply_data: Параметры цепочки поставок.
+        :param number_cities: Число городов.
+        """
+        if supply_data['production_capacity'] < 0:
+            raise ValueError("production_capacity cannot be negative")
+        if supply_data['delivery_weeks'] < 0:
+            raise ValueError("delivery_weeks cannot be negative")
+        if supply_data['shelf_life_weeks'] < 1:
+            raise ValueError("shelf_life_weeks must be positive")
+        self.supply_data = supply_data
+        self.production_capacity = supply_data['production_capacity']
+        self.storage_capacity = supply_data.get('storage_capacity')
+        distribution_capacity = supply_data.get('distribution_capacity')
+        self.distribution_capacity = None if distribution_capacity is None else \
+            np.broadcast_to(np.asarray(distribution_capacity, dtype=np.int64), (number_cities,)).copy()
+        if self.distribution_capacity is not None and np.any(self.distribution_capacity < 0):
+            raise ValueError("distribution_capacity cannot be negative")
+
+        self.in_transit = np.zeros(supply_data['delivery_weeks'] + 1, dtype=np.int64)
+        self.transit_head = 0
+        self.stock = np.zeros(supply_data['shelf_life_weeks'], dtype=np.int64)
+        self.stock_head = 0
+        self.ordered = 0
+        self.delivered = 0
+        self.distributed = 0
+        self.expired = 0
+        self.wasted = 0
+
+    @property
+    def number_stock(self) -> int:
+        """Возвращает число доз на складе."""
+        return int(self.stock.sum())
+
+    @property
+    def number_in_transit(self) -> int:
+        """Возвращает число заказанных, но ещё не прибывших доз."""
+        return int(self.in_transit.sum())
+
+    def order(self, number_doses: int) -> int:
+        """
+        Заказывает дозы с учётом производственной мощности.
+
+        :param number_doses: Желаемое число доз.
+        :return: Число заказанных доз.
+        """
+        ordered = max(0, min(number_doses, self.production_capacity))
+        self.in_transit[(self.transit_head + len(self.in_transit) - 1) % len(self.in_transit)] += ordered
+        self.ordered += ordered
+        return ordered
+
+    def receive(self) -> int:
+        """
+        Принимает на склад дозы, прибывающие на этой неделе.
+
+        :return: Число принятых доз.
+        """
+        arrived = int(self.in_transit[self.transit_head])
+        self.in_transit[self.transit_head] = 0
+        self.transit_head = (self.transit_head + 1) % len(self.in_transit)
+        stored = arrived
+        if self.storage_capacity is not None:
+            stored = max(0, min(arrived, self.storage_capacity - self.number_stock))
+        self.wasted += arrived - stored
+        # Прибывшие списываются последними: через shelf_life_weeks недель, считая текущую.
+        self.stock[(self.stock_head + len(self.stock) - 1) % len(self.stock)] += stored
+        self.delivered += stored
+        return stored
+
+    def distribute(self, requested: np.ndarray) -> np.ndarray:
+        """
+        Раздаёт дозы со склада по городам.
+
+        Запрос каждого города ограничивается его пропускной способностью; если на складе
+        доз меньше, чем запрошено, запросы пропорционально уменьшаются.
+
+        :param requested: Желаемое число доз по городам.
+        :return: Выданное число доз по городам.
+        """
+        requested = np.asarray(requested, dtype=np.int64)
+        if self.distribution_capacity is not None:
+            requested = np.minimum(requested, self.distribution_capacity)
+        total, available = int(requested.sum()), self.number_stock
+        if total > available:
+            requested = requested * available // total
+            total = int(requested.sum())
+
+        # Сначала расходуются дозы с ближайшим сроком списания.
+        slots = (self.stock_head + np.arange(len(self.stock))) % len(self.stock)
+        stock = self.stock[slots]
+        before = np.cumsum(stock) - stock
+        self.stock[slots] -= np.minimum(stock, np.maximum(total - before, 0))
+        self.distributed += total
+        return requested
+
+    def end_week(self) -> int:
+        """
+        Списывает дозы с истёкшим сроком годности в конце недели.
+
+        :return: Число списанных доз.
+        """
+        expired = int(self.stock[self.stock_head])
+        self.stock[self.stock_head] = 0
+        self.stock_head = (self.stock_head + 1) % len(self.stock)
+        self.expired += expired
+        return expired
+
+    def get_statistics(self) -> SupplyStatisticsData:
+        """Возвращает текущие запасы и накопленные итоги цепочки поставок."""
+        return {
+            "stock": self.number_stock,
+            "in_transit": self.number_in_transit,
+            "ordered": self.ordered,
+            "delivered": self.delivered,
+            "distributed": self.distributed,
+            "expired": self.expired,
+            "wasted": self.wasted,
+        }
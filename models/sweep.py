@@ -0,0 +1,227 @@
+from .city import CityType
+from .government import GovernmentData
+from .simulation import Simulation
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypedDict
+import copy
+import itertools
+import os
+import numpy as np
+
+
+SWEEP_PARAMETERS = (
+    'base_rate', 'weight_megapolis', 'weight_medium', 'weight_town',
+    'transport_scale', 'infected_scale', 'vaccinated_scale',
+    'budget', 'vaccine_cost', 'spend',
+)
+SWEEP_METRICS = ('number_infected', 'number_epidemic_cities', 'budget')
+
+
+class ScenarioResult(TypedDict):
+    params: Dict[str, Any]
+    number_infected: int
+    number_epidemic_cities: int
+    budget: int
+
+
+class MetricSummary(TypedDict):
+    mean: float
+    quantiles: Dict[float, float]
+
+
+def grid(**ranges: Sequence[Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Перебирает все сочетания значений параметров.
+
+    :param ranges: Значения для каждого параметра, например base_rate=[1.0, 1.5].
+    :return: Итератор по сценариям {параметр: значение}.
+    """
+    _check_parameters(ranges)
+    names = list(ranges)
+    for values in itertools.product(*(ranges[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def sample(ranges: Dict[str, Tuple[float, float]], number: int, seed: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Равномерно выбирает сценарии из диапазонов параметров.
+
+    :param ranges: Диапазоны {параметр: (минимум, максимум)}.
+    :param number: Количество сценариев.
+    :param seed: Зерно генератора случайных чисел.
+    :return: Итератор по сценариям {параметр: значение}.
+    """
+    _check_parameters(ranges)
+    rng = np.random.default_rng(seed)
+    names = list(ranges)
+    low = np.array([ranges[name][0] for name in names], dtype=np.float64)
+    high = np.array([ranges[name][1] for name in names], dtype=np.float64)
+    for values in rng.uniform(low, high, size=(number, len(names))):
+        scenario = dict(zip(names, values.tolist()))
+        for name in ('budget', 'vaccine_cost', 'spend'):
+            if name in scenario:
+                scenario[name] = int(scenario[name])
+        yield scenario
+
+
+def _check_parameters(names: Iterable[str]) -> None:
+    unknown = set(names) - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {', '.join(sorted(unknown))}")
+
+
+def apply_scenario(government_data: GovernmentData, params: Dict[str, Any]) -> GovernmentData:
+    """
+    Возвращает копию параметров государства с подставленными параметрами сценария.
+
+    :param government_data: Базовые параметры государства.
+    :param params: Параметры сценария (см. SWEEP_PARAMETERS).
+    :return: Параметры государства для сценария.
+    """
+    data = copy.deepcopy(government_data)
+    if 'budget' in params:
+        data['budget'] = int(params['budget'])
+    if 'vaccine_cost' in params:
+        data['vaccine_cost'] = int(params['vaccine_cost'])
+    if 'base_rate' in params:
+        data['base_rate'] = params['base_rate']
+
+    weights = {city_type: params[f'weight_{city_type}'] for city_type in CityType._value2member_map_
+               if f'weight_{city_type}' in params}
+    if weights:
+        default_weights = {city_type.value: city_type.weight for city_type in CityType}
+        data['type_weights'] = {**data.get('type_weights', default_weights), **weights}
+
+    for city in data['cities_data']:
+        city['transport'] = min(1.0, city['transport'] * params.get('transport_scale', 1))
+        vaccinated = min(city['population'], int(city.get('number_vaccinated', 0) * params.get('vaccinated_scale', 1)))
+        infected = min(city['population'] - vaccinated, int(city.get('number_infected', 0) * params.get('infected_scale', 1)))
+        city['number_vaccinated'], city['number_infected'] = vaccinated, infected
+    return data
+
+
+def run_scenario(government_data: GovernmentData, months: int, start_month: int,
+                 params: Dict[str, Any]) -> ScenarioResult:
+    """
+    Проводит моделирование одного сценария до конца.
+
+    :param government_data: Базовые параметры государства.
+    :param months: Количество месяцев моделирования.
+    :param start_month: Номер начального месяца.
+    :param params: Параметры сценария.
+    :return: Итоговые показатели сценария.
+    """
+    simulation = Simulation(months, start_month, apply_scenario(government_data, params), keep_history=False)
+    spend = int(params.get('spend', 0))
+    for _ in range(months * 4):
+        simulation.make_step(min(spend, simulation.government.budget))
+    government = simulation.government
+    return {
+        'params': params,
+        'number_infected': government.number_infected,
+        'number_epidemic_cities': government.number_epidemic_cities,
+        'budget': government.budget,
+    }
+
+
+def _run_batch(government_data: GovernmentData, months: int, start_month: int,
+               batch: List[Dict[str, Any]]) -> List[ScenarioResult]:
+    return [run_scenario(government_data, months, start_month, params) for params in batch]
+
+
+def iter_sweep(government_data: GovernmentData, months: int, start_month: int,
+               scenarios: Iterable[Dict[str, Any]], workers: Optional[int] = None,
+               batch_size: int = 16) -> Iterator[ScenarioResult]:
+    """
+    Проводит сценарии в пуле процессов и выдаёт результаты по мере готовности.
+
+    Сценарии отправляются пачками, а число пачек в работе ограничено,
+    поэтому даже длинный генератор сценариев не раскрывается в памяти целиком.
+
+    :param government_data: Базовые параметры государства.
+    :param months: Количество месяцев моделирования.
+    :param start_month: Номер начального месяца.
+    :param scenarios: Сценарии {параметр: значение}.
+    :param workers: Число процессов (по умолчанию число ядер); 1 - без пула.
+    :param batch_size: Число сценариев в одной задаче процесса.
+    :return: Итератор по результатам сценариев в порядке завершения.
+    """
+    scenarios = iter(scenarios)
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers == 1:
+        for params in scenarios:
+            yield run_scenario(government_data, months, start_month, params)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        while True:
+            while len(pending) < 2 * workers:
+                batch = list(itertools.islice(scenarios, batch_size))
+                if not batch:
+                    break
+                pending.add(executor.submit(_run_batch, government_data, months, start_month, batch))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+class SweepReducer:
+    def __init__(self, quantiles: Sequence[float] = (0.05, 0.5, 0.95)) -> None:
+        """
+        Инициализация накопителя итоговых показателей сценариев.
+
+        Среднее считается на лету, для квантилей хранится лишь по одному числу
+        на сценарий и показатель.
+
+        :param quantiles: Уровни квантилей.
+        """
+        self.quantiles = tuple(quantiles)
+        self.count = 0
+        self._mean = np.zeros(len(SWEEP_METRICS))
+        self._values = np.empty((1024, len(SWEEP_METRICS)))
+
+    def add(self, result: ScenarioResult) -> None:
+        """Учитывает результат сценария."""
+        values = np.array([result[metric] for metric in SWEEP_METRICS], dtype=np.float64)
+        if self.count == len(self._values):
+            self._values = np.concatenate([self._values, np.empty_like(self._values)])
+        self._values[self.count] = values
+        self.count += 1
+        self._mean += (values - self._mean) / self.count
+
+    def summary(self) -> Dict[str, MetricSummary]:
+        """Возвращает среднее и квантили по каждому показателю."""
+        if self.count == 0:
+            raise ValueError("No results to summarize")
+        quantiles = np.quantile(self._values[:self.count], self.quantiles, axis=0)
+        return {
+            metric: {
+                'mean': float(self._mean[index]),
+                'quantiles': dict(zip(self.quantiles, quantiles[:, index].tolist())),
+            }
+            for index, metric in enumerate(SWEEP_METRICS)
+        }
+
+
+def run_sweep(government_data: GovernmentData, months: int, start_month: int,
+              scenarios: Iterable[Dict[str, Any]], workers: Optional[int] = None,
+              batch_size: int = 16, quantiles: Sequence[float] = (0.05, 0.5, 0.95)) -> Dict[str, MetricSummary]:
+    """
+    Проводит сценарии параллельно и сворачивает результаты на лету.
+
+    :param government_data: Базовые параметры государства.
+    :param months: Количество месяцев моделирования.
+    :param start_month: Номер начального месяца.
+    :param scenarios: Сценарии, например grid(...) или sample(...).
+    :param workers: Число процессов.
+    :param batch_size: Число сценариев в одной задаче процесса.
+    :param quantiles: Уровни квантилей.
+    :return: Среднее и квантили показателей SWEEP_METRICS.
+    """
+    reducer = SweepReducer(quantiles)
+    for result in iter_sweep(government_data, months, start_month, scenarios, workers, batch_size):
+        reducer.add(result)
+    return reducer.summary()
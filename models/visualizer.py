@@ -1,7 +1,12 @@
 from .simulation import Simulation
 from .config import *
 from .city import CityData
-from typing import List, Dict
+from .history import History
+from .loader import load_cities
+from .recording import Recording
+from .worker import SimulationWorker
+from collections import OrderedDict
+from typing import List, Dict, Tuple
 import pygame
 import sys
 
@@ -17,6 +22,81 @@ GRAY = (200, 200, 200)
 ORANGE = (249, 199, 16)
 
 
+class LabelCache:
+    def __init__(self, max_size: int = 1024) -> None:
+        """
+        Кэш отрисованных надписей с вытеснением давно не использованных.
+
+        :param max_size: Наибольшее число хранимых надписей.
+        """
+        self.max_size = max_size
+        self.fonts: Dict[int, pygame.font.Font] = {}
+        self.surfaces: OrderedDict[Tuple[str, int, Tuple[int, int, int]], pygame.Surface] = OrderedDict()
+
+    def font(self, size: int) -> pygame.font.Font:
+        """Возвращает шрифт по умолчанию заданного размера."""
+        if size not in self.fonts:
+            self.fonts[size] = pygame.font.Font(None, size)
+        return self.fonts[size]
+
+    def render(self, text: str, size: int, color=BLACK) -> pygame.Surface:
+        """Возвращает поверхность с надписью, отрисовывая её только при первом запросе."""
+        key = (text, size, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.font(size).render(text, True, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_size:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+
+class SpatialGrid:
+    def __init__(self, cell_size: int) -> None:
+        """
+        Равномерная сетка прямоугольников для быстрого поиска объектов по точке или области.
+
+        Каждый объект заносится во все ячейки, которые пересекает его прямоугольник,
+        поэтому запрос просматривает лишь объекты из ячеек запроса, а не весь список.
+
+        :param cell_size: Сторона ячейки в пикселях.
+        """
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        self.rects: List[pygame.Rect] = []
+
+    def _cells(self, rect: pygame.Rect):
+        """Перебирает ячейки, пересекаемые прямоугольником."""
+        for i in range(rect.left // self.cell_size, (rect.right - 1) // self.cell_size + 1):
+            for j in range(rect.top // self.cell_size, (rect.bottom - 1) // self.cell_size + 1):
+                yield i, j
+
+    def insert(self, rect: pygame.Rect) -> int:
+        """
+        Добавляет прямоугольник в сетку.
+
+        :param rect: Прямоугольник объекта.
+        :return: Номер объекта в порядке добавления.
+        """
+        index = len(self.rects)
+        self.rects.append(rect)
+        for cell in self._cells(rect):
+            self.cells.setdefault(cell, []).append(index)
+        return index
+
+    def query_point(self, pos: Tuple[int, int]) -> List[int]:
+        """Возвращает номера объектов, чьи прямоугольники содержат точку."""
+        cell = (int(pos[0]) // self.cell_size, int(pos[1]) // self.cell_size)
+        return [index for index in self.cells.get(cell, []) if self.rects[index].collidepoint(pos)]
+
+    def collides(self, rect: pygame.Rect) -> bool:
+        """Проверяет, пересекается ли прямоугольник с каким-либо объектом сетки."""
+        return any(self.rects[index].colliderect(rect)
+                   for cell in self._cells(rect) for index in self.cells.get(cell, []))
+
+
 class TextBox:
     def __init__(self, x: int, y: int, w: int, h: int, text: str,
                  color=WHITE, text_color=BLACK,
@@ -191,19 +271,47 @@ class Visualizer:
         (0.53, 0.9),
         (0.09, 0.13),
     ]
-    _COORDINATES_POINTS = []
-
-    def __init__(self) -> None:
+    # Квазислучайная последовательность R2 для городов без заданных координат.
+    _R2_ALPHA = (0.7548776662466927, 0.5698402909980532)
+    WORKER_EVENT = pygame.USEREVENT + 1
+    AUTOPLAY_EVENT = pygame.USEREVENT + 2
+    MAX_LISTED_CITIES = 10 # Сколько городов помещается в список на экране настройки
+
+    def __init__(self, autoplay_rate: float = 2, lookahead: int = 4) -> None:
+        """
+        Инициализация окна моделирования.
+
+        :param autoplay_rate: Число шагов в секунду в режиме автопросмотра.
+        :param lookahead: Число шагов, рассчитываемых фоновым потоком заранее при автопросмотре.
+        """
+        if autoplay_rate <= 0:
+            raise ValueError("autoplay_rate must be positive")
         pygame.init()
 
-        self.fonts = {
-            'big': pygame.font.Font(None, 54),
-            'medium': pygame.font.Font(None, 36),
-            'small': pygame.font.Font(None, 24)
-        }
+        self.autoplay_rate = autoplay_rate
+        self.lookahead = lookahead
+        self.worker: SimulationWorker = None
+        self.simulation: Simulation = None
+        self.history: History = None
+        self.start_month = 1
+        self.autoplay = False
+        self.pending_step = False
+
+        self.labels = LabelCache()
+        self.font_sizes = {'big': 54, 'medium': 36, 'small': 24}
+        self.fonts = {name: self.labels.font(size) for name, size in self.font_sizes.items()}
+        self.background: pygame.Surface = None
+        self.labels_layer: pygame.Surface = None
+        self.city_textbox: TextBox = None
+        self.city_title: str = None
+        self.panel_rect = pygame.Rect(self.WIDTH_MAP, 0, self.WIDTH_PANEL, self.HEIGHT)
+        self.dirty_rects: List[pygame.Rect] = []
 
         self.simulation_running = False
         self.radius_cities: Dict[str, float] = {}
+        self.coordinates_points: List[Tuple[int, float]] = []
+        self.radius_points: List[float] = []
+        self.cities_grid: SpatialGrid = None
         self.starting_infection: Dict[str, bool] = {}
         self.cities_type: List = []
         self.selected_city_index: int = None
@@ -211,6 +319,7 @@ class Visualizer:
         self.clicked_selectbox: SelectBox = None
         self.cities_selectboxes: List[SelectBox] = []
         self.cities_data: List[CityData] = []
+        self.available_cities: List[CityData] = list(government_data['cities_data'])
 
         padding = int(self.WIDTH_PANEL * 0.04)
         button_width = int(self.WIDTH_PANEL * 0.44)
@@ -221,6 +330,7 @@ class Visualizer:
         next_button_coords = (self.WIDTH_MAP + button_width + 2 * padding, button_y_offset, button_width, 50)
         config_button_coords = (self.WIDTH_MAP + padding, button_y_offset + 50 + padding, button_width * 2 + padding , 50)
         exit_button_coords = (5, 5, 20, 20)
+        autoplay_button_coords = (30, 5, 150, 20)
         spend_budget_inputbox_coords = (self.WIDTH_MAP + padding, button_y_offset - 50 - padding, button_width * 2 + padding , 50)
         textbox_coords = (self.WIDTH_MAP + padding, button_y_offset - 2 * (50 + padding), button_width * 2 + padding , 50)
 
@@ -229,6 +339,8 @@ class Visualizer:
         self.next_button = Button(*next_button_coords, "Следующий шаг", font=self.fonts['small'])
         self.config_button = Button(*config_button_coords, "Установить новую конфигурацию", font=self.fonts['small'])
         self.exit_button = Button(*exit_button_coords, "x", color=RED, font=self.fonts['small'], border_radius=0)
+        self.autoplay_button = SelectBox(*autoplay_button_coords, "Автопросмотр", color=WHITE, color_clicked=ORANGE,
+                                         font=self.fonts['small'], border_radius=0)
         self.textbox = TextBox(*textbox_coords, "Укажите затраты на вакцины", color=ORANGE, font=self.fonts['small'])
         self.spend_budget_button = InputBox(*spend_budget_inputbox_coords, base_text="Число:  ", text='0', color_clicked=ORANGE, font=self.fonts['small'])
 
@@ -270,7 +382,7 @@ class Visualizer:
         self.starting_month_inputbox = InputBox(*starting_month_inputbox_coords, base_text="Число от 1 до 12:  ", default='1', color=RED, font=self.fonts['small'])
 
         self.number_citis_textbox = TextBox(*number_citis_textbox_coords, "Укажите количество городов", color=ORANGE, font=self.fonts['small'])
-        self.number_citis_inputbox = InputBox(*number_citis_inputbox_coords, color=RED, base_text="Число от 1 до 10:  ", default='1', font=self.fonts['small'])
+        self.number_citis_inputbox = InputBox(*number_citis_inputbox_coords, color=RED, base_text=f"Число от 1 до {len(self.available_cities)}:  ", default='1', font=self.fonts['small'])
 
         self.starting_budget_textbox = TextBox(*starting_budget_textbox_coords, "Укажите начальный бюджет", color=ORANGE, font=self.fonts['small'])
         self.starting_budget_inputbox = InputBox(*starting_budget_inputbox_coords, base_text="Число до триллиона:  ", color=RED, font=self.fonts['small'])
@@ -336,17 +448,14 @@ class Visualizer:
         )
 
 
-        for rate in self._RATE_CITIES_POINT:
-            self._COORDINATES_POINTS.append((int(rate[0] * self.WIDTH_MAP), rate[1] * self.HEIGHT))
-
     def _set_cities_data(self) -> None:
         """Установка радиусов городов."""
-        min_population, max_population = None, None
-        for city in self.simulation.government.cities:
-            min_population = min(min_population, city.population) if min_population is not None else city.population
-            max_population = max(max_population, city.population) if max_population is not None else city.population
-            self.starting_infection[city.name] = True if city.number_infected != 0 else False
-            self.cities_type.append(city.city_type)
+        population = self.history.population.tolist()
+        min_population, max_population = min(population), max(population)
+        for name, city_type, number_infected in zip(self.history.names, self.history.cities_type,
+                                                    self.history.number_infected[0].tolist()):
+            self.starting_infection[name] = True if number_infected != 0 else False
+            self.cities_type.append(city_type)
 
         if max_population != min_population:
             k = (self.MAX_RADIUS - self.MIN_RADIUS) / (max_population - min_population)
@@ -355,8 +464,43 @@ class Visualizer:
             k = 0
             c = (self.MAX_RADIUS + self.MIN_RADIUS) // 2
 
-        for city in self.simulation.government.cities:
-            self.radius_cities[city.name] = k * city.population + c
+        self.cities_grid = SpatialGrid(2 * (self.MAX_RADIUS + 2))
+        for index, (name, city_population) in enumerate(zip(self.history.names, population)):
+            radius = k * city_population + c
+            self.radius_cities[name] = radius
+            x, y = self._city_point(index, self.history.coordinates[index])
+            self.coordinates_points.append((x, y))
+            self.radius_points.append(radius)
+            self.cities_grid.insert(pygame.Rect(int(x - radius) - 1, int(y - radius) - 1, int(2 * radius) + 3, int(2 * radius) + 3))
+
+        self._build_layers()
+
+    def _city_point(self, index: int, coordinates: Tuple[float, float] = None) -> Tuple[int, float]:
+        """
+        Возвращает положение города на карте в пикселях.
+
+        :param index: Номер города.
+        :param coordinates: Заданное положение в долях карты; без него берётся точка
+                            из _RATE_CITIES_POINT, а для остальных городов - из
+                            последовательности R2, равномерно заполняющей карту.
+        """
+        if coordinates is None:
+            if index < len(self._RATE_CITIES_POINT):
+                coordinates = self._RATE_CITIES_POINT[index]
+            else:
+                coordinates = tuple(0.05 + 0.9 * ((0.5 + alpha * index) % 1) for alpha in self._R2_ALPHA)
+        return int(coordinates[0] * self.WIDTH_MAP), coordinates[1] * self.HEIGHT
+
+    def _city_at(self, pos: Tuple[int, int]) -> int:
+        """Возвращает номер города под точкой (при наложении - последнего) или None."""
+        if self.cities_grid is None:
+            return None
+        hits = []
+        for index in self.cities_grid.query_point(pos):
+            x, y = self.coordinates_points[index]
+            if (pos[0] - x) ** 2 + (pos[1] - y) ** 2 <= self.radius_points[index] ** 2:
+                hits.append(index)
+        return max(hits) if hits else None
 
     def _clean_data(self) -> None:
         """Очисить данные после моделирования"""
@@ -364,17 +508,85 @@ class Visualizer:
         self.starting_infection = {}
         self.cities_type = []
         self.radius_cities = {}
+        self.history = None
+        self.coordinates_points = []
+        self.radius_points = []
+        self.cities_grid = None
+        self.background = None
+        self.labels_layer = None
+        self.city_textbox = None
+        self.city_title = None
+
+    def _invalidate(self, *rects: pygame.Rect) -> None:
+        """
+        Помечает области экрана для перерисовки в ближайшем кадре.
+
+        :param rects: Изменившиеся области; без аргументов - весь экран.
+        """
+        if rects:
+            self.dirty_rects.extend(rects)
+        else:
+            self.dirty_rects = [pygame.Rect(0, 0, self.WIDTH, self.HEIGHT)]
+
+    def _invalidate_row(self, rect: pygame.Rect) -> None:
+        """Помечает для перерисовки полосу экрана на высоте поля ввода: текст может быть шире поля."""
+        self._invalidate(pygame.Rect(0, rect.y, self.WIDTH, rect.height))
+
+    def _build_layers(self) -> None:
+        """
+        Отрисовывает неизменные во время моделирования слои: фон с легендой и
+        оформлением панели, а также прозрачный слой с подписями городов.
+        """
+        self.background = pygame.Surface((self.WIDTH, self.HEIGHT))
+        self.background.fill(self.WHITE)
+        self._draw_legend(self.background)
+        self._draw_panel(self.background)
+
+        self.labels_layer = pygame.Surface((self.WIDTH, self.HEIGHT), pygame.SRCALPHA)
+        self._draw_labels(self.labels_layer)
+
+    def _draw_labels(self, surface: pygame.Surface) -> None:
+        """
+        Отрисовка подписей городов.
+
+        Подписи расставляются от крупных городов к мелким: подпись ставится над городом,
+        а если там она пересекает уже размещённую или выходит за карту - под ним, справа
+        или слева. Подпись, не нашедшая места, пропускается; данные города по-прежнему
+        доступны по щелчку.
+        """
+        placed = SpatialGrid(2 * (self.MAX_RADIUS + 2))
+        names = self.history.names
+        map_rect = pygame.Rect(0, 0, self.WIDTH_MAP, self.HEIGHT)
+        for index in sorted(range(len(names)), key=lambda index: -self.radius_points[index]):
+            x, y = self.coordinates_points[index]
+            radius = self.radius_points[index]
+
+            text = self.labels.render(names[index], self.font_sizes['small'])
+            width, height = text.get_width(), text.get_height()
+            candidates = [
+                (x - width // 2, y - radius - height - 5),
+                (x - width // 2, y + radius + 5),
+                (x + radius + 5, y - height // 2),
+                (x - radius - width - 5, y - height // 2),
+            ]
+            for x, y in candidates:
+                frame = pygame.Rect(x - 3, y - 3, width + 6, height + 6)
+                if map_rect.contains(frame) and not placed.collides(frame):
+                    placed.insert(frame)
+                    pygame.draw.rect(surface, GRAY, (x - 2, y - 2, width + 4, height + 4), border_radius=1)
+                    pygame.draw.rect(surface, BLACK, frame, 1, 2)
+                    surface.blit(text, (x, y))
+                    break
 
     def _draw_cities(self) -> None:
         """Отрисовка городов на карте."""
-        if self.current_step >= len(self.simulation.history):
+        if self.current_step >= len(self.history):
             raise ValueError("step must be less than len(simulation.history)")
-        cities = self.simulation.history[self.current_step]['cities']
-
+        cities = self.history[self.current_step]['cities']
 
         for index, city in enumerate(cities):
-            x, y = self._COORDINATES_POINTS[index] # координаты города
-            radius = self.radius_cities[city['name']] # радиус города
+            x, y = self.coordinates_points[index] # координаты города
+            radius = self.radius_points[index] # радиус города
 
             infection_rate = city['number_infected'] / city['population']
             color = GREEN if infection_rate < 0.1 else YELLOW if infection_rate < 0.45 else RED
@@ -384,29 +596,30 @@ class Visualizer:
             pygame.draw.circle(self.screen, color, (x, y), radius)
 
             letter = "М" if self.cities_type[index] == "megapolis" else "Г" if self.cities_type[index] == "medium" else "П"
-            letter_text = pygame.font.Font(None, int(radius * 1.5)).render(letter, True, BLACK)
+            letter_text = self.labels.render(letter, int(radius * 1.5))
             self.screen.blit(letter_text, (x - letter_text.get_width() // 2, y - letter_text.get_height() // 2))
 
-            text = self.fonts['small'].render(city["name"], True, BLACK)
-            x, y = x - text.get_width() // 2, y - radius - text.get_height() - 5
-            pygame.draw.rect(self.screen, GRAY, (x - 2, y - 2, text.get_width() + 4, text.get_height() + 4), border_radius=1)
-            pygame.draw.rect(self.screen, BLACK, (x - 3, y - 3, text.get_width() + 6, text.get_height() + 6), 1, 2)
-            self.screen.blit(text, (x, y))
+        self.screen.blit(self.labels_layer, (0, 0))
+
+    def _draw_panel(self, surface: pygame.Surface) -> None:
+        """Отрисовка оформления панели статистики."""
+        pygame.draw.rect(surface, GRAY, (self.WIDTH_MAP, 0, self.WIDTH_MAP, self.HEIGHT))
+        pygame.draw.line(surface, BLACK, (self.WIDTH_MAP, 0), (self.WIDTH_MAP, self.HEIGHT))
+
+        padding = int(self.WIDTH_PANEL * 0.04)
+        textbox_width = int(self.WIDTH_PANEL * 0.88) + padding
+        textbox_coords = (self.WIDTH_MAP + padding, padding, textbox_width, 50)
+        government_textbox = TextBox(*textbox_coords, text=f"Данные по государству", color=ORANGE, font=self.fonts['small'])
+        government_textbox.draw(surface)
 
     def _draw_statistics(self) -> None:
         """Отрисовка статистики по городам."""
-        if self.current_step >= len(self.simulation.history):
+        if self.current_step >= len(self.history):
             raise ValueError("step must be less than len(simulation.history)")
-        statistics = self.simulation.history[self.current_step]
-
-        pygame.draw.rect(self.screen, GRAY, (self.WIDTH_MAP, 0, self.WIDTH_MAP, self.HEIGHT))
-        pygame.draw.line(self.screen, BLACK, (self.WIDTH_MAP, 0), (self.WIDTH_MAP, self.HEIGHT))
+        statistics = self.history[self.current_step]
 
         padding = int(self.WIDTH_PANEL * 0.04)
         textbox_width = int(self.WIDTH_PANEL * 0.88) + padding
-        textbox_coords = (self.WIDTH_MAP + padding, padding, textbox_width, 50)
-        government_textbox = TextBox(*textbox_coords, text=f"Данные по государству", color=ORANGE, font=self.fonts['small'])
-        government_textbox.draw(self.screen)
 
         stats = [
             f"Больных: {statistics['government']['number_infected']}",
@@ -418,7 +631,7 @@ class Visualizer:
         ]
         y_offset = 50 + 2 * padding
         for i, stat in enumerate(stats):
-            text = self.fonts['small'].render(stat, True, BLACK)
+            text = self.labels.render(stat, self.font_sizes['small'])
             x_offset = self.WIDTH_MAP + (self.WIDTH_PANEL - text.get_width()) // 2
             self.screen.blit(text, (x_offset, y_offset))
             y_offset += 30
@@ -427,8 +640,14 @@ class Visualizer:
             city = statistics['cities'][self.selected_city_index]
 
             textbox_coords = (self.WIDTH_MAP + padding, y_offset, textbox_width, 50)
-            city_textbox = TextBox(*textbox_coords, text=f"Данные по городу {city['name']}", color=ORANGE, font=self.fonts['small'])
-            city_textbox.draw(self.screen)
+            city_title = f"Данные по городу {city['name']}"
+            if self.city_textbox is None:
+                self.city_textbox = TextBox(*textbox_coords, text=city_title, color=ORANGE, font=self.fonts['small'])
+                self.city_title = city_title
+            elif self.city_title != city_title:
+                self.city_textbox.set_text(city_title)
+                self.city_title = city_title
+            self.city_textbox.draw(self.screen)
 
             y_offset += 50 + padding
             city_stats = [
@@ -437,26 +656,26 @@ class Visualizer:
                 f"Здоровых: {city['population'] - city['number_infected'] - city['number_vaccinated']}",
             ]
             for i, stat in enumerate(city_stats):
-                text = self.fonts['small'].render(stat, True, BLACK)
+                text = self.labels.render(stat, self.font_sizes['small'])
                 x_offset = self.WIDTH_MAP + (self.WIDTH_PANEL - text.get_width()) // 2
                 self.screen.blit(text, (x_offset, y_offset))
                 y_offset += 30
 
-    def _draw_legend(self) -> None:
+    def _draw_legend(self, surface: pygame.Surface) -> None:
         """Отрисовка легенды."""
         legend_width = int(self.WIDTH_MAP * 0.15)
         legend_height = 100
         legend_x = self.WIDTH_MAP - legend_width - 20
         legend_y = self.HEIGHT - 115
 
-        pygame.draw.rect(self.screen, GRAY, (legend_x, legend_y, legend_width, legend_height), border_radius=10)
-        pygame.draw.rect(self.screen, BLACK, (legend_x, legend_y, legend_width, legend_height), 1, 10)
+        pygame.draw.rect(surface, GRAY, (legend_x, legend_y, legend_width, legend_height), border_radius=10)
+        pygame.draw.rect(surface, BLACK, (legend_x, legend_y, legend_width, legend_height), 1, 10)
 
         legend_text = ["М - мегаполис", "Г - город", "П - посёлок"]
         y_offset = legend_y + 10
         for line in legend_text:
-            text = self.fonts['small'].render(line, True, BLACK)
-            self.screen.blit(text, (legend_x + 10, y_offset))
+            text = self.labels.render(line, self.font_sizes['small'])
+            surface.blit(text, (legend_x + 10, y_offset))
             y_offset += 30
 
     def _draw_month_week(self, month: int, week: int) -> None:
@@ -467,9 +686,9 @@ class Visualizer:
         pygame.draw.rect(self.screen, GRAY, (rect_x, rect_y, rect_width, rect_height), border_radius=10)
         pygame.draw.rect(self.screen, BLACK, (rect_x, rect_y, rect_width, rect_height), 1, 10)
 
-        month_text = self.fonts['small'].render(f"Месяц: {self.MONTHS[month % 12 - 1]}", True, BLACK)
-        week_text = self.fonts['small'].render(f"Неделя: {week}", True, BLACK)
-        step_text = self.fonts['small'].render(f"Шаг: {self.current_step} из {self.max_step}", True, BLACK)
+        month_text = self.labels.render(f"Месяц: {self.MONTHS[month % 12 - 1]}", self.font_sizes['small'])
+        week_text = self.labels.render(f"Неделя: {week}", self.font_sizes['small'])
+        step_text = self.labels.render(f"Шаг: {self.current_step} из {self.max_step}", self.font_sizes['small'])
 
         self.screen.blit(month_text, (rect_x + 10, rect_y + 10))
         self.screen.blit(week_text, (rect_x + 10, rect_y + 40))
@@ -478,8 +697,9 @@ class Visualizer:
     def _draw_buttons_simulation(self) -> None:
         """Отображает кнопку для перехода к следующему шагу моделирования."""
         self.exit_button.draw(self.screen)
+        self.autoplay_button.draw(self.screen)
 
-        if self.current_step + 1 == len(self.simulation.history) and self.current_step < self.max_step:
+        if self.current_step + 1 == len(self.history) and self.current_step < self.max_step:
             self.textbox.draw(self.screen)
             self.spend_budget_button.draw(self.screen)
         if self.current_step != 0:
@@ -535,54 +755,70 @@ class Visualizer:
         if self.clicked_box == self.div_type_selectbox:
             self.selectbar.draw(self.screen)
 
-    def _handle_events_simulation(self) -> None:
+    def _handle_events_simulation(self, events: List[pygame.event.Event]) -> None:
         """Обработчик событий во время моделирования."""
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
+                self._stop_worker()
                 pygame.quit()
                 sys.exit()
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self._invalidate()
+            elif event.type == self.WORKER_EVENT:
+                self._receive_steps()
+            elif event.type == self.AUTOPLAY_EVENT:
+                if self.current_step + 1 < len(self.history):
+                    self._show_step(self.current_step + 1)
+                if self.current_step == self.max_step:
+                    self._set_autoplay(False)
             elif event.type == pygame.MOUSEBUTTONDOWN:
+                if self.spend_budget_button.error_message or self.spend_budget_button.active:
+                    self._invalidate_row(self.spend_budget_button.border_rect)
                 self.spend_budget_button.error_message = ''
                 self.spend_budget_button.active = False
 
                 if self.exit_button.is_clicked(event):
+                    self._stop_worker()
                     pygame.quit()
                     sys.exit()
 
+                elif self.autoplay_button.is_clicked(event):
+                    self._set_autoplay(not self.autoplay)
+
                 elif (self.spend_budget_button.is_clicked(event) and
-                    self.current_step + 1 == len(self.simulation.history) and
+                    self.current_step + 1 == len(self.history) and
                     self.current_step < self.max_step):
                     self.spend_budget_button.active = True
                     self.spend_budget_button.text = ''
+                    self._invalidate_row(self.spend_budget_button.border_rect)
 
                 elif self.current_step != 0 and self.prev_button.is_clicked(event):
-                    self.current_step = max(0, self.current_step - 1)
+                    self._show_step(max(0, self.current_step - 1))
 
                 elif self.current_step != self.max_step and self.next_button.is_clicked(event):
-                    if self.current_step < self.max_step:
-                        if self.current_step + 1 == len(self.simulation.history):
-                            money = int(self.spend_budget_button.text) if self.spend_budget_button.text != '' else 0
-                            self.spend_budget_button.text = ''
-                            self.simulation.make_step(money)
-                        self.current_step += 1
+                    if self.current_step + 1 < len(self.history):
+                        self._show_step(self.current_step + 1)
+                    elif not self.autoplay and not self.pending_step:
+                        money = int(self.spend_budget_button.text) if self.spend_budget_button.text != '' else 0
+                        self.spend_budget_button.text = ''
+                        self.pending_step = True
+                        self.worker.step(money)
 
                 elif self.config_button.is_clicked(event):
                     self.simulation_running = False
+                    self._stop_worker()
                     self._clean_data()
+                    self._invalidate()
 
                 else:
-                    clicked = False
-                    for index, (_, radius) in enumerate(self.radius_cities.items()):
-                        x, y = self._COORDINATES_POINTS[index]
-                        distance = ((event.pos[0] - x) ** 2 + (event.pos[1] - y) ** 2) ** 0.5
-                        if distance <= radius:
-                            clicked = True
-                            self.selected_city_index = index
-                    if not clicked:
-                        self.selected_city_index = None
+                    selected_city_index = self.selected_city_index
+                    self.selected_city_index = self._city_at(event.pos)
+                    if self.selected_city_index != selected_city_index:
+                        self._invalidate(self.panel_rect)
 
             elif event.type == pygame.KEYDOWN and self.spend_budget_button.active:
                 self.spend_budget_button.error_message = ''
+                self._invalidate_row(self.spend_budget_button.border_rect)
 
                 if event.key == pygame.K_RETURN:
                     self.spend_budget_button.active = False
@@ -603,6 +839,62 @@ class Visualizer:
                         self.spend_budget_button.error_message = "Только цифры!"
                         self.spend_budget_button.text = ''
 
+    def _start_worker(self) -> None:
+        """Запускает фоновый поток моделирования для текущей симуляции."""
+        self.worker = SimulationWorker(self.simulation, self.lookahead,
+                                       notify=lambda: pygame.event.post(pygame.event.Event(self.WORKER_EVENT)))
+        self.worker.start()
+
+    def _stop_worker(self) -> None:
+        """Останавливает фоновый поток моделирования и автопросмотр."""
+        self._set_autoplay(False)
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker = None
+        self.pending_step = False
+
+    def _show_step(self, step: int) -> None:
+        """Переключает показываемый шаг."""
+        self.current_step = step
+        if self.worker is not None:
+            self.worker.show(step)
+        self._invalidate()
+
+    def _set_autoplay(self, autoplay: bool) -> None:
+        """
+        Включает или выключает автопросмотр. Затраты на вакцины каждую неделю
+        берутся из поля ввода в момент включения.
+        """
+        if autoplay == self.autoplay:
+            return
+        self.autoplay = autoplay
+        self.autoplay_button.press()
+        self._invalidate(self.autoplay_button.border_rect)
+        if autoplay:
+            if self.worker is not None:
+                money = int(self.spend_budget_button.text) if self.spend_budget_button.text != '' else 0
+                self.worker.play(money)
+            pygame.time.set_timer(self.AUTOPLAY_EVENT, int(1000 / self.autoplay_rate))
+        else:
+            pygame.time.set_timer(self.AUTOPLAY_EVENT, 0)
+            if self.worker is not None:
+                self.worker.pause()
+
+    def _receive_steps(self) -> None:
+        """Обрабатывает шаги, рассчитанные фоновым потоком."""
+        for result in self.worker.poll() if self.worker is not None else []:
+            if result['error'] is not None:
+                self.pending_step = False
+                self._set_autoplay(False)
+                self.spend_budget_button.error_message = ("Ошибка моделирования!" if result.get('unexpected')
+                                                          else "В доступе нет такой суммы денег!")
+                self._invalidate_row(self.spend_budget_button.border_rect)
+            elif self.pending_step:
+                self.pending_step = False
+                self._show_step(result['step'])
+            elif result['step'] == self.current_step + 1:
+                self._invalidate()
+
     def _check_input_symbol(self, symbol: str) -> None:
         """"Проверка и обработка введённых символов с клавиатуры/"""
         if not isinstance(self.clicked_box, InputBox):
@@ -632,8 +924,8 @@ class Visualizer:
         elif self.clicked_box == self.number_citis_inputbox :
             if symbol.isdigit():
                 self.clicked_box.text += symbol
-                if not (1 <= int(self.clicked_box.text) <= 10):
-                    self.clicked_box.error_message = "Число из диапазона [1, 10]"
+                if not (1 <= int(self.clicked_box.text) <= len(self.available_cities)):
+                    self.clicked_box.error_message = f"Число из диапазона [1, {len(self.available_cities)}]"
                     self.clicked_box.text = ''
             else:
                 self.clicked_box.error_message = "Только цифры!"
@@ -746,7 +1038,11 @@ class Visualizer:
             self.div_transport_inputbox.text = ''
 
     def _citites_list_control(self) -> None:
-        """Проводит обработку списков, контролирующих ввод и храненние данных по городам."""
+        """
+        Проводит обработку списков, контролирующих ввод и храненние данных по городам.
+        Моделируются первые number городов из доступных, а в списке на экране
+        показываются не больше MAX_LISTED_CITIES из них.
+        """
         number = int(self.number_citis_inputbox.get_data())
         self.clicked_selectbox = None
         del self.cities_selectboxes
@@ -757,11 +1053,25 @@ class Visualizer:
         padding = int(self.WIDTH_PANEL * 0.04)
         x_cities, y_cities = int(self.WIDTH * 0.35) + padding, int(self.HEIGHT * 0.03) + padding + 60
         dx_cities, dy_cities = int(self.WIDTH * 0.25), 45
-        for index in range(1, number + 1):
+        for index in range(1, min(number, self.MAX_LISTED_CITIES) + 1):
             city_coords = (x_cities, y_cities, dx_cities, dy_cities)
             y_cities += dy_cities + 1
             self.cities_selectboxes.append(SelectBox(*city_coords, f"Город {index}", font=self.fonts['small'], color=RED, color_clicked=WHITE))
-            self.cities_data.append(government_data['cities_data'][index - 1])
+        self.cities_data = self.available_cities[:number]
+
+    def load_cities(self, path: str) -> None:
+        """
+        Загружает доступные для моделирования города из файла и выбирает их все.
+
+        :param path: Путь к файлу с городами (.csv, .parquet или .geojson).
+        """
+        self.available_cities = load_cities(path)
+        number = str(len(self.available_cities))
+        self.number_citis_inputbox.base_text = f"Число от 1 до {number}:  "
+        self.number_citis_inputbox.default = number
+        self.number_citis_inputbox.text = ''
+        self._citites_list_control()
+        self._invalidate()
 
     def _set_default_values(self) -> None:
         """Установка параметров по умолчанию для кнопок."""
@@ -780,13 +1090,16 @@ class Visualizer:
         self.div_vaccinated_inputbox.default = str(city['number_vaccinated'])
         self.div_transport_inputbox.default = str(int(100 * city['transport']))
 
-    def _handle_events_setuping(self) -> None:
+    def _handle_events_setuping(self, events: List[pygame.event.Event]) -> None:
         """Обработчик событий во время конфигурации моделирования."""
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self._invalidate()
             elif event.type == pygame.MOUSEBUTTONDOWN:
+                self._invalidate()
                 if self.exit_button.is_clicked(event):
                     pygame.quit()
                     sys.exit()
@@ -848,6 +1161,7 @@ class Visualizer:
                     self._collect_data()
                     self.simulation_running = True
                     self._set_cities_data()
+                    self._start_worker()
 
                 else:
                     for selectbox in self.cities_selectboxes:
@@ -864,6 +1178,10 @@ class Visualizer:
                   self.clicked_box is not None and
                   self.clicked_box != self.div_type_selectbox):
                 self.clicked_box.error_message = ''
+                if self.clicked_box == self.number_citis_inputbox:
+                    self._invalidate()
+                else:
+                    self._invalidate_row(self.clicked_box.border_rect)
 
                 if event.key == pygame.K_RETURN:
                     self.clicked_box.press()
@@ -891,35 +1209,70 @@ class Visualizer:
             }
         }
         self.simulation = Simulation(**simulation_data)
+        self.history = self.simulation.history
+        self.start_month = self.simulation.start_month
         self.current_step = 0
         self.max_step = self.simulation.months * 4
 
-    def run_simulation(self):
-        """Запустить моделирование."""
+    def open_recording(self, path: str) -> None:
+        """
+        Открывает записанный прогон для просмотра по шагам без моделирования.
+
+        :param path: Путь к файлу, записанному RecordingWriter.
+        """
+        self.simulation = None
+        self.history = Recording(path)
+        self.start_month = self.history.start_month
+        self.current_step = 0
+        self.max_step = len(self.history) - 1
+        self.simulation_running = True
+        self._set_cities_data()
+        self._invalidate()
+
+    def _draw_frame(self) -> None:
+        """Отрисовывает текущий кадр (в пределах области отсечения экрана)."""
+        if self.simulation_running:
+            month, week = self.start_month + self.current_step // 4, self.current_step % 4 + 1
+
+            self.screen.blit(self.background, (0, 0))
+            self._draw_cities()
+            self._draw_month_week(month, week)
+            self._draw_statistics()
+            self._draw_buttons_simulation()
+        else:
+            self.screen.fill(self.WHITE)
+            self._draw_setup_menu()
+
+    def run_simulation(self, recording: str = None, cities: str = None):
+        """
+        Запустить моделирование.
+
+        :param recording: Путь к записанному прогону, который открывается для просмотра вместо настройки.
+        :param cities: Путь к файлу с городами, загружаемыми для настройки вместо городов из config.
+        """
         self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
         pygame.display.set_caption("Моделирование распространения вируса")
         self.clock = pygame.time.Clock()
         self._citites_list_control()
+        if cities is not None:
+            self.load_cities(cities)
+        if recording is not None:
+            self.open_recording(recording)
 
+        self._invalidate()
         running = True
         while running:
-            self.screen.fill(self.WHITE)
-
+            # Без изменений на экране ждём событие, не перерисовывая кадр.
+            events = pygame.event.get() if self.dirty_rects else [pygame.event.wait()] + pygame.event.get()
             if self.simulation_running:
-                month, week = self.simulation.start_month + self.current_step // 4, self.current_step % 4 + 1
-
-                self._draw_cities()
-                self._draw_legend()
-                self._draw_month_week(month, week)
-                self._draw_statistics()
-                self._draw_buttons_simulation()
-
-                self._handle_events_simulation()
+                self._handle_events_simulation(events)
             else:
-                self._draw_setup_menu()
-
-                self._handle_events_setuping()
-
-
-            pygame.display.flip()
+                self._handle_events_setuping(events)
+
+            if self.dirty_rects:
+                self.screen.set_clip(self.dirty_rects[0].unionall(self.dirty_rects[1:]))
+                self._draw_frame()
+                self.screen.set_clip(None)
+                pygame.display.update(self.dirty_rects)
+                self.dirty_rects = []
             self.clock.tick(30)
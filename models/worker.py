@@ -0,0 +1,140 @@
+from .simulation import Simulation
+from typing import Callable, List, Optional, TypedDict
+import queue
+import threading
+import traceback
+
+
+class _StepOptionalResult(TypedDict, total=False):
+    unexpected: bool
+
+
+class StepResult(_StepOptionalResult):
+    step: int
+    error: Optional[str]
+
+
+class SimulationWorker:
+    def __init__(self, simulation: Simulation, lookahead: int = 4,
+                 notify: Optional[Callable[[], None]] = None) -> None:
+        """
+        Инициализация фонового потока моделирования.
+
+        Шаги симуляции выполняются в отдельном потоке, а их результаты передаются
+        через потокобезопасную очередь results. В режиме автопросмотра поток
+        заранее рассчитывает до lookahead шагов вперёд от показываемого шага.
+        Пока поток запущен, симуляцию изменяет только он; история лишь дополняется,
+        поэтому уже записанные шаги можно читать из других потоков.
+
+        :param simulation: Симуляция.
+        :param lookahead: Наибольшее число шагов, рассчитываемых заранее.
+        :param notify: Вызывается из потока после каждого результата (например, чтобы разбудить цикл событий).
+        """
+        if lookahead < 1:
+            raise ValueError("lookahead must be positive")
+        self.simulation = simulation
+        self.lookahead = lookahead
+        self.notify = notify
+        self.results: queue.Queue = queue.Queue()
+        self._commands: queue.Queue = queue.Queue()
+        self._auto_money: Optional[int] = None
+        self._displayed = 0
+        self._thread = threading.Thread(target=self._run, name='simulation-worker', daemon=True)
+
+    @property
+    def max_step(self) -> int:
+        """Возвращает номер последнего шага моделирования."""
+        return self.simulation.months * 4
+
+    def start(self) -> None:
+        """Запускает поток."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Останавливает поток, дождавшись окончания текущего шага."""
+        self._commands.put(('stop', None))
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def step(self, money: int) -> None:
+        """
+        Запрашивает один шаг моделирования.
+
+        :param money: Деньги на вакцины.
+        """
+        self._commands.put(('step', money))
+
+    def play(self, money: int) -> None:
+        """
+        Включает автопросмотр: шаги рассчитываются заранее с одинаковыми затратами.
+
+        :param money: Деньги на вакцины каждую неделю.
+        """
+        self._commands.put(('play', money))
+
+    def pause(self) -> None:
+        """Выключает автопросмотр."""
+        self._commands.put(('pause', None))
+
+    def show(self, step: int) -> None:
+        """
+        Сообщает показываемый шаг, от которого отсчитывается предварительный расчёт.
+
+        :param step: Номер показываемого шага.
+        """
+        self._commands.put(('show', step))
+
+    def poll(self) -> List[StepResult]:
+        """Возвращает все накопившиеся результаты, не блокируя вызывающий поток."""
+        results = []
+        while True:
+            try:
+                results.append(self.results.get_nowait())
+            except queue.Empty:
+                return results
+
+    def _make_step(self, money: int) -> None:
+        """
+        Выполняет шаг и публикует результат.
+
+        Любая ошибка шага передаётся через results, а не завершает поток,
+        иначе ожидающий результата интерфейс не дождался бы его.
+        """
+        try:
+            self.simulation.make_step(money)
+        except ValueError as error:
+            self._auto_money = None
+            self.results.put({'step': len(self.simulation.history) - 1, 'error': str(error)})
+        except Exception as error:
+            self._auto_money = None
+            traceback.print_exc()
+            self.results.put({'step': len(self.simulation.history) - 1,
+                              'error': f"{type(error).__name__}: {error}", 'unexpected': True})
+        else:
+            self.results.put({'step': len(self.simulation.history) - 1, 'error': None})
+        if self.notify is not None:
+            self.notify()
+
+    def _run(self) -> None:
+        """Основной цикл потока: команды обрабатываются по порядку, в паузах считаются шаги автопросмотра."""
+        while True:
+            last_step = len(self.simulation.history) - 1
+            ahead = (self._auto_money is not None and last_step < self.max_step and
+                     last_step - self._displayed < self.lookahead)
+            try:
+                kind, value = self._commands.get_nowait() if ahead else self._commands.get()
+            except queue.Empty:
+                self._make_step(self._auto_money)
+                continue
+
+            if kind == 'stop':
+                return
+            elif kind == 'step':
+                if last_step < self.max_step:
+                    self._make_step(value)
+            elif kind == 'play':
+                self._auto_money = value
+            elif kind == 'pause':
+                self._auto_money = None
+            elif kind == 'show':
+                self._displayed = value
@@ -0,0 +1,135 @@
+from .allocation import AllocationStrategy
+from .government import GovernmentData, GovernmentStatisticsData
+from .mobility import MobilityNetwork
+from .simulation import Simulation
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, TypedDict, Union
+import numpy as np
+
+
+class BorderFlowData(TypedDict):
+    origin_country: str
+    origin: str
+    destination_country: str
+    destination: str
+    flow: float
+
+
+class World:
+    def __init__(self, months: int, start_month: int, countries_data: List[GovernmentData],
+                 border_flows: Optional[List[BorderFlowData]] = None,
+                 allocations: Optional[Dict[str, AllocationStrategy]] = None,
+                 workers: int = 1, keep_history: bool = True) -> None:
+        """
+        Инициализация моделирования нескольких стран, связанных поездками через границу.
+
+        У каждой страны своя симуляция со своим бюджетом, стоимостью вакцины
+        и налогами (ключи tax_per_person и tax_rate_payment в её параметрах).
+        Неделя делится на две фазы: в фазе обмена по потокам через границу
+        считается число заболевших, прибывающих в города каждой страны из других
+        стран, а затем страны выполняют шаг независимо и могут считаться
+        параллельно в workers потоках. Страны связаны только через фазу обмена,
+        поэтому результат не зависит от числа потоков.
+
+        :param months: Количество месяцев моделирования.
+        :param start_month: Номер начального месяца.
+        :param countries_data: Параметры стран (названия должны различаться).
+        :param border_flows: Потоки людей за неделю между городами разных стран.
+        :param allocations: Стратегии распределения вакцин по названиям стран.
+        :param workers: Число потоков для шагов стран.
+        :param keep_history: Хранить ли историю стран в памяти.
+        """
+        if workers < 1:
+            raise ValueError("workers must be positive")
+        allocations = {} if allocations is None else allocations
+        self.names = [data['name'] for data in countries_data]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("country names must be unique")
+        self.months = months
+        self.simulations = [Simulation(months, start_month, data, allocations.get(data['name']),
+                                       keep_history=keep_history)
+                            for data in countries_data]
+
+        sizes = [len(simulation.government.names) for simulation in self.simulations]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        self.border: Optional[MobilityNetwork] = None
+        if border_flows:
+            self.border = self._border_network(border_flows)
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='world') if workers > 1 else None
+
+    def _border_network(self, border_flows: List[BorderFlowData]) -> MobilityNetwork:
+        """Строит сеть перемещений через границу в сквозной нумерации городов всех стран."""
+        countries = {name: index for index, name in enumerate(self.names)}
+        cities = [{name: index for index, name in enumerate(simulation.government.names)}
+                  for simulation in self.simulations]
+
+        def city_index(country: str, city: str) -> int:
+            if country not in countries:
+                raise ValueError(f"Unknown country in border flows: {country}")
+            position = countries[country]
+            if city not in cities[position]:
+                raise ValueError(f"Unknown city in border flows: {country}/{city}")
+            return int(self.offsets[position]) + cities[position][city]
+
+        for flow in border_flows:
+            if flow['origin_country'] == flow['destination_country']:
+                raise ValueError("border flows must connect different countries; use mobility_data inside a country")
+        origins = [city_index(flow['origin_country'], flow['origin']) for flow in border_flows]
+        destinations = [city_index(flow['destination_country'], flow['destination']) for flow in border_flows]
+        return MobilityNetwork(int(self.offsets[-1]), origins, destinations, [flow['flow'] for flow in border_flows])
+
+    def __len__(self) -> int:
+        return len(self.simulations)
+
+    def __getitem__(self, name: str) -> Simulation:
+        return self.simulations[self.names.index(name)]
+
+    def _exchange(self) -> List[Optional[np.ndarray]]:
+        """Фаза обмена: число заболевших, прибывающих в города каждой страны из-за границы."""
+        if self.border is None:
+            return [None] * len(self.simulations)
+        prevalence = np.concatenate([simulation.government.engine.number_infected /
+                                     simulation.government.engine.population
+                                     for simulation in self.simulations])
+        imported = self.border.imported(prevalence)
+        return [imported[start:end] for start, end in zip(self.offsets[:-1], self.offsets[1:])]
+
+    def make_step(self, money: Union[int, Dict[str, int]]) -> None:
+        """
+        Выполняет одну неделю во всех странах.
+
+        :param money: Деньги на вакцины: одинаковые для всех стран или {"страна": деньги}.
+        """
+        if isinstance(money, dict):
+            money = [money.get(name, 0) for name in self.names]
+        else:
+            money = [money] * len(self.simulations)
+        # Бюджеты проверяются до шага, чтобы ошибка одной страны не оставила остальные на другой неделе.
+        for name, simulation, country_money in zip(self.names, self.simulations, money):
+            if country_money > simulation.government.budget:
+                raise ValueError(f"Недостаточно бюджета для распределения вакцин в стране {name}.")
+
+        imported = self._exchange()
+        if self.executor is None:
+            for simulation, country_money, country_imported in zip(self.simulations, money, imported):
+                simulation.make_step(country_money, country_imported)
+        else:
+            for future in [self.executor.submit(simulation.make_step, country_money, country_imported)
+                           for simulation, country_money, country_imported in zip(self.simulations, money, imported)]:
+                future.result()
+
+    def get_statistics(self) -> List[GovernmentStatisticsData]:
+        """Возвращает статистику по странам на текущем шаге."""
+        return [simulation.government.get_statistics()['government'] for simulation in self.simulations]
+
+    def close(self) -> None:
+        """Останавливает потоки шагов стран."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self) -> 'World':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
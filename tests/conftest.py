@@ -0,0 +1,17 @@
+import pytest
+
+
+@pytest.fixture
+def government_data():
+    """Параметры небольшого государства из двух городов; каждый тест получает свою копию."""
+    return {
+        'name': 'Тест',
+        'budget': 1000,
+        'vaccine_cost': 10,
+        'cities_data': [
+            {'name': 'A', 'city_type': 'megapolis', 'population': 10000, 'transport': 0.5,
+             'number_vaccinated': 100, 'number_infected': 300},
+            {'name': 'B', 'city_type': 'town', 'population': 3000, 'transport': 0.2,
+             'number_vaccinated': 0, 'number_infected': 0},
+        ],
+    }
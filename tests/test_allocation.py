@@ -0,0 +1,33 @@
+from models import Government, GreedyAllocation
+import numpy as np
+
+
+def make_government(cities_data, budget=10000, vaccine_cost=1):
+    return Government(name='Тест', budget=budget, vaccine_cost=vaccine_cost, cities_data=cities_data)
+
+
+def test_greedy_spends_budget_when_capacity_is_below_chunk():
+    cities_data = [
+        {'name': f'town{i}', 'city_type': 'town', 'population': 10, 'transport': 0.5,
+         'number_vaccinated': 0, 'number_infected': 3}
+        for i in range(200)
+    ]
+    government = make_government(cities_data)
+    allocation = GreedyAllocation(chunks=32).allocate(government, 1000, 1)
+
+    assert allocation.sum() == 1000
+    assert np.count_nonzero(allocation) > 32
+    assert np.all(allocation <= government.engine.number_innocent)
+
+
+def test_greedy_respects_budget_and_capacity():
+    cities_data = [
+        {'name': f'city{i}', 'city_type': 'medium', 'population': 1000 * (i + 1), 'transport': 0.5,
+         'number_vaccinated': 0, 'number_infected': 50 * (i + 1)}
+        for i in range(10)
+    ]
+    government = make_government(cities_data, vaccine_cost=10)
+    allocation = GreedyAllocation(chunks=8).allocate(government, 5000, 1)
+
+    assert allocation.sum() * 10 <= 5000
+    assert np.all(allocation <= government.engine.number_innocent)
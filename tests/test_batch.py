@@ -0,0 +1,27 @@
+from models import SEIR_COMPARTMENTS, Simulation
+from models.batch import BatchSimulation
+import pytest
+
+
+def test_batch_matches_simulation_with_custom_taxes(government_data):
+    government_data['tax_per_person'] = 5.0
+    simulation = Simulation(2, 1, government_data, keep_history=False)
+    batch = BatchSimulation(2, 1, government_data, replicas=2)
+    for _ in range(8):
+        simulation.make_step(500)
+        batch.make_step(500)
+    statistics = simulation.government.get_statistics()['government']
+    assert batch.get_government_statistics(0) == statistics
+    assert batch.get_government_statistics(1) == statistics
+
+
+def test_batch_rejects_compartments(government_data):
+    government_data['compartments'] = SEIR_COMPARTMENTS
+    with pytest.raises(ValueError, match="weekly cohort model"):
+        BatchSimulation(2, 1, government_data, replicas=2)
+
+
+def test_batch_rejects_regions(government_data):
+    government_data['regions_data'] = [{'name': 'Север', 'budget': 100}]
+    with pytest.raises(ValueError, match="regions"):
+        BatchSimulation(2, 1, government_data, replicas=2)
@@ -0,0 +1,51 @@
+from models.checkpoint import dump_checkpoint, fork_simulation, restore_checkpoint
+from models.simulation import Simulation
+import pytest
+
+
+@pytest.fixture
+def checkpoint_data(government_data):
+    for city, region in zip(government_data['cities_data'], ('north', 'south')):
+        city['region'] = region
+    government_data.update(
+        budget=5000, stochastic=True, seed=7,
+        mobility_data=[{'origin': 'A', 'destination': 'B', 'flow': 300}],
+        regions_data=[{'name': 'north', 'budget': 300}, {'name': 'south', 'budget': 100}],
+    )
+    return government_data
+
+
+def test_restored_simulation_continues_identically(checkpoint_data):
+    simulation = Simulation(3, 1, checkpoint_data)
+    for _ in range(3):
+        simulation.make_step(200)
+    restored = restore_checkpoint(dump_checkpoint(simulation))
+    assert restored.government.get_statistics() == simulation.government.get_statistics()
+    for _ in range(5):
+        simulation.make_step(200)
+        restored.make_step(200)
+    assert restored.government.get_statistics() == simulation.government.get_statistics()
+    assert restored.government.get_region_statistics() == simulation.government.get_region_statistics()
+    assert list(restored.history) == list(simulation.history)
+
+
+def test_restore_without_history_does_not_keep_history(checkpoint_data):
+    simulation = Simulation(3, 1, checkpoint_data)
+    simulation.make_step(200)
+    assert restore_checkpoint(dump_checkpoint(simulation, include_history=False)).history is None
+    assert all(branch.history is None for branch in fork_simulation(simulation, [100, 200]))
+    assert restore_checkpoint(dump_checkpoint(simulation, include_history=False), keep_history=True).history is not None
+
+
+def test_restore_keeps_supply_state(government_data):
+    supply = {'production_capacity': 50, 'delivery_weeks': 2, 'shelf_life_weeks': 3}
+    simulation = Simulation(3, 1, government_data, supply=supply)
+    for _ in range(3):
+        simulation.make_step(300)
+    restored = restore_checkpoint(dump_checkpoint(simulation))
+    assert restored.supply.get_statistics() == simulation.supply.get_statistics()
+    for _ in range(3):
+        simulation.make_step(300)
+        restored.make_step(300)
+    assert restored.supply.get_statistics() == simulation.supply.get_statistics()
+    assert restored.government.get_statistics() == simulation.government.get_statistics()
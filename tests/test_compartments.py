@@ -0,0 +1,23 @@
+from models import SEIR_COMPARTMENTS, CompartmentEngine
+import numpy as np
+
+
+def make_engine(vaccine_days):
+    compartments = {**SEIR_COMPARTMENTS, 'vaccine_days': vaccine_days}
+    return CompartmentEngine(population=[10000, 20000], transport=[0.5, 0.5], city_weight=[1.0, 1.0],
+                             vaccinated=np.zeros((3, 2)), infected=[[100, 100], [0, 0], [0, 0]],
+                             compartments=compartments)
+
+
+def test_empty_vaccine_days_gives_no_immunity():
+    engine = make_engine([])
+    for _ in range(20):
+        engine.update_state(1, np.array([100, 100]))
+    assert engine.total_vaccinated == 0
+
+
+def test_none_vaccine_days_gives_permanent_immunity():
+    engine = make_engine(None)
+    for _ in range(5):
+        engine.update_state(1, np.array([100, 100]))
+    assert engine.total_vaccinated == 1000
@@ -0,0 +1,41 @@
+from models import City, Government
+import pytest
+
+
+CITIES_DATA = [
+    {'name': 'A', 'city_type': 'megapolis', 'population': 120000, 'transport': 0.7,
+     'number_vaccinated': 5000, 'number_infected': 3000},
+    {'name': 'B', 'city_type': 'medium', 'population': 40000, 'transport': 0.4,
+     'number_vaccinated': 0, 'number_infected': 800},
+    {'name': 'C', 'city_type': 'town', 'population': 9000, 'transport': 0.2,
+     'number_vaccinated': 300, 'number_infected': 0},
+    {'name': 'D', 'city_type': 'town', 'population': 500, 'transport': 1.0,
+     'number_vaccinated': 0, 'number_infected': 50},
+]
+
+VACCINE_PATTERNS = {
+    'none': lambda week: {},
+    'constant': lambda week: {'A': 1000, 'B': 300, 'C': 50, 'D': 5},
+    'alternating': lambda week: {'A': 5000 * (week % 2), 'C': 10 ** 6 * (week % 3 == 0)},
+}
+
+
+@pytest.mark.parametrize('pattern', VACCINE_PATTERNS)
+@pytest.mark.parametrize('start_month', [1, 6, 11])
+def test_engine_matches_city_loop(pattern, start_month):
+    government = Government(name='Тест', budget=10 ** 9, vaccine_cost=1, cities_data=CITIES_DATA)
+    cities = [City(**params) for params in CITIES_DATA]
+    population = sum(city.population for city in cities)
+
+    for week in range(12):
+        month = (start_month + week // 4) % 12
+        vaccines = VACCINE_PATTERNS[pattern](week)
+        government_factor = (sum(city.number_infected for city in cities) / population) ** 0.5
+        for city in cities:
+            city.update_state(month, vaccines.get(city.name, 0), government_factor)
+        government.update_state(month, vaccines)
+
+        assert government.engine.number_vaccinated.tolist() == [city.number_vaccinated for city in cities]
+        assert government.engine.number_infected.tolist() == [city.number_infected for city in cities]
+        assert [list(city.infected.values()) for city in government.cities] == \
+            [list(city.infected.values()) for city in cities]
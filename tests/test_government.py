@@ -0,0 +1,36 @@
+from models import Government, SEIR_COMPARTMENTS
+import pytest
+
+
+def test_cities_is_a_snapshot(government_data):
+    government = Government(**government_data)
+    government.update_state(1, {'A': 10})
+    cities = government.cities
+    assert isinstance(cities, tuple)
+    assert [city.number_infected for city in cities] == government.engine.number_infected.tolist()
+
+    assert government.cities is cities
+
+    infected = int(government.engine.number_infected[0])
+    cities[0].infected = [0, 0, 0]
+    assert int(government.engine.number_infected[0]) == infected
+    government.update_state(1, {})
+    assert government.cities is not cities
+    assert [city.number_infected for city in government.cities] == government.engine.number_infected.tolist()
+
+
+@pytest.mark.parametrize('compartments', [None, SEIR_COMPARTMENTS])
+def test_stochastic_runs_are_reproducible_by_seed(government_data, compartments):
+    if compartments is not None:
+        government_data['compartments'] = compartments
+
+    def run(seed):
+        government = Government(**government_data, stochastic=True, seed=seed)
+        infected = []
+        for week in range(12):
+            government.update_state(week // 4 + 1, {'A': 50})
+            infected.append(government.engine.number_infected.tolist())
+        return infected
+
+    assert run(1) == run(1)
+    assert run(1) != run(2)
@@ -0,0 +1,60 @@
+from models import headless
+import json
+import pytest
+
+
+@pytest.fixture
+def government_path(tmp_path, government_data):
+    path = tmp_path / 'government.json'
+    path.write_text(json.dumps(government_data), encoding='utf-8')
+    return str(path)
+
+
+def test_parquet_export_without_pyarrow_is_a_usage_error(government_path, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(headless.importlib.util, 'find_spec', lambda name: None)
+    with pytest.raises(SystemExit) as exit_info:
+        headless.main([government_path, '--export', str(tmp_path / 'out.parquet')])
+    assert exit_info.value.code == 2
+    assert 'Parquet requires pyarrow' in capsys.readouterr().err
+
+
+def test_unknown_export_format_is_a_usage_error(government_path, tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        headless.main([government_path, '--export', str(tmp_path / 'out.xyz')])
+    assert 'cannot infer format' in capsys.readouterr().err
+
+
+def test_csv_export(government_path, government_data, tmp_path):
+    path = tmp_path / 'out.csv'
+    headless.main([government_path, '--export', str(path), '--output', str(tmp_path / 'result.json')])
+    assert len(path.read_text(encoding='utf-8').splitlines()) == 1 + 5 * len(government_data['cities_data'])
+
+
+@pytest.mark.parametrize('spec, expected', [('250', 250), ('1e6', 1000000), ('100.0', 100)])
+def test_budget_numbers(spec, expected):
+    assert headless.load_budget_schedule(spec) == expected
+
+
+@pytest.mark.parametrize('spec, message', [('-5', 'non-negative'), ('1.5', 'whole number'),
+                                           ('missing.txt', 'No such file')])
+def test_bad_budget_is_a_usage_error(government_path, spec, message, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        headless.main([government_path, '--budget', spec])
+    assert exit_info.value.code == 2
+    assert message in capsys.readouterr().err
+
+
+def test_budget_schedule_file(tmp_path):
+    path = tmp_path / 'budget.txt'
+    path.write_text('100\n\n2e3\n', encoding='utf-8')
+    assert headless.load_budget_schedule(str(path)) == [100, 2000]
+    path.write_text('[100, -1]', encoding='utf-8')
+    with pytest.raises(ValueError, match='non-negative'):
+        headless.load_budget_schedule(str(path))
+
+
+def test_spending_over_budget_is_clamped_and_logged(government_data, caplog):
+    with caplog.at_level('WARNING', logger=headless.__name__):
+        headless.run_headless(1, 1, government_data, [600, 10 ** 9])
+    assert len(caplog.records) == 1
+    assert 'week 2' in caplog.records[0].getMessage()
@@ -0,0 +1,119 @@
+from models import Government, load_cities
+import json
+import pytest
+import re
+
+
+CSV_HEADER = 'name,city_type,population,transport,number_infected,region\n'
+
+
+def write(path, text):
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_load_csv_with_regions(tmp_path):
+    path = write(tmp_path / 'cities.csv', CSV_HEADER +
+                 'A,megapolis,10000,0.5,100,Север\n'
+                 'B,town,3000,0.2,0,\n')
+    cities_data = load_cities(path)
+    assert cities_data == [
+        {'name': 'A', 'city_type': 'megapolis', 'population': 10000, 'transport': 0.5,
+         'number_vaccinated': 0, 'number_infected': 100, 'region': 'Север'},
+        {'name': 'B', 'city_type': 'town', 'population': 3000, 'transport': 0.2,
+         'number_vaccinated': 0, 'number_infected': 0},
+    ]
+    government = Government(name='Тест', budget=0, vaccine_cost=1, cities_data=cities_data)
+    assert government.regions.names == ['Север', 'Тест']
+
+
+@pytest.mark.parametrize('row, message', [
+    ('C,town,3000,1.5,0,', 'row 3: transport must be in [0, 1]'),
+    ('C,village,3000,0.5,0,', "row 3: city_type must be"),
+    ('C,town,0,0.5,0,', 'row 3: population must be positive'),
+    ('C,town,many,0.5,0,', "row 3: invalid population 'many'"),
+])
+def test_csv_error_reports_row(tmp_path, row, message):
+    path = write(tmp_path / 'cities.csv', CSV_HEADER + 'A,megapolis,10000,0.5,100,\nB,town,3000,0.2,0,\n' + row + '\n')
+    with pytest.raises(ValueError, match=re.escape(message)):
+        load_cities(path, batch_rows=2)
+
+
+def test_csv_missing_column(tmp_path):
+    path = write(tmp_path / 'cities.csv', 'name,city_type,population\nA,town,100\n')
+    with pytest.raises(ValueError, match='missing columns: transport'):
+        load_cities(path)
+
+
+def test_load_geojson_normalizes_coordinates(tmp_path):
+    features = [
+        {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [lon, lat]},
+         'properties': {'name': name, 'city_type': 'medium', 'population': 5000, 'transport': 0.3,
+                        'region': region}}
+        for name, lon, lat, region in [('A', 30.0, 60.0, 'Север'), ('B', 40.0, 50.0, None)]
+    ]
+    path = write(tmp_path / 'cities.geojson', json.dumps({'type': 'FeatureCollection', 'features': features}))
+    cities_data = load_cities(path)
+    assert [city['coordinates'] for city in cities_data] == [(0.0, 0.0), (1.0, 1.0)]
+    assert cities_data[0]['region'] == 'Север' and 'region' not in cities_data[1]
+
+
+def test_load_parquet(tmp_path):
+    pyarrow = pytest.importorskip('pyarrow')
+    import pyarrow.parquet
+    path = str(tmp_path / 'cities.parquet')
+    pyarrow.parquet.write_table(pyarrow.table({
+        'name': ['A', 'B'], 'city_type': ['megapolis', 'town'], 'population': [10000, 3000],
+        'transport': [0.5, 0.2], 'region': ['Север', None],
+    }), path)
+    cities_data = load_cities(path)
+    assert [city['population'] for city in cities_data] == [10000, 3000]
+    assert cities_data[0]['region'] == 'Север' and 'region' not in cities_data[1]
+
+
+def test_unknown_suffix(tmp_path):
+    with pytest.raises(ValueError, match='Cannot infer cities format'):
+        load_cities(str(tmp_path / 'cities.txt'))
+
+
+def test_csv_empty_optional_cells(tmp_path):
+    path = write(tmp_path / 'cities.csv', 'name,city_type,population,transport,number_vaccinated,number_infected\n'
+                 'A,megapolis,10000,0.5,,100\n'
+                 'B,town,3000,0.2,5,\n')
+    cities_data = load_cities(path)
+    assert [(city['number_vaccinated'], city['number_infected']) for city in cities_data] == [(0, 100), (5, 0)]
+
+
+def test_geojson_partial_properties(tmp_path):
+    features = [
+        {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [30.0, 60.0]},
+         'properties': {'name': 'A', 'city_type': 'medium', 'population': 5000, 'transport': 0.3,
+                        'number_infected': 50, 'region': 'Север'}},
+        {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [40.0, 50.0]},
+         'properties': {'name': 'B', 'city_type': 'town', 'population': 1000, 'transport': 0.1}},
+    ]
+    path = write(tmp_path / 'cities.geojson', json.dumps({'type': 'FeatureCollection', 'features': features}))
+    cities_data = load_cities(path)
+    assert [city['number_infected'] for city in cities_data] == [50, 0]
+    assert cities_data[0]['region'] == 'Север' and 'region' not in cities_data[1]
+
+
+def test_geojson_missing_required_value_reports_row(tmp_path):
+    features = [
+        {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [30.0, 60.0]},
+         'properties': {'name': name, 'city_type': 'town', 'population': population, 'transport': 0.3}}
+        for name, population in [('A', 1000), ('B', None)]
+    ]
+    path = write(tmp_path / 'cities.geojson', json.dumps({'type': 'FeatureCollection', 'features': features}))
+    with pytest.raises(ValueError, match="row 2: invalid population None"):
+        load_cities(path)
+
+
+@pytest.mark.parametrize('batch_rows', [1, 10])
+def test_duplicate_names_report_row(tmp_path, batch_rows):
+    path = write(tmp_path / 'cities.csv', CSV_HEADER +
+                 'A,megapolis,10000,0.5,100,\n'
+                 'B,town,3000,0.2,0,\n'
+                 'A,town,2000,0.2,0,\n')
+    with pytest.raises(ValueError, match=re.escape("row 3: duplicate name 'A' (first at row 1)")):
+        load_cities(path, batch_rows=batch_rows)
@@ -0,0 +1,41 @@
+from models import Government
+from models.mobility import MobilityNetwork
+import numpy as np
+import pytest
+
+
+def test_imported_matches_dense_matrix_product():
+    rng = np.random.default_rng(0)
+    origins, destinations = rng.integers(0, 5, 12), rng.integers(0, 5, 12)
+    flows = rng.uniform(0, 100, 12)
+    network = MobilityNetwork(5, origins, destinations, flows)
+    matrix = np.zeros((5, 5))
+    np.add.at(matrix, (destinations, origins), flows)
+
+    prevalence = rng.random(5)
+    assert np.allclose(network.imported(prevalence), matrix @ prevalence)
+    replicas = rng.random((3, 5))
+    assert np.allclose(network.imported(replicas), replicas @ matrix.T)
+
+
+def test_from_data_maps_city_names():
+    network = MobilityNetwork.from_data([{'origin': 'B', 'destination': 'A', 'flow': 10}], ['A', 'B'])
+    assert network.imported(np.array([0.0, 0.5])).tolist() == [5.0, 0.0]
+    with pytest.raises(ValueError, match='Unknown city'):
+        MobilityNetwork.from_data([{'origin': 'B', 'destination': 'C', 'flow': 10}], ['A', 'B'])
+
+
+def test_invalid_network():
+    with pytest.raises(ValueError, match='negative'):
+        MobilityNetwork(2, [0], [1], [-1.0])
+    with pytest.raises(ValueError, match='out of range'):
+        MobilityNetwork(2, [0], [2], [1.0])
+
+
+def test_mobility_carries_infection_to_destination(government_data):
+    still = Government(**government_data)
+    moving = Government(**government_data, mobility_data=[{'origin': 'A', 'destination': 'B', 'flow': 2000}])
+    for month in (1, 1, 1, 1):
+        still.update_state(month, {})
+        moving.update_state(month, {})
+    assert moving.engine.number_infected[1] > still.engine.number_infected[1]
@@ -0,0 +1,37 @@
+from models import Simulation
+from models.recording import Recording, RecordingWriter
+import pytest
+
+
+def test_recording_matches_history(government_data, tmp_path):
+    path = str(tmp_path / 'run.rec')
+    writer = RecordingWriter(path, 1)
+    simulation = Simulation(2, 1, government_data, writers=[writer])
+    for _ in range(8):
+        simulation.make_step(100)
+    writer.close()
+
+    recording = Recording(path)
+    assert len(recording) == len(simulation.history) == 9
+    assert list(recording) == list(simulation.history)
+    assert recording.names == simulation.government.names
+    with pytest.raises(TypeError):
+        recording.append(simulation.government)
+
+
+def test_partial_last_record_is_ignored(government_data, tmp_path):
+    path = tmp_path / 'run.rec'
+    writer = RecordingWriter(str(path), 1)
+    simulation = Simulation(1, 1, government_data, writers=[writer])
+    simulation.make_step(100)
+    writer.close()
+    with open(path, 'ab') as file:
+        file.write(b'\x00' * 5)
+    assert len(Recording(str(path))) == 2
+
+
+def test_not_a_recording(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'not a recording')
+    with pytest.raises(ValueError, match='not a simulation recording'):
+        Recording(str(path))
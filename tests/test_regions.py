@@ -0,0 +1,46 @@
+from models import Government, Regions
+import numpy as np
+import pytest
+
+
+def test_reduce_skips_empty_middle_and_trailing_regions():
+    regions = Regions(['Север', 'Юг', 'Север', 'Запад'], np.array([1000, 2000, 3000, 4000]),
+                      [{'name': 'Север', 'budget': 0}, {'name': 'Восток', 'budget': 0},
+                       {'name': 'Юг', 'budget': 0}, {'name': 'Запад', 'budget': 0}, {'name': 'Центр', 'budget': 0}])
+    assert regions.population.tolist() == [4000, 0, 2000, 4000, 0]
+    assert regions.reduce(np.array([1, 10, 100, 1000])).tolist() == [101, 0, 10, 1000, 0]
+
+
+@pytest.mark.parametrize('regions_data', [
+    [{'name': 'Север', 'budget': 0}, {'name': 'Юг', 'budget': 0}],
+    [{'name': 'Юг', 'budget': 0}, {'name': 'Север', 'budget': 0}, {'name': 'Восток', 'budget': 0}],
+])
+def test_empty_regions_do_not_drop_cities(regions_data):
+    cities_data = [
+        {'name': f'city{i}', 'city_type': 'town', 'population': 1000, 'transport': 0.5,
+         'number_vaccinated': 0, 'number_infected': 100, 'region': 'Север'}
+        for i in range(3)
+    ]
+    government = Government(name='Тест', budget=10000, vaccine_cost=1, cities_data=cities_data,
+                            regions_data=regions_data)
+    north = government.regions.names.index('Север')
+    assert government.regions.population[north] == 3000
+    assert government.regions.number_infected[north] == government.number_infected
+    assert government.regions.population.sum() == 3000
+
+    government.update_state(1, np.array([0, 0, 500]))
+    assert government.budget == 10000 + int(government.tax_rate_payment * government.tax_per_person * 2700) - 500
+
+
+def test_regional_budget_pays_first():
+    cities_data = [
+        {'name': 'A', 'city_type': 'town', 'population': 1000, 'transport': 0.5,
+         'number_vaccinated': 0, 'number_infected': 0, 'region': 'Север'},
+        {'name': 'B', 'city_type': 'town', 'population': 1000, 'transport': 0.5,
+         'number_vaccinated': 0, 'number_infected': 0, 'region': 'Юг'},
+    ]
+    government = Government(name='Тест', budget=1000, vaccine_cost=2, cities_data=cities_data,
+                            regions_data=[{'name': 'Север', 'budget': 100}, {'name': 'Юг', 'budget': 0}])
+    government.update_state(1, np.array([100, 50]))
+    assert government.regions.budget.tolist() == [0, 0]
+    assert government.budget == 1000 + int(government.tax_rate_payment * government.tax_per_person * 2000) - 200
@@ -0,0 +1,11 @@
+from models import GreedyAllocation, Simulation
+from models.schedule import apply_schedule, optimize_schedule
+
+
+def test_optimize_schedule_uses_simulation_allocation(government_data):
+    simulation = Simulation(1, 1, government_data, GreedyAllocation(), keep_history=False)
+    result = optimize_schedule(simulation, levels=(0, 1), block=2, sweeps=1, workers=1)
+
+    replay = Simulation(1, 1, government_data, GreedyAllocation(), keep_history=False)
+    apply_schedule(replay, result['fractions'])
+    assert result['number_infected'] == replay.government.number_infected
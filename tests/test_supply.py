@@ -0,0 +1,59 @@
+from models import Simulation, VaccineSupply
+import numpy as np
+import pytest
+
+
+def test_orders_arrive_after_delivery_weeks_and_are_capped_by_production():
+    supply = VaccineSupply({'production_capacity': 100, 'delivery_weeks': 2, 'shelf_life_weeks': 5}, 1)
+    assert supply.order(250) == 100
+    supply.end_week()
+    assert supply.receive() == 0
+    supply.end_week()
+    assert supply.receive() == 0
+    supply.end_week()
+    assert supply.receive() == 100
+    assert supply.number_stock == 100 and supply.number_in_transit == 0
+
+
+def test_storage_overflow_is_wasted_and_old_doses_expire_first():
+    supply = VaccineSupply({'production_capacity': 100, 'delivery_weeks': 0, 'shelf_life_weeks': 2,
+                            'storage_capacity': 150}, 1)
+    supply.order(100)
+    supply.receive()
+    supply.end_week()
+    supply.order(100)
+    assert supply.receive() == 50
+    assert supply.distribute(np.array([30])).tolist() == [30]
+    # Из первой партии осталось 70 доз, и она списывается в конце второй недели.
+    assert supply.end_week() == 70
+    assert supply.get_statistics() == {'stock': 50, 'in_transit': 0, 'ordered': 200, 'delivered': 150,
+                                       'distributed': 30, 'expired': 70, 'wasted': 50}
+
+
+def test_distribution_respects_city_capacity_and_shortage():
+    supply = VaccineSupply({'production_capacity': 100, 'delivery_weeks': 0, 'shelf_life_weeks': 1,
+                            'distribution_capacity': [40, 1000]}, 2)
+    supply.order(100)
+    supply.receive()
+    given = supply.distribute(np.array([80, 120]))
+    assert given[0] <= 40
+    assert given.sum() <= 100
+    assert supply.number_stock == 100 - given.sum()
+
+
+def test_invalid_supply_data():
+    with pytest.raises(ValueError, match='shelf_life_weeks'):
+        VaccineSupply({'production_capacity': 1, 'delivery_weeks': 0, 'shelf_life_weeks': 0}, 1)
+
+
+def test_simulation_pays_only_for_produced_doses(government_data):
+    government_data['tax_per_person'] = 0
+    supply = {'production_capacity': 20, 'delivery_weeks': 1, 'shelf_life_weeks': 4}
+    simulation = Simulation(1, 1, government_data, supply=supply)
+    simulation.make_step(500)
+    assert simulation.supply.ordered == 20
+    assert simulation.government.budget == 1000 - 20 * government_data['vaccine_cost']
+    assert simulation.supply.distributed == 0
+    simulation.make_step(0)
+    assert simulation.supply.delivered == 20
+    assert 0 < simulation.supply.distributed == 20 - simulation.supply.number_stock
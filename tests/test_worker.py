@@ -0,0 +1,18 @@
+from models import Simulation
+from models.worker import SimulationWorker
+
+
+def test_unexpected_step_error_is_reported_and_worker_keeps_running(government_data):
+    simulation = Simulation(1, 1, government_data)
+    worker = SimulationWorker(simulation)
+    worker.start()
+    try:
+        worker.step(None)
+        result = worker.results.get(timeout=5)
+        assert result['error'] is not None and result['unexpected']
+
+        worker.step(100)
+        result = worker.results.get(timeout=5)
+        assert result == {'step': 1, 'error': None}
+    finally:
+        worker.stop()